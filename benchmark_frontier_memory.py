@@ -0,0 +1,98 @@
+"""
+مقایسه حافظه مصرفی صف خزش روی یک سایت مصنوعی:
+روش قبلی (افزودن تمام لینک‌ها به deque و حذف تکرار هنگام برداشتن از صف) در برابر
+CrawlFrontier با حذف تکرار هنگام افزودن، با مجموعه دقیق (set) و با فیلتر Bloom
+
+اجرا:
+    python benchmark_frontier_memory.py [تعداد صفحات] [تعداد لینک هر صفحه]
+"""
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from main import CrawlFrontier, ScalableBloomFilter
+
+MAX_DEPTH = 3
+# سهم لینک‌های هر صفحه که به منو/فوتر مشترک سایت اشاره می‌کنند
+SHARED_LINK_COUNT = 40
+
+
+def page_links(page_id, page_count, links_per_page):
+    """
+    لینک‌های یک صفحه مصنوعی: منوی مشترک (در تمام صفحات تکرار می‌شود) به علاوه
+    لینک به صفحات بعدی سایت. رشته‌ها هر بار از نو ساخته می‌شوند، مانند خروجی تجزیه HTML
+    """
+    links = [f"https://site.example/menu/{i}" for i in range(SHARED_LINK_COUNT)]
+    child_count = links_per_page - SHARED_LINK_COUNT
+    for i in range(child_count):
+        links.append(f"https://site.example/page/{(page_id * child_count + i + 1) % page_count}")
+    return links
+
+
+def page_id_of(url):
+    return int(url.rsplit('/', 1)[1]) if '/page/' in url else 0
+
+
+def crawl_legacy(page_count, links_per_page):
+    """
+    روش قبلی: تمام لینک‌ها به صف اضافه و تکرار هنگام برداشتن بررسی می‌شود
+    """
+    start_url = "https://site.example/page/0"
+    queue_urls = deque([(start_url, 0, None)])
+    visited_urls = set()
+    peak_queue = 1
+    while queue_urls:
+        current_url, depth, parent_url = queue_urls.popleft()
+        if current_url in visited_urls or depth > MAX_DEPTH:
+            continue
+        visited_urls.add(current_url)
+        if depth < MAX_DEPTH:
+            for link in page_links(page_id_of(current_url), page_count, links_per_page):
+                if link not in visited_urls:
+                    queue_urls.append((link, depth + 1, current_url))
+            peak_queue = max(peak_queue, len(queue_urls))
+    return len(visited_urls), peak_queue
+
+
+def crawl_frontier(page_count, links_per_page, seen_urls):
+    """
+    خزش ترتیبی با CrawlFrontier (حذف تکرار هنگام افزودن)
+    """
+    frontier = CrawlFrontier("https://site.example/page/0", MAX_DEPTH, seen_urls)
+    while True:
+        task = frontier.get()
+        if task is None:
+            break
+        current_url, depth, _parent_url, _page_number = task
+        if depth < MAX_DEPTH:
+            frontier.put_links(page_links(page_id_of(current_url), page_count, links_per_page), depth + 1, current_url)
+        frontier.task_done()
+    return frontier.pages_dispatched, frontier.peak_queue_length
+
+
+def measure(label, crawl, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    pages, peak_queue = crawl(*args)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>14} | {pages:>7} | {peak_queue:>10} | {peak / 1024 / 1024:>13.1f} | {elapsed:>7.2f}")
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    links_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    print(f"synthetic site: {page_count} pages, {links_per_page} links/page, depth {MAX_DEPTH}")
+    print(f"{'frontier':>14} | {'pages':>7} | {'peak queue':>10} | {'peak mem (MB)':>13} | {'time (s)':>7}")
+    print("-" * 66)
+    # زمان‌ها زیر tracemalloc اندازه‌گیری می‌شوند و فقط برای مقایسه نسبی معتبرند
+    measure("legacy deque", crawl_legacy, page_count, links_per_page)
+    measure("exact set", crawl_frontier, page_count, links_per_page, set())
+    measure("bloom", crawl_frontier, page_count, links_per_page, ScalableBloomFilter(100000, 0.0001))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+مقایسه هزینه استخراج پیوندهای یک صفحه:
+روش قبلی (query_selector_all و سپس get_attribute برای هر المنت) در برابر
+یک فراخوانی evaluate که عنوان، آدرس و تمام href ها را با هم برمی‌گرداند
+
+اجرا:
+    python benchmark_link_extraction.py [تعداد تکرار]
+"""
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from main import CrawlEngine
+
+# تعداد پیوندهای صفحات آزمایشی (آخرین مورد معادل یک mega-menu بزرگ است)
+ANCHOR_COUNTS = (50, 300, 1500)
+
+
+def build_synthetic_page(anchor_count):
+    """
+    ساخت HTML آزمایشی با تعداد مشخصی پیوند نسبی و مطلق
+    """
+    anchors = []
+    for i in range(anchor_count):
+        if i % 5 == 0:
+            anchors.append(f'<a href="https://external-{i % 17}.example/page/{i}">ext {i}</a>')
+        else:
+            anchors.append(f'<a href="/section/{i % 40}/item-{i}?ref=menu">item {i}</a>')
+    return (
+        "<html><head><title>Synthetic benchmark page</title></head><body><nav>"
+        + "".join(anchors)
+        + "</nav></body></html>"
+    )
+
+
+def extract_per_element(page):
+    """
+    روش قبلی: یک رفت‌وبرگشت IPC برای هر پیوند
+    """
+    title = page.title()
+    link_elements = page.query_selector_all("a[href]")
+    base_url = page.url
+    raw_links = []
+    for element in link_elements:
+        href = element.get_attribute('href')
+        if href:
+            raw_links.append(href)
+    return title, base_url, raw_links
+
+
+def time_extraction(extract, page, repeats):
+    """
+    میانگین زمان اجرای یک روش استخراج بر حسب میلی‌ثانیه
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = extract(page)
+    elapsed = (time.perf_counter() - start) / repeats
+    return elapsed * 1000, len(result[2])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    engine = CrawlEngine()
+
+    with sync_playwright() as playwright:
+        browser = engine._launch_crawl_browser(playwright, headless=True)
+        context = engine._new_crawl_context(browser)
+        page = context.new_page()
+        # آدرس واقعی برای تبدیل پیوندهای نسبی (محتوا با set_content جایگزین می‌شود)
+        page.goto("about:blank")
+
+        print(f"{'anchors':>8} | {'per-element (ms)':>17} | {'batched (ms)':>13} | {'speedup':>8}")
+        print("-" * 56)
+        for anchor_count in ANCHOR_COUNTS:
+            page.set_content(build_synthetic_page(anchor_count))
+
+            old_ms, old_links = time_extraction(extract_per_element, page, repeats)
+            new_ms, new_links = time_extraction(engine._extract_page_links, page, repeats)
+            assert old_links == new_links, "both methods must return the same links"
+
+            print(f"{anchor_count:>8} | {old_ms:>17.1f} | {new_ms:>13.1f} | {old_ms / new_ms:>7.1f}x")
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
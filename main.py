@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, unquote_plus
 from playwright.sync_api import sync_playwright, TimeoutError, Error
 from collections import deque
 import time
@@ -10,930 +10,5280 @@ import queue
 import json
 import os
 import datetime
+import csv
 import subprocess
 import re  # Added import for regular expressions
+import hashlib
+import socket
+import urllib.request
+import math
+import sqlite3
+import heapq
+import random
+import itertools
+import email.utils
+import multiprocessing
+import operator
+import fnmatch
+from html.parser import HTMLParser
 
-class WebsiteTesterApp:
+
+class BloomFilter:
     """
-    کلاس اصلی برنامه آزمون وب‌سایت‌ها با Tkinter و Playwright
+    فیلتر Bloom با ظرفیت ثابت برای نگهداری مجموعه آدرس‌ها با حافظه بسیار کم
+    (پاسخ منفی همیشه درست است؛ پاسخ مثبت با احتمال error_rate اشتباه است)
     """
-    def __init__(self, master):
+    def __init__(self, capacity, error_rate):
         """
-        راه‌اندازی اولیه برنامه
-        :param master: پنجره اصلی Tkinter
+        :param capacity: تعداد عناصری که با نرخ خطای مشخص شده قابل نگهداری است
+        :param error_rate: احتمال مثبت کاذب
         """
-        self.master = master
-        self.master.title("Website Test Tool - Alpha")
-        self.master.resizable(False, False)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    @staticmethod
+    def hashes(item):
+        """
+        دو مقدار ۶۴ بیتی از یک digest؛ تمام موقعیت‌ها با double hashing از این دو ساخته می‌شوند
+        تا فیلترهای متوالی ScalableBloomFilter بتوانند یک بار هش را محاسبه کنند
+        """
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, item, hashes=None):
+        added = False
+        for position in self._positions(hashes or self.hashes(item)):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, item):
+        return self.contains_hashes(self.hashes(item))
+
+    def contains_hashes(self, hashes):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(hashes))
+
+    def __len__(self):
+        return self.count
+
+
+class ScalableBloomFilter:
+    """
+    فیلتر Bloom قابل گسترش: با پر شدن هر فیلتر، فیلتر بزرگ‌تری با نرخ خطای کمتر اضافه می‌شود
+    تا نرخ خطای کل محدود بماند و نیازی به دانستن تعداد آدرس‌ها از قبل نباشد
+    """
+    def __init__(self, initial_capacity=100000, error_rate=0.0001, growth=4, tightening=0.5):
+        """
+        :param initial_capacity: ظرفیت فیلتر اول
+        :param error_rate: حداکثر نرخ مثبت کاذب کل
+        :param growth: ضریب رشد ظرفیت هر فیلتر نسبت به فیلتر قبلی
+        :param tightening: ضریب کاهش نرخ خطای هر فیلتر نسبت به فیلتر قبلی
+        """
+        self.growth = growth
+        self.tightening = tightening
+        # نرخ خطای فیلتر اول طوری انتخاب می‌شود که مجموع سری هندسی از error_rate بیشتر نشود
+        self._filters = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    def add(self, item):
+        hashes = BloomFilter.hashes(item)
+        if any(bloom.contains_hashes(hashes) for bloom in self._filters):
+            return
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * self.growth, current.error_rate * self.tightening)
+            self._filters.append(current)
+        current.add(item, hashes)
+
+    def __contains__(self, item):
+        hashes = BloomFilter.hashes(item)
+        return any(bloom.contains_hashes(hashes) for bloom in self._filters)
+
+    def __len__(self):
+        return sum(len(bloom) for bloom in self._filters)
+
+    @property
+    def memory_bytes(self):
+        return sum(len(bloom._bits) for bloom in self._filters)
+
+
+class CrawlFrontier:
+    """
+    صف مشترک آدرس‌های در انتظار خزش که بین چند کارگر همزمان به اشتراک گذاشته می‌شود.
+    تکرار آدرس‌ها هنگام افزودن به صف حذف می‌شود، پس اندازه صف به تعداد صفحات
+    (و نه تعداد لینک‌ها) وابسته است
+    """
+    def __init__(self, start_url, max_depth, seen_urls=None):
+        """
+        :param start_url: آدرس شروع خزش
+        :param max_depth: حداکثر عمق خزش
+        :param seen_urls: مجموعه آدرس‌های دیده شده (set یا ScalableBloomFilter)
+        """
+        self.max_depth = max_depth
+        self._seen = seen_urls if seen_urls is not None else set()
+        self._seen.add(start_url)
+        self._queue = deque([(start_url, 0, None)])
+        self._in_flight = 0
+        self._deferred = 0  # صفحاتی که منتظر تلاش مجدد هستند
+        self._dispatched = 0
+        self._level = 0
+        self._closed = False
+        self.peak_queue_length = 1
+        self._condition = threading.Condition()
+
+    def get(self):
+        """
+        دریافت آدرس بعدی برای خزش؛ تا زمانی که صف خالی است و صفحاتی در حال پردازش هستند صبر می‌کند.
+        صفحات عمق بعدی تنها پس از پایان تمام صفحات عمق فعلی تحویل داده می‌شوند تا مجموعه
+        صفحات خزش شده دقیقاً مانند خزش ترتیبی (BFS) باشد
+
+        :return: tuple شامل (آدرس، عمق، آدرس والد، شماره صفحه) یا None در پایان خزش
+        """
+        with self._condition:
+            while True:
+                while self._queue and not self._closed:
+                    url, depth, parent_url = self._queue[0]
+                    if depth > self.max_depth:
+                        self._queue.popleft()
+                        continue
+                    if depth > self._level and (self._in_flight > 0 or self._deferred > 0):
+                        # صفحات عمق فعلی هنوز در حال پردازش یا منتظر تلاش مجدد هستند
+                        break
+                    self._queue.popleft()
+                    self._level = depth
+                    self._in_flight += 1
+                    self._dispatched += 1
+                    return url, depth, parent_url, self._dispatched
+
+                # اگر هیچ صفحه‌ای در حال پردازش نباشد، لینک جدیدی هم اضافه نخواهد شد
+                if self._closed or (self._in_flight == 0 and self._deferred == 0 and not self._queue):
+                    self._closed = True
+                    self._condition.notify_all()
+                    return None
+
+                self._condition.wait()
+
+    def put_links(self, links, depth, parent_url):
+        """
+        افزودن لینک‌های داخلی یک صفحه به صف؛ لینک‌هایی که قبلاً دیده شده‌اند اضافه نمی‌شوند.
+        به دلیل پردازش عمق به عمق، اولین مشاهده هر آدرس کمترین عمق آن است
+
+        :return: لیست لینک‌هایی که به صف اضافه شدند
+        """
+        queued = []
+        with self._condition:
+            for link in links:
+                if link not in self._seen:
+                    self._seen.add(link)
+                    self._queue.append((link, depth, parent_url))
+                    queued.append(link)
+            self.peak_queue_length = max(self.peak_queue_length, len(self._queue))
+            self._condition.notify_all()
+        return queued
+
+    def unseen_links(self, links):
+        """
+        لینک‌هایی که هرگز به صف اضافه نشده‌اند (بدون افزودن آن‌ها به مجموعه دیده شده)
+        """
+        with self._condition:
+            return [link for link in links if link not in self._seen]
+
+    def mark_seen(self, urls):
+        """
+        ثبت آدرس‌هایی که بدون خزش پوشش داده شده‌اند (نام‌های دیگر صفحه‌ای که خزش شد)
+
+        :return: آدرس‌هایی که پیش از این دیده نشده بودند
+        """
+        marked = []
+        with self._condition:
+            for url in urls:
+                if url not in self._seen:
+                    self._seen.add(url)
+                    marked.append(url)
+        return marked
+
+    def retry_later(self, url, depth, parent_url, schedule):
+        """
+        بازگرداندن صفحه‌ای که با خطای گذرا مواجه شد به صف پس از تأخیر؛
+        تا آن زمان عمق فعلی تمام شده محسوب نمی‌شود
+
+        :param schedule: تابعی که callback بازگشت به صف را زمان‌بندی می‌کند و موفقیت آن را برمی‌گرداند
+        :return: True اگر تلاش مجدد زمان‌بندی شد
+        """
+        with self._condition:
+            self._deferred += 1
+        if schedule(lambda: self._requeue(url, depth, parent_url)):
+            with self._condition:
+                # شماره صفحه هنگام تلاش مجدد دوباره اختصاص داده می‌شود
+                self._dispatched -= 1
+            return True
+        with self._condition:
+            self._deferred -= 1
+        return False
+
+    def _requeue(self, url, depth, parent_url):
+        with self._condition:
+            self._deferred -= 1
+            self._queue.appendleft((url, depth, parent_url))
+            self._condition.notify_all()
+
+    def restore(self, pending_items, seen_urls, pages_done):
+        """
+        بازگرداندن وضعیت صف از checkpoint پیش از شروع خزش
+
+        :param pending_items: لیست (آدرس، عمق، آدرس والد) آدرس‌های خزش نشده به ترتیب عمق
+        :param seen_urls: تمام آدرس‌هایی که قبلاً به صف اضافه شده‌اند
+        :param pages_done: تعداد صفحات خزش شده در اجرای قبلی (برای ادامه شماره‌گذاری)
+        """
+        with self._condition:
+            for url in seen_urls:
+                self._seen.add(url)
+            self._queue = deque(pending_items)
+            self._dispatched = pages_done
+            self.peak_queue_length = max(1, len(self._queue))
+
+    def task_done(self):
+        """
+        اعلام پایان پردازش صفحه‌ای که با get دریافت شده بود
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        توقف خزش؛ کارگرها پس از اتمام صفحه فعلی خارج می‌شوند
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def pages_dispatched(self):
+        with self._condition:
+            return self._dispatched
+
+
+class PageLinkParser(HTMLParser):
+    """
+    تجزیه‌گر سبک HTML برای استخراج عنوان، پیوندهای a[href] و میزان متن قابل مشاهده
+    بدون نیاز به مرورگر
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title_parts = []
+        self.hrefs = []
+        self.canonical_href = None
+        self.script_count = 0
+        self.visible_text_length = 0
+        self._in_title = False
+        self._title_seen = False
+        self._skip_depth = 0  # داخل script/style/noscript/template
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                # مانند get_attribute، مقدار خالی نادیده گرفته می‌شود
+                if name == 'href' and value:
+                    self.hrefs.append(value)
+                    break
+        elif tag == 'link' and self.canonical_href is None:
+            attributes = dict(attrs)
+            if 'canonical' in (attributes.get('rel') or '').lower().split() and attributes.get('href'):
+                self.canonical_href = attributes['href']
+        elif tag == 'title' and not self._title_seen:
+            self._in_title = True
+        elif tag in ('script', 'style', 'noscript', 'template'):
+            if tag == 'script':
+                self.script_count += 1
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._in_title:
+            self._in_title = False
+            self._title_seen = True
+        elif tag in ('script', 'style', 'noscript', 'template') and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self.visible_text_length += len(data.strip())
+
+    @property
+    def title(self):
+        # document.title فاصله‌های اضافی را حذف می‌کند
+        return ' '.join(''.join(self.title_parts).split())
+
+
+class UrlCanonicalizer:
+    """
+    تبدیل گونه‌های مختلف یک آدرس به شکل یکتا تا هر صفحه فقط یک بار خزش شود:
+    حروف کوچک دامنه، حذف پورت پیش‌فرض، حذف پارامترهای ردیابی و نشست، مرتب‌سازی
+    پارامترها و (اختیاری) حذف اسلش انتهایی مسیر
+    """
+    DEFAULT_PORTS = {'http': '80', 'https': '443'}
+    # پارامترهایی که محتوای صفحه را تغییر نمی‌دهند؛ * در انتها یعنی هر پارامتر با این پیشوند
+    DEFAULT_DENIED_PARAMS = (
+        'utm_*', 'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+        'phpsessid', 'jsessionid', 'aspsessionid', 'sessionid',
+    )
+
+    def __init__(self, sort_query=True, denied_params=DEFAULT_DENIED_PARAMS, lowercase_host=True,
+                 remove_default_port=True, fold_trailing_slash=False):
+        """
+        :param sort_query: مرتب‌سازی پارامترهای query بر اساس نام
+        :param denied_params: نام پارامترهایی که حذف می‌شوند (بدون حساسیت به حروف بزرگ و کوچک)
+        :param lowercase_host: تبدیل دامنه به حروف کوچک
+        :param remove_default_port: حذف :80 و :443 برای http و https
+        :param fold_trailing_slash: یکسان دانستن /path و /path/
+        """
+        self.sort_query = sort_query
+        self.lowercase_host = lowercase_host
+        self.remove_default_port = remove_default_port
+        self.fold_trailing_slash = fold_trailing_slash
+        denied = [name.lower() for name in denied_params]
+        self._denied_names = {name for name in denied if not name.endswith('*')}
+        self._denied_prefixes = tuple(name[:-1] for name in denied if name.endswith('*'))
+
+    def _is_denied(self, name):
+        name = unquote_plus(name).lower()
+        return name in self._denied_names or (self._denied_prefixes and name.startswith(self._denied_prefixes))
+
+    def canonicalize(self, url):
+        """
+        :param url: آدرس مطلق http یا https (بدون fragment)
+        :return: شکل یکتای آدرس
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
         
-        # تنظیم اندازه و موقعیت پنجره
-        self.window_width = 800
-        self.window_height = 600
-        screen_width = self.master.winfo_screenwidth()
-        screen_height = self.master.winfo_screenheight()
-        x_position = (screen_width - self.window_width) // 2
-        y_position = (screen_height - self.window_height) // 2
-        self.master.geometry(f"{self.window_width}x{self.window_height}+{x_position}+{y_position}")
+        userinfo, at, hostport = parts.netloc.rpartition('@')
+        host, port = hostport, ''
+        if not hostport.endswith(']') and ':' in hostport:
+            host, _, port = hostport.rpartition(':')
+        if self.lowercase_host:
+            host = host.lower()
+        if self.remove_default_port and port == self.DEFAULT_PORTS.get(scheme):
+            port = ''
+        netloc = f"{userinfo}{at}{host}{':' + port if port else ''}"
         
-        # متغیرهای مربوط به Playwright و مرورگر
-        self.playwright = None
-        self.browser = None
-        self.browser_context = None
+        path = parts.path or '/'
+        if ';' in path:
+            # شناسه نشست در پارامترهای مسیر (مانند ;jsessionid=...)
+            segments = path.split(';')
+            path = ';'.join([segments[0]] + [
+                segment for segment in segments[1:] if not self._is_denied(segment.partition('=')[0])
+            ])
+        if self.fold_trailing_slash and len(path) > 1 and path.endswith('/'):
+            path = path.rstrip('/') or '/'
         
-        # وضعیت برنامه
-        self._crawling_in_progress = False
-        self.has_crawl_data = False
-        self.crawled_pages_data = {}
-        self.start_url = ""
+        query = parts.query
+        if query:
+            # بخش‌های query بدون decode و encode دوباره حفظ می‌شوند تا معنای آدرس تغییر نکند
+            params = [param for param in query.split('&') if param and not self._is_denied(param.partition('=')[0])]
+            if self.sort_query:
+                params.sort(key=lambda param: param.partition('=')[0])
+            query = '&'.join(params)
         
-        # متغیرهای گزارش لینک‌ها
-        self.all_broken_links = []           
-        self.all_external_links_info = []    
+        return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class PagePool:
+    """
+    مخزن صفحات قابل استفاده مجدد برای یک زمینه مرورگر.
+    صفحات بین آدرس‌ها با رفتن به about:blank و حذف listener ها بازنشانی می‌شوند
+    و پس از max_uses بار استفاده بسته و با صفحه جدید جایگزین می‌شوند
+    """
+    def __init__(self, browser_context, max_uses=50, record_stat=None):
+        """
+        :param browser_context: زمینه مرورگری که صفحات در آن ساخته می‌شوند
+        :param max_uses: حداکثر تعداد استفاده از هر صفحه پیش از بازسازی
+        :param record_stat: تابع ثبت آمار (نام، مقدار)
+        """
+        self.max_uses = max_uses
+        self._context = browser_context
+        self._record_stat = record_stat or (lambda name, amount=1: None)
+        self._idle = []
+        self._uses = {}
+        self._listeners = {}
+
+    def acquire(self):
+        """
+        دریافت یک صفحه آماده؛ در صورت خالی بودن مخزن صفحه جدید ساخته می‌شود
+        """
+        while self._idle:
+            page = self._idle.pop()
+            if not page.is_closed():
+                self._record_stat('page_pool_hits')
+                return page
+            self._uses.pop(page, None)
         
-        # متغیرهای جدید برای threading
-        self.ui_queue = queue.Queue()
-        self.crawl_thread = None
+        start_time = time.perf_counter()
+        page = self._context.new_page()
+        self._record_stat('page_pool_misses')
+        self._record_stat('page_pool_create_ms', (time.perf_counter() - start_time) * 1000)
+        self._uses[page] = 0
+        return page
+
+    def add_listener(self, page, event, handler):
+        """
+        ثبت listener روی صفحه به طوری که هنگام بازگشت صفحه به مخزن حذف شود
+        """
+        page.on(event, handler)
+        self._listeners.setdefault(page, []).append((event, handler))
+
+    def release(self, page):
+        """
+        بازگرداندن صفحه به مخزن پس از بازنشانی آن
+        """
+        for event, handler in self._listeners.pop(page, []):
+            try:
+                page.remove_listener(event, handler)
+            except Exception:
+                pass
         
-        # متغیر برای سناریوی فعلی
-        self.current_scenario = None
+        uses = self._uses.get(page, 0) + 1
+        if uses >= self.max_uses or page.is_closed():
+            self._record_stat('page_pool_recycled')
+            self._discard(page)
+            return
         
-        # دایرکتوری پیش‌فرض برای ذخیره خودکار گزارش‌ها
-        self.default_auto_save_dir = os.path.join(os.path.expanduser("~"), "WebsiteTesterApp_Reports")
-        # ایجاد دایرکتوری پیش‌فرض اگر وجود نداشته باشد
         try:
-            os.makedirs(self.default_auto_save_dir, exist_ok=True)
-        except Exception as e:
-            print(f"خطا در ایجاد دایرکتوری پیش‌فرض ذخیره‌سازی: {e}")
-        
-        # ایجاد ابزارک‌های رابط کاربری
-        self._create_widgets()
+            # sessionStorage به زبانه وابسته است و با تغییر آدرس پاک نمی‌شود
+            page.evaluate("() => { try { sessionStorage.clear(); } catch (e) {} }")
+            page.goto("about:blank")
+        except Exception:
+            self._discard(page)
+            return
         
-        # اطمینان از بستن مرورگر در زمان خروج
-        self.master.protocol("WM_DELETE_WINDOW", self._on_closing)
+        self._uses[page] = uses
+        self._idle.append(page)
 
-        # شروع پردازش پیام‌های UI
-        self._process_ui_queue()
-    
-    def _create_widgets(self):
+    def _discard(self, page):
+        self._uses.pop(page, None)
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def close(self):
         """
-        ایجاد و چیدمان تمام ابزارک‌های رابط کاربری
+        بستن تمام صفحات آزاد مخزن
         """
-        # فریم بالایی برای ورود آدرس و دکمه‌ها
-        self.top_frame = tk.Frame(self.master)
-        self.top_frame.pack(fill='x', padx=10, pady=5)
-        
-        # بخش ورود آدرس سایت
-        self.url_label = tk.Label(self.top_frame, text="Enter Website URL:", font=("Arial", 10))
-        self.url_label.pack(side='left', pady=5)
-        
-        self.url_entry = tk.Entry(self.top_frame, width=50, font=("Arial", 10))
-        self.url_entry.pack(side='left', padx=5, pady=5, expand=True, fill='x')
-        
-        # افزودن فیلد تنظیم حداکثر عمق خزش
-        self.max_depth_label = tk.Label(self.top_frame, text="Max Crawl Depth:", font=("Arial", 10))
-        self.max_depth_label.pack(side='left', pady=5)
-        
-        self.max_depth_entry = tk.Entry(self.top_frame, width=5, font=("Arial", 10))
-        self.max_depth_entry.insert(0, "1")  # مقدار پیش‌فرض
-        self.max_depth_entry.pack(side='left', padx=(0, 5), pady=5)
-        
-        # دکمه شروع آزمون
-        self.start_button = tk.Button(
-            self.top_frame, 
-            text="Start Test", 
-            font=("Arial", 10),
-            command=self._handle_start_test
-        )
-        self.start_button.pack(side='left', pady=5, padx=5)
-        
-        # دکمه ذخیره گزارش‌ها
-        self.save_reports_button = tk.Button(
-            self.top_frame,
-            text="Save Reports",
-            font=("Arial", 10),
-            command=self._handle_save_reports,
-            state=tk.DISABLED  # در ابتدا غیرفعال است
-        )
-        self.save_reports_button.pack(side='left', pady=5, padx=5)
-        
-        # فریم دوم برای ورود فایل سناریو و ضبط سناریو
-        self.scenario_frame = tk.Frame(self.master)
-        self.scenario_frame.pack(fill='x', padx=10, pady=0)
-        
-        # برچسب فایل سناریو
-        self.scenario_label = tk.Label(self.scenario_frame, text="Scenario File (JSON):", font=("Arial", 10))
-        self.scenario_label.pack(side='left', pady=5)
-        
-        # ورودی مسیر فایل سناریو
-        self.scenario_file_entry = tk.Entry(self.scenario_frame, width=50, font=("Arial", 10))
-        self.scenario_file_entry.pack(side='left', padx=5, pady=5, expand=True, fill='x')
-        
-        # دکمه مرور برای انتخاب فایل سناریو
-        self.browse_scenario_button = tk.Button(
-            self.scenario_frame,
-            text="Browse...",
-            font=("Arial", 10),
-            command=self._browse_for_scenario_file
-        )
-        self.browse_scenario_button.pack(side='left', pady=5, padx=5)
+        while self._idle:
+            self._discard(self._idle.pop())
+
+
+class HostSlot:
+    """
+    مجوز یک درخواست به یک دامنه که با with گرفته و آزاد می‌شود؛
+    کد وضعیت پاسخ در status ثبت می‌شود تا زمان‌بند بر اساس آن ظرفیت دامنه را تنظیم کند
+    """
+    def __init__(self, scheduler, url):
+        self.scheduler = scheduler
+        self.url = url
+        self.host = urlparse(url).netloc.lower()
+        self.status = None
+        self.started = None
+
+    def __enter__(self):
+        self.scheduler._acquire(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # تایم‌اوت‌های requests و Playwright هر دو در نام کلاس Timeout دارند
+        timed_out = exc_type is not None and 'timeout' in exc_type.__name__.lower()
+        self.scheduler._release(self, timed_out)
+        return False
+
+
+class HostScheduler:
+    """
+    زمان‌بند مؤدبانه درخواست‌ها به تفکیک دامنه: سقف درخواست‌های همزمان و فاصله حداقل بین درخواست‌ها،
+    رعایت Crawl-delay فایل robots.txt و تنظیم تطبیقی ظرفیت به روش AIMD
+    (افزایش جمعی در پاسخ‌های سالم، کاهش ضربی با افزایش تأخیر یا پاسخ‌های 429 و 503)
+    """
+    # افزایش میانگین تأخیر نسبت به بهترین مقدار دیده شده که نشانه فشار روی سرور است
+    LATENCY_BACKOFF_FACTOR = 2.0
+    LATENCY_BACKOFF_MIN_S = 0.2
+    THROTTLE_STATUSES = (429, 503)
+    MAX_BACKOFF_DELAY_S = 30.0
+    # Crawl-delay های بزرگ‌تر از این مقدار محدود می‌شوند تا خزش عملاً متوقف نشود
+    MAX_CRAWL_DELAY_S = 30.0
+    ROBOTS_TIMEOUT_S = 5
+
+    def __init__(self, max_per_host=8, min_delay_ms=0, respect_crawl_delay=True, adaptive=True,
+                 share=1, user_agent=None, record_stat=None):
+        """
+        :param max_per_host: حداکثر درخواست همزمان به هر دامنه
+        :param min_delay_ms: حداقل فاصله بین شروع دو درخواست به یک دامنه (میلی‌ثانیه)
+        :param respect_crawl_delay: رعایت Crawl-delay در robots.txt هر دامنه
+        :param adaptive: تنظیم تطبیقی ظرفیت هر دامنه (در غیر این صورت ظرفیت ثابت max_per_host است)
+        :param share: تعداد فرآیندهایی که سهم مساوی از ظرفیت هر دامنه دارند
+        :param user_agent: user agent درخواست robots.txt
+        :param record_stat: تابع ثبت آمار (نام، مقدار)
+        """
+        self.max_per_host = max(1, max_per_host // share)
+        self.share = share
+        self.min_delay = min_delay_ms / 1000 * share
+        self.respect_crawl_delay = respect_crawl_delay
+        self.adaptive = adaptive
+        self.user_agent = user_agent
+        self._record_stat = record_stat
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def slot(self, url):
+        """
+        :return: HostSlot برای استفاده در with
+        """
+        return HostSlot(self, url)
+
+    def _host_state(self, slot):
+        with self._condition:
+            state = self._hosts.get(slot.host)
+            fetch_robots = state is None
+            if fetch_robots:
+                state = {
+                    'limit': 1.0 if self.adaptive else float(self.max_per_host),
+                    'active': 0,
+                    'base_delay': self.min_delay,
+                    'delay': self.min_delay,
+                    'next_start': 0.0,
+                    'latency': None,
+                    'best_latency': None,
+                    'last_backoff': 0.0,
+                    'ready': threading.Event(),
+                }
+                self._hosts[slot.host] = state
         
-        # دکمه ضبط سناریو
-        self.record_scenario_button = tk.Button(
-            self.scenario_frame,
-            text="Record Scenario",
-            font=("Arial", 10),
-            command=self._handle_record_scenario
-        )
-        self.record_scenario_button.pack(side='left', pady=5, padx=5)
+        if fetch_robots:
+            crawl_delay = self._robots_crawl_delay(slot.url) if self.respect_crawl_delay else None
+            with self._condition:
+                if crawl_delay:
+                    state['base_delay'] = max(state['base_delay'], min(crawl_delay, self.MAX_CRAWL_DELAY_S) * self.share)
+                    state['delay'] = state['base_delay']
+                    self._stat('robots_crawl_delay_hosts')
+            state['ready'].set()
+        else:
+            state['ready'].wait(self.ROBOTS_TIMEOUT_S + 1)
+        return state
+
+    def _robots_crawl_delay(self, url):
+        """
+        خواندن Crawl-delay از robots.txt دامنه
+
+        :return: فاصله بر حسب ثانیه یا None
+        """
+        parsed_url = urlparse(url)
+        try:
+            response = requests.get(
+                f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt",
+                timeout=self.ROBOTS_TIMEOUT_S,
+                headers={'User-Agent': self.user_agent} if self.user_agent else None
+            )
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return self._parse_crawl_delay(response.text)
+
+    @staticmethod
+    def _parse_crawl_delay(robots_text):
+        """
+        استخراج Crawl-delay گروه * از متن robots.txt
+        (urllib.robotparser مقادیر اعشاری مانند 0.5 را نادیده می‌گیرد و user agent مرورگری
+        که ارسال می‌کنیم با هیچ گروه اختصاصی مطابقت ندارد)
+        """
+        group_agents = []
+        in_agent_lines = False
+        for line in robots_text.splitlines():
+            field, _, value = line.split('#', 1)[0].partition(':')
+            field = field.strip().lower()
+            value = value.strip()
+            if field == 'user-agent':
+                # خطوط user-agent پشت سر هم یک گروه را تشکیل می‌دهند
+                if not in_agent_lines:
+                    group_agents = []
+                group_agents.append(value)
+                in_agent_lines = True
+            elif field:
+                in_agent_lines = False
+                if field == 'crawl-delay' and '*' in group_agents:
+                    try:
+                        return float(value)
+                    except ValueError:
+                        return None
+        return None
+
+    def _acquire(self, slot):
+        state = self._host_state(slot)
+        wait_start = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                has_capacity = state['active'] < int(state['limit'])
+                if has_capacity and now >= state['next_start']:
+                    break
+                self._condition.wait(state['next_start'] - now if has_capacity else None)
+            state['active'] += 1
+            state['next_start'] = now + state['delay']
+        slot.started = time.monotonic()
+        waited_ms = (slot.started - wait_start) * 1000
+        if waited_ms >= 1:
+            self._stat('host_wait_ms', waited_ms)
+
+    def _release(self, slot, timed_out):
+        now = time.monotonic()
+        latency = now - slot.started
+        throttled = slot.status in self.THROTTLE_STATUSES
+        timed_out = timed_out or (isinstance(slot.status, str) and 'Timeout' in slot.status)
+        if throttled:
+            self._stat('host_throttled_responses')
         
-        # دکمه جدید تبدیل اسکریپت به JSON
-        self.convert_script_button = tk.Button(
-            self.scenario_frame,
-            text="Convert Script...",
-            font=("Arial", 10),
-            command=self._handle_convert_script_to_json
-        )
+        with self._condition:
+            state = self._hosts[slot.host]
+            state['active'] -= 1
+            if self.adaptive:
+                if state['latency'] is None:
+                    state['latency'] = latency
+                    state['best_latency'] = latency
+                else:
+                    state['latency'] = 0.8 * state['latency'] + 0.2 * latency
+                    state['best_latency'] = min(state['best_latency'], state['latency'])
+                slow = (state['latency'] > state['best_latency'] * self.LATENCY_BACKOFF_FACTOR
+                        and state['latency'] - state['best_latency'] > self.LATENCY_BACKOFF_MIN_S)
+                
+                if throttled or timed_out or slow:
+                    # حداکثر یک کاهش در هر رفت‌وبرگشت، تا پاسخ‌های همزمان یک موج ظرفیت را صفر نکنند
+                    if now - state['last_backoff'] >= max(state['latency'], 0.5):
+                        state['limit'] = max(1.0, state['limit'] / 2)
+                        state['last_backoff'] = now
+                        self._stat('host_backoffs')
+                    if throttled or timed_out:
+                        state['delay'] = min(self.MAX_BACKOFF_DELAY_S, max(state['delay'] * 2, 1.0))
+                        state['next_start'] = max(state['next_start'], now + state['delay'])
+                else:
+                    state['limit'] = min(float(self.max_per_host), state['limit'] + 1 / state['limit'])
+                    state['delay'] = max(state['base_delay'], state['delay'] / 2)
+                    if state['delay'] - state['base_delay'] < 0.01:
+                        state['delay'] = state['base_delay']
+            self._condition.notify_all()
+
+    def _stat(self, name, amount=1):
+        if self._record_stat:
+            self._record_stat(name, amount)
+
+    def host_limits(self):
+        """
+        :return: دیکشنری دامنه -> ظرفیت همزمان فعلی
+        """
+        with self._condition:
+            return {host: int(state['limit']) for host, state in self._hosts.items()}
+
+
+class RetryScheduler:
+    """
+    صف تلاش‌های مجدد با تأخیر برای خطاهای گذرا (تایم‌اوت، قطع اتصال، 429 و 503).
+    callback هر تلاش مجدد در موعد خود در یک thread جداگانه اجرا می‌شود تا کارگرها
+    برای آدرس‌های سالم منتظر نمانند. تأخیر به صورت نمایی با سقف و jitter افزایش می‌یابد،
+    Retry-After سرور رعایت می‌شود و هر نوع تلاش مجدد سهمیه مشخصی در هر اجرا دارد
+    """
+    def __init__(self, budgets, max_attempts=3, base_delay_ms=1000, max_delay_ms=30000,
+                 max_retry_after_s=120, record_stat=None, log=None):
+        """
+        :param budgets: دیکشنری نوع تلاش مجدد ('page' یا 'link') -> حداکثر تعداد تلاش مجدد در این اجرا
+        :param max_attempts: حداکثر تلاش مجدد برای هر آدرس
+        :param base_delay_ms: تأخیر اولین تلاش مجدد (میلی‌ثانیه)
+        :param max_delay_ms: سقف تأخیر نمایی (میلی‌ثانیه)
+        :param max_retry_after_s: Retry-After بزرگ‌تر از این مقدار یعنی صرف‌نظر از تلاش مجدد
+        :param record_stat: تابع ثبت آمار (نام، مقدار)
+        :param log: تابع ثبت پیام خطای callback ها (متن)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.max_retry_after = max_retry_after_s
+        self._budgets = dict(budgets)
+        self._record_stat = record_stat or (lambda name, amount=1: None)
+        self._log = log or print
+        self._attempts = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        تبدیل سرآیند Retry-After (ثانیه یا تاریخ HTTP) به ثانیه؛ None برای مقدار نامعتبر
+        """
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+    def delay_for(self, attempt, retry_after=None):
+        """
+        تأخیر تلاش مجدد شماره attempt (از صفر): نیمی ثابت و نیمی تصادفی از backoff نمایی
+        تا تلاش‌های مجدد هم‌زمان پخش شوند؛ هرگز کمتر از Retry-After سرور نیست
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        delay = random.uniform(backoff / 2, backoff)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def attempts(self, kind, key):
+        with self._condition:
+            return self._attempts.get((kind, key), 0)
+
+    def schedule(self, kind, key, callback, retry_after=None):
+        """
+        زمان‌بندی یک تلاش مجدد در صورت باقی بودن سهمیه
+
+        :param kind: نوع تلاش مجدد ('page' یا 'link')
+        :param key: شناسه مورد تلاش مجدد (معمولاً آدرس)
+        :param callback: تابعی که در موعد تلاش مجدد اجرا می‌شود
+        :param retry_after: حداقل تأخیر درخواست شده توسط سرور (ثانیه)
+        :return: True اگر تلاش مجدد زمان‌بندی شد
+        """
+        with self._condition:
+            if self._closed or self.max_attempts == 0:
+                return False
+            attempt = self._attempts.get((kind, key), 0)
+            if attempt >= self.max_attempts or (retry_after is not None and retry_after > self.max_retry_after):
+                self._record_stat('retry_gave_up')
+                return False
+            if self._budgets.get(kind, 0) <= 0:
+                self._record_stat('retry_budget_exhausted')
+                return False
+            self._budgets[kind] -= 1
+            self._attempts[(kind, key)] = attempt + 1
+            due = time.monotonic() + self.delay_for(attempt, retry_after)
+            heapq.heappush(self._heap, (due, next(self._sequence), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        self._record_stat(f'{kind}_retries')
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                _due, _sequence, callback = heapq.heappop(self._heap)
+            self._run_callback(callback)
+
+    def _run_callback(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            self._log(f"Retry callback failed: {type(e).__name__}: {str(e)}\n")
+
+    def close(self):
+        """
+        توقف زمان‌بند؛ تلاش‌های مجدد باقی‌مانده بدون انتظار برای موعد خود بلافاصله اجرا می‌شوند
+        تا شمارنده‌های منتظر آن‌ها (مانند صفحات معوق CrawlFrontier) متعادل بمانند. پس از بسته شدن،
+        schedule تلاش مجدد جدیدی نمی‌پذیرد، پس هر مورد حداکثر یک بار دیگر امتحان می‌شود
+        """
+        with self._condition:
+            self._closed = True
+            pending = [callback for _due, _sequence, callback in sorted(self._heap)]
+            self._heap.clear()
+            self._condition.notify_all()
+        for callback in pending:
+            self._run_callback(callback)
+
+
+def shard_for_url(url, shard_count):
+    """
+    تعیین shard مالک یک آدرس بر اساس hash پایدار آدرس نرمال‌شده
+    (hash داخلی پایتون در هر فرآیند متفاوت است، پس از md5 استفاده می‌شود)
+    
+    :param url: آدرس نرمال‌شده
+    :param shard_count: تعداد کل shard ها
+    :return: شماره shard
+    """
+    digest = hashlib.md5(url.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+class ShardFrontier:
+    """
+    بخشی از صف خزش که متعلق به یک فرآیند shard است؛ همان رابط CrawlFrontier را دارد
+    و لینک‌های کشف‌شده را به صندوق ورودی shard مالک آن‌ها می‌فرستد.
+    مانند CrawlFrontier، عمق بعدی تنها پس از پایان عمق فعلی در تمام shard ها آغاز می‌شود
+    """
+    def __init__(self, shard_id, inboxes, pending_by_depth, current_level, done_event, max_depth,
+                 visited_urls=None, sent_urls=None):
+        """
+        :param shard_id: شماره این shard
+        :param inboxes: صف‌های ورودی تمام shard ها (multiprocessing.Queue)
+        :param pending_by_depth: شمارنده مشترک آدرس‌های ارسال شده و پردازش نشده به تفکیک عمق
+        :param current_level: عمقی که در حال حاضر در تمام shard ها خزش می‌شود
+        :param done_event: رویداد مشترک پایان خزش
+        :param max_depth: حداکثر عمق خزش
+        :param visited_urls: مجموعه آدرس‌های خزش شده این shard (set یا ScalableBloomFilter)
+        :param sent_urls: مجموعه آدرس‌هایی که این shard قبلاً ارسال کرده است
+        """
+        self.shard_id = shard_id
+        self.shard_count = len(inboxes)
+        self.max_depth = max_depth
+        self._inboxes = inboxes
+        self._inbox = inboxes[shard_id]
+        self._pending = pending_by_depth
+        self._current_level = current_level
+        self._done_event = done_event
+        self._held = deque()  # آدرس‌های عمق‌های بعدی که منتظر پایان عمق فعلی هستند
+        self._retries = deque()  # صفحاتی که موعد تلاش مجدد آن‌ها رسیده است
+        self._visited = visited_urls if visited_urls is not None else set()
+        # هر shard هر آدرس را حداکثر یک بار ارسال می‌کند تا صف‌ها با تعداد لینک‌ها رشد نکنند
+        self._sent = sent_urls if sent_urls is not None else set()
+        self._dispatched = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        دریافت آدرس بعدی از صندوق ورودی این shard
+
+        :return: tuple شامل (آدرس، عمق، آدرس والد، شماره صفحه) یا None در پایان خزش
+        """
+        while not self._done_event.is_set():
+            level = self._current_level.value
+            item = None
+            with self._lock:
+                if self._retries:
+                    # تلاش مجدد از بررسی تکرار عبور نمی‌کند (آدرس قبلاً به عنوان خزش شده ثبت شده است)
+                    url, depth, parent_url = self._retries.popleft()
+                    self._dispatched += 1
+                    return url, depth, parent_url, f"{self.shard_id}.{self._dispatched}"
+                if self._held and self._held[0][1] <= level:
+                    item = self._held.popleft()
+            
+            if item is None:
+                try:
+                    item = self._inbox.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+            
+            url, depth, parent_url = item
+            with self._lock:
+                if depth > level:
+                    # آدرس‌ها به ترتیب عمق دریافت می‌شوند، پس صف انتظار مرتب باقی می‌ماند
+                    self._held.append(item)
+                    continue
+                if url in self._visited:
+                    duplicate = True
+                else:
+                    duplicate = False
+                    self._visited.add(url)
+                    self._dispatched += 1
+                    page_number = f"{self.shard_id}.{self._dispatched}"
+            
+            if duplicate:
+                self._finish(depth)
+                continue
+            return url, depth, parent_url, page_number
+        return None
+
+    def put_links(self, links, depth, parent_url):
+        """
+        ارسال لینک‌های داخلی به shard مالک هر لینک
+
+        :return: لیست لینک‌هایی که ارسال شدند
+        """
+        queued = []
+        for link in links:
+            owner = shard_for_url(link, self.shard_count)
+            with self._lock:
+                if link in self._sent:
+                    continue
+                self._sent.add(link)
+                if owner == self.shard_id and link in self._visited:
+                    continue
+            # شمارنده قبل از ارسال افزایش می‌یابد تا پایان عمق زودتر از موعد تشخیص داده نشود
+            with self._pending.get_lock():
+                self._pending[depth] += 1
+            self._inboxes[owner].put((link, depth, parent_url))
+            queued.append(link)
+        return queued
+
+    def unseen_links(self, links):
+        """
+        لینک‌هایی که این shard نه ارسال و نه خزش کرده است (لینک‌های دیده شده در shard های دیگر
+        قابل تشخیص نیستند و در بدترین حالت یک بار بیهوده بررسی می‌شوند)
+        """
+        with self._lock:
+            return [link for link in links if link not in self._sent and link not in self._visited]
+
+    def mark_seen(self, urls):
+        """
+        مانند CrawlFrontier.mark_seen؛ آدرس‌های متعلق به shard های دیگر فقط از ارسال این shard حذف
+        می‌شوند و ممکن است توسط shard مالک (در صورت دریافت از صفحه دیگری) خزش شوند
+        """
+        marked = []
+        with self._lock:
+            for url in urls:
+                if url in self._sent or url in self._visited:
+                    continue
+                self._sent.add(url)
+                if shard_for_url(url, self.shard_count) == self.shard_id:
+                    self._visited.add(url)
+                marked.append(url)
+        return marked
+
+    def retry_later(self, url, depth, parent_url, schedule):
+        """
+        مانند CrawlFrontier.retry_later؛ شمارنده عمق تا بازگشت صفحه به صف نگه داشته می‌شود
+        """
+        with self._pending.get_lock():
+            self._pending[depth] += 1
+        
+        def _requeue():
+            with self._lock:
+                self._retries.append((url, depth, parent_url))
+        
+        if schedule(_requeue):
+            with self._lock:
+                self._dispatched -= 1
+            return True
+        with self._pending.get_lock():
+            self._pending[depth] -= 1
+        return False
+
+    def task_done(self):
+        """
+        اعلام پایان پردازش صفحه‌ای که با get دریافت شده بود
+        """
+        self._finish(self._current_level.value)
+
+    def _finish(self, depth):
+        """
+        کاهش شمارنده عمق و رفتن به عمق بعدی وقتی هیچ آدرسی از عمق فعلی باقی نمانده باشد
+        """
+        with self._pending.get_lock():
+            self._pending[depth] -= 1
+            while self._pending[self._current_level.value] <= 0:
+                if self._current_level.value >= self.max_depth:
+                    self._done_event.set()
+                    break
+                self._current_level.value += 1
+
+    def close(self):
+        self._done_event.set()
+
+    @property
+    def pages_dispatched(self):
+        with self._lock:
+            return self._dispatched
+
+
+class CrawlCheckpoint:
+    """
+    ذخیره تدریجی وضعیت خزش (صف، آدرس‌های دیده شده و نتایج صفحات) در SQLite با حالت WAL
+    تا خزش متوقف شده بدون دریافت دوباره صفحات تکمیل شده ادامه یابد.
+    نوشتن‌ها به صورت دسته‌ای commit می‌شوند؛ در صورت قطع ناگهانی حداکثر آخرین دسته دوباره خزش می‌شود
+    """
+    def __init__(self, path, batch_size=200, flush_interval=2.0, record_stat=None):
+        """
+        :param path: مسیر فایل پایگاه داده
+        :param batch_size: تعداد صفحاتی که پس از آن تغییرات commit می‌شوند
+        :param flush_interval: حداکثر فاصله زمانی بین دو commit (ثانیه)
+        :param record_stat: تابع ثبت آمار (نام، مقدار)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._record_stat = record_stat
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        # چند thread و چند فرآیند shard همزمان در یک فایل می‌نویسند
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, depth INTEGER, parent_url TEXT);
+            CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, data TEXT);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def path_for(directory, start_url, max_depth):
+        """
+        مسیر فایل checkpoint یک خزش؛ هر ترکیب آدرس شروع و عمق فایل مستقل دارد
+        """
+        key = hashlib.sha1(f"{start_url}|{max_depth}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(directory, f"crawl_{key}.sqlite")
+
+    @property
+    def closed(self):
+        return self._conn is None
+
+    def start(self, start_url, max_depth):
+        """
+        ثبت اطلاعات خزش و آدرس شروع در فایل جدید
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [('start_url', start_url), ('max_depth', str(max_depth)),
+                 ('created', datetime.datetime.now().isoformat(timespec='seconds'))]
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO frontier (url, depth, parent_url) VALUES (?, 0, NULL)", (start_url,)
+            )
+            self._conn.commit()
+
+    def has_progress(self):
+        """
+        :return: True اگر حداقل یک صفحه در این فایل ثبت شده باشد
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pages LIMIT 1").fetchone() is not None
+
+    def load_pages(self):
+        """
+        :return: دیکشنری نتایج صفحات خزش شده (آدرس -> داده صفحه)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url, data FROM pages").fetchall()
+        return {url: json.loads(data) for url, data in rows}
+
+    def load_pending(self):
+        """
+        :return: لیست (آدرس، عمق، آدرس والد) آدرس‌های صف که هنوز خزش نشده‌اند، به ترتیب عمق
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT frontier.url, frontier.depth, frontier.parent_url FROM frontier "
+                "LEFT JOIN pages ON pages.url = frontier.url "
+                "WHERE pages.url IS NULL ORDER BY frontier.depth, frontier.rowid"
+            ).fetchall()
+
+    def iter_seen_urls(self):
+        """
+        تمام آدرس‌هایی که تاکنون به صف اضافه شده‌اند (خزش شده یا در انتظار)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM frontier").fetchall()
+        return (row[0] for row in rows)
+
+    def iter_page_urls(self):
+        """
+        آدرس صفحاتی که خزش آن‌ها تکمیل شده است
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM pages").fetchall()
+        return (row[0] for row in rows)
+
+    def record_page(self, url, page_data, queued_links=(), child_depth=None):
+        """
+        ثبت نتیجه یک صفحه همراه با لینک‌هایی که از آن به صف اضافه شدند؛ هر دو در یک
+        تراکنش قرار می‌گیرند تا پس از ادامه خزش هیچ لینکی از صفحات تکمیل شده گم نشود
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            start = time.perf_counter()
+            if queued_links:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO frontier (url, depth, parent_url) VALUES (?, ?, ?)",
+                    [(link, child_depth, url) for link in queued_links]
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, data) VALUES (?, ?)",
+                (url, json.dumps(page_data, ensure_ascii=False))
+            )
+            self._uncommitted += 1
+            if (self._uncommitted >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.flush_interval):
+                self._commit()
+            if self._record_stat:
+                self._record_stat('checkpoint_ms', (time.perf_counter() - start) * 1000)
+
+    def _commit(self):
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        if self._record_stat:
+            self._record_stat('checkpoint_commits')
+
+    def close(self):
+        """
+        commit تغییرات باقی‌مانده و بستن فایل؛ فایل برای ادامه خزش در اجرای بعدی باقی می‌ماند
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def reset(self):
+        """
+        پاک کردن وضعیت ذخیره شده برای شروع خزش از ابتدا
+        """
+        with self._lock:
+            self._conn.executescript("DELETE FROM meta; DELETE FROM frontier; DELETE FROM pages;")
+            self._conn.commit()
+
+    def finish(self):
+        """
+        پایان کامل خزش: حذف فایل checkpoint (در صورتی که پیش‌تر با close متوقف نشده باشد)
+        """
+        if self.closed:
+            return
+        self.close()
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+class LinkStatusCache:
+    """
+    حافظه ماندگار وضعیت لینک‌ها بین اجراها (SQLite): کد وضعیت، آدرس نهایی، زمان بررسی و تأخیر.
+    هر نتیجه بر اساس کلاس وضعیت خود (2xx، 3xx، 4xx، 5xx یا خطا) مدت اعتبار جداگانه دارد؛
+    پاسخ‌های گذرا (429 و 503 پس از پایان تلاش‌های مجدد) مانند خطاهای شبکه زود منقضی می‌شوند
+    """
+    # مدت اعتبار پیش‌فرض هر کلاس وضعیت (ثانیه): لینک‌های سالم چند روز، خطاها زودتر دوباره بررسی می‌شوند
+    DEFAULT_TTLS = {
+        '2xx': 7 * 86400,
+        '3xx': 3 * 86400,
+        '4xx': 86400,
+        '5xx': 3600,
+        'error': 1800,
+    }
+
+    def __init__(self, path, ttls=None, batch_size=100, transient_statuses=(429, 503)):
+        """
+        :param path: مسیر فایل پایگاه داده
+        :param ttls: مدت اعتبار هر کلاس وضعیت (ثانیه)؛ کلاس‌های مشخص نشده مقدار پیش‌فرض دارند
+        :param batch_size: تعداد نتایجی که پس از آن تغییرات commit می‌شوند
+        :param transient_statuses: کدهای وضعیتی که با مدت اعتبار کلاس 'error' ذخیره می‌شوند
+        """
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.transient_statuses = frozenset(transient_statuses)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS link_status ("
+            "url TEXT PRIMARY KEY, status TEXT, final_url TEXT, checked_at REAL, latency_ms REAL)"
+        )
+        self._conn.commit()
+
+    def status_class(self, status):
+        """
+        :return: کلاس وضعیت ('2xx' تا '5xx') یا 'error' برای خطاهای شبکه و پاسخ‌های گذرا
+        """
+        if isinstance(status, int) and 200 <= status < 600 and status not in self.transient_statuses:
+            return f"{status // 100}xx"
+        return 'error'
+
+    def get(self, url):
+        """
+        :return: دیکشنری نتیجه ذخیره شده (status، final_url، checked_at، latency_ms) یا None اگر منقضی شده باشد
+        """
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT status, final_url, checked_at, latency_ms FROM link_status WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status = json.loads(row[0])
+        if time.time() - row[2] > self.ttls[self.status_class(status)]:
+            return None
+        return {'status': status, 'final_url': row[1], 'checked_at': row[2], 'latency_ms': row[3]}
+
+    def put(self, url, status, final_url, latency_ms):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO link_status (url, status, final_url, checked_at, latency_ms) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(status), final_url, time.time(), latency_ms)
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.batch_size:
+                self._conn.commit()
+                self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+class StorageStateSnapshot:
+    """
+    نسخه ذخیره شده وضعیت ورود (کوکی‌ها و localStorage) حاصل از اجرای سناریو روی دیسک با زمان انقضا؛
+    تا پیش از انقضا به جای اجرای دوباره سناریو به زمینه اصلی و تمام کارگرها تزریق می‌شود
+    """
+    def __init__(self, path, ttl_s):
+        """
+        :param path: مسیر فایل JSON
+        :param ttl_s: مدت اعتبار وضعیت ذخیره شده (ثانیه)
+        """
+        self.path = path
+        self.ttl_s = ttl_s
+
+    @staticmethod
+    def path_for(directory, scenario_name, target_url_pattern, host):
+        """
+        مسیر فایل وضعیت ورود؛ هر ترکیب سناریو و دامنه فایل مستقل دارد
+        """
+        key = hashlib.sha1(f"{scenario_name}|{target_url_pattern}|{host}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(directory, f"auth_{key}.json")
+
+    def load(self):
+        """
+        :return: (وضعیت ذخیره شده, عمر آن بر حسب ثانیه) یا (None, None) اگر وجود ندارد، خراب یا منقضی شده است
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+            age_s = time.time() - snapshot['saved_at']
+            storage_state = snapshot['storage_state']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+        if not 0 <= age_s < self.ttl_s:
+            return None, None
+        return storage_state, age_s
+
+    def save(self, storage_state):
+        """
+        ذخیره وضعیت ورود؛ فایل موقت جایگزین فایل قبلی می‌شود تا خواننده‌ها فایل نیمه‌نوشته نبینند
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        # فایل شامل کوکی‌های نشست است و فقط برای کاربر فعلی قابل خواندن است
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump({'saved_at': time.time(), 'storage_state': storage_state}, file)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """
+        حذف وضعیت ذخیره شده (مثلاً پس از شکست سناریو)
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class LinkIndex:
+    """
+    فهرست وقوع لینک‌ها برای بررسی و گزارش: هر آدرس یک بار به شناسه عددی تبدیل می‌شود و
+    صفحات منبع، دامنه و وضعیت آن هنگام کشف لینک‌ها و رسیدن نتایج بررسی به‌روز می‌شوند،
+    پس گزارش بدون پیمایش دوباره تمام صفحات و لینک‌ها ساخته می‌شود.
+    تمام متدها با قفل مشترک اجرا می‌شوند و خواندن‌ها نسخه مستقلی از داده‌ها برمی‌گردانند
+    """
+    EXTERNAL = 'external'
+    # لینک‌های داخلی پس از حداکثر عمق که فقط کد وضعیت آن‌ها بررسی می‌شود
+    BOUNDARY = 'boundary'
+
+    def __init__(self):
+        self._ids = {}
+        self._urls = []
+        self._kinds = []
+        self._sources = []
+        self._statuses = []
+        self._domains = {}
+        self._by_status = {}
+        self._redirects = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_broken(status):
+        """
+        لینک شکسته: کد وضعیت 4xx/5xx یا خطای درخواست
+        """
+        return (isinstance(status, int) and 400 <= status < 600) or (isinstance(status, str) and "Error" in status)
+
+    def _intern(self, url):
+        url_id = self._ids.get(url)
+        if url_id is None:
+            url_id = len(self._urls)
+            self._ids[url] = url_id
+            self._urls.append(url)
+            self._kinds.append(None)
+            self._sources.append(None)
+            self._statuses.append(None)
+        return url_id
+
+    def add_occurrences(self, page_url, links, kind=EXTERNAL):
+        """
+        ثبت لینک‌های یک صفحه
+
+        :param page_url: آدرس صفحه منبع
+        :param links: آدرس لینک‌ها
+        :param kind: نوع لینک‌ها (EXTERNAL یا BOUNDARY)
+        :return: لینک‌هایی که برای اولین بار دیده شدند و باید بررسی شوند
+        """
+        new_links = []
+        with self._lock:
+            page_id = self._intern(page_url)
+            for url in links:
+                url_id = self._intern(url)
+                if self._kinds[url_id] is None:
+                    self._kinds[url_id] = kind
+                    self._sources[url_id] = set()
+                    self._domains.setdefault(urlparse(url).netloc, set()).add(url_id)
+                    new_links.append(url)
+                self._sources[url_id].add(page_id)
+        return new_links
+
+    def set_status(self, url, status, redirect_chain=None):
+        """
+        ثبت نتیجه بررسی یک لینک
+
+        :param redirect_chain: آدرس‌های زنجیره تغییر مسیر از خود لینک تا آدرس نهایی (در صورت وجود)
+        """
+        with self._lock:
+            url_id = self._intern(url)
+            if redirect_chain:
+                self._redirects[url_id] = redirect_chain
+            previous = self._statuses[url_id]
+            if previous is not None:
+                self._by_status[previous].discard(url_id)
+            self._statuses[url_id] = status
+            self._by_status.setdefault(status, set()).add(url_id)
+
+    def status_of(self, url):
+        with self._lock:
+            url_id = self._ids.get(url)
+            return None if url_id is None else self._statuses[url_id]
+
+    def _sources_of(self, url_id):
+        return sorted(self._urls[page_id] for page_id in self._sources[url_id])
+
+    def occurrence_count(self, url):
+        with self._lock:
+            url_id = self._ids.get(url)
+            return len(self._sources[url_id]) if url_id is not None and self._sources[url_id] else 0
+
+    def checked_urls(self, kind=None):
+        """
+        آدرس‌های بررسی شده (در صورت مشخص بودن kind فقط از همان نوع)
+        """
+        with self._lock:
+            return [
+                self._urls[url_id]
+                for url_ids in self._by_status.values() for url_id in url_ids
+                if kind is None or self._kinds[url_id] == kind
+            ]
+
+    def broken_by_status(self):
+        """
+        لینک‌های شکسته گروه‌بندی شده بر اساس وضعیت
+
+        :return: لیست مرتب (وضعیت، [(صفحه منبع، آدرس لینک)])
+        """
+        groups = []
+        with self._lock:
+            for status in sorted(self._by_status, key=str):
+                if not self.is_broken(status) or not self._by_status[status]:
+                    continue
+                occurrences = [
+                    (source, self._urls[url_id])
+                    for url_id in sorted(self._by_status[status], key=self._urls.__getitem__)
+                    for source in self._sources_of(url_id)
+                ]
+                groups.append((status, occurrences))
+        return groups
+
+    def broken_count(self):
+        """
+        تعداد وقوع لینک‌های شکسته (هر جفت صفحه منبع و لینک یک بار شمرده می‌شود)
+        """
+        return sum(len(occurrences) for _status, occurrences in self.broken_by_status())
+
+    def domain_occurrences(self, kind=EXTERNAL):
+        """
+        وقوع لینک‌های بررسی شده به تفکیک دامنه
+
+        :return: دیکشنری دامنه -> لیست (صفحه منبع، آدرس لینک، وضعیت)
+        """
+        occurrences_by_domain = {}
+        with self._lock:
+            for domain, url_ids in self._domains.items():
+                occurrences = [
+                    (source, self._urls[url_id], self._statuses[url_id])
+                    for url_id in url_ids
+                    if self._kinds[url_id] == kind and self._statuses[url_id] is not None
+                    for source in self._sources_of(url_id)
+                ]
+                if occurrences:
+                    occurrences_by_domain[domain] = occurrences
+        return occurrences_by_domain
+
+    def status_counts(self, kind=EXTERNAL):
+        """
+        تعداد وقوع لینک‌ها به تفکیک وضعیت
+        """
+        counts = {}
+        with self._lock:
+            for status, url_ids in self._by_status.items():
+                count = sum(len(self._sources[url_id]) for url_id in url_ids if self._kinds[url_id] == kind)
+                if count:
+                    counts[status] = count
+        return counts
+
+    def redirect_chains(self):
+        """
+        :return: دیکشنری آدرس لینک -> زنجیره تغییر مسیر آن
+        """
+        with self._lock:
+            return {self._urls[url_id]: list(chain) for url_id, chain in self._redirects.items()}
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for kind in self._kinds if kind is not None)
+
+
+class CheckpointQueueWriter:
+    """
+    جایگزین CrawlCheckpoint در فرآیندهای shard: رکوردها به فرآیند اصلی فرستاده می‌شوند تا فقط
+    یک نویسنده روی فایل SQLite باشد (تراکنش‌های دسته‌ای باز چند فرآیند یکدیگر را قفل می‌کنند)
+    """
+    def __init__(self, message_queue):
+        """
+        :param message_queue: صف پیام‌های فرآیند اصلی (همان صف لاگ shard)
+        """
+        self._queue = message_queue
+
+    def record_page(self, url, page_data, queued_links=(), child_depth=None):
+        self._queue.put({
+            'type': 'checkpoint',
+            'url': url,
+            'data': page_data,
+            'links': list(queued_links),
+            'depth': child_depth
+        })
+
+    def close(self):
+        pass
+
+
+class ScenarioStep:
+    """
+    یک اقدام اعتبارسنجی شده سناریو: locator و پارامترهای آن هنگام کامپایل ساخته شده‌اند
+    و اجرای آن فقط یک فراخوانی روی صفحه است (قابل ارسال به فرآیندهای دیگر با pickle)
+    """
+    __slots__ = ('action_type', 'description', 'locate', 'act', 'template')
+
+    def __init__(self, action_type, description, locate, act, template=None):
+        """
+        :param action_type: نوع اقدام (مانند CLICK_ELEMENT)
+        :param description: توضیح آماده اقدام برای لاگ
+        :param locate: سازنده locator از صفحه (None برای اقدامات روی خود صفحه)
+        :param act: فراخوانی متد اقدام روی locator یا صفحه
+        :param template: اقدام خام دارای {{ستون}} که برای هر ردیف داده دوباره کامپایل می‌شود (یا None)
+        """
+        self.action_type = action_type
+        self.description = description
+        self.locate = locate
+        self.act = act
+        self.template = template
+
+    def run(self, page):
+        """
+        اجرای اقدام روی صفحه Playwright
+        """
+        return self.act(self.locate(page) if self.locate else page)
+
+
+class ScenarioPlan:
+    """
+    سناریوی کامپایل شده و تغییرناپذیر؛ یک بار برای هر فایل ساخته و در اجراهای بعدی دوباره استفاده می‌شود
+    """
+    __slots__ = ('name', 'target_url_pattern', 'steps', 'warnings', 'placeholders', '_url_matcher')
+    # پیشوند الگوهای عبارت منظم؛ الگوهای دارای * ? [ به صورت glob و بقیه به صورت برابری دقیق تطبیق داده می‌شوند
+    REGEX_PREFIX = 're:'
+    GLOB_CHARS = ('*', '?', '[')
+    # جای‌گذار مقادیر ردیف داده در اقدامات سناریو، مانند {{username}}
+    PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+    def __init__(self, name, target_url_pattern, steps, warnings=()):
+        """
+        :param name: نام سناریو
+        :param target_url_pattern: الگوی آدرس هدف سناریو (آدرس دقیق، glob یا عبارت منظم با پیشوند re:)
+        :param steps: تاپل اقدامات کامپایل شده (ScenarioStep)
+        :param warnings: هشدارهای کامپایل (مثلاً اقدامات ناشناخته که حذف شده‌اند)
+        :raises ValueError: اگر عبارت منظم الگو نامعتبر باشد
+        """
+        self.name = name
+        self.target_url_pattern = target_url_pattern
+        self.steps = tuple(steps)
+        self.warnings = tuple(warnings)
+        self.placeholders = frozenset(
+            match for step in self.steps if step.template
+            for value in step.template.values() if isinstance(value, str)
+            for match in self.PLACEHOLDER_PATTERN.findall(value)
+        )
+        self._url_matcher = self.compile_url_pattern(target_url_pattern)
+
+    @classmethod
+    def compile_url_pattern(cls, pattern):
+        """
+        ساخت تابع تطبیق آدرس از الگوی هدف سناریو
+
+        :param pattern: آدرس دقیق، الگوی glob یا عبارت منظم با پیشوند re:
+        :return: تابعی که آدرس را گرفته و تطابق آن را برمی‌گرداند
+        :raises ValueError: اگر عبارت منظم نامعتبر باشد
+        """
+        if pattern.startswith(cls.REGEX_PREFIX):
+            try:
+                return re.compile(pattern[len(cls.REGEX_PREFIX):]).search
+            except re.error as e:
+                raise ValueError(f"عبارت منظم الگوی آدرس نامعتبر است: {str(e)}")
+        if any(char in pattern for char in cls.GLOB_CHARS):
+            return re.compile(fnmatch.translate(pattern)).match
+        return pattern.__eq__
+
+    def matches(self, url):
+        """
+        بررسی تطابق یک آدرس با الگوی هدف سناریو
+        """
+        return bool(self._url_matcher(url))
+
+
+class ScenarioDataset:
+    """
+    مجموعه داده اجرای داده‌محور سناریو (CSV با سطر عنوان یا JSONL)؛ ردیف‌ها هنگام پیمایش
+    یکی یکی از فایل خوانده می‌شوند و کل فایل هرگز در حافظه بارگذاری نمی‌شود
+    """
+    CSV_EXTENSIONS = ('.csv',)
+    JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+    def __init__(self, path):
+        """
+        :param path: مسیر فایل داده
+        :raises ValueError: اگر پسوند فایل پشتیبانی نشود
+        """
+        self.path = path
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in self.CSV_EXTENSIONS + self.JSONL_EXTENSIONS:
+            raise ValueError(f"فرمت فایل داده '{extension}' پشتیبانی نمی‌شود (CSV یا JSONL)")
+        self.is_csv = extension in self.CSV_EXTENSIONS
+
+    def columns(self):
+        """
+        :return: مجموعه نام ستون‌های CSV از سطر عنوان، یا None برای JSONL (هر ردیف ستون‌های خود را دارد)
+        """
+        if not self.is_csv:
+            return None
+        with open(self.path, 'r', encoding='utf-8-sig', newline='') as file:
+            return set(next(csv.reader(file), []))
+
+    def __iter__(self):
+        """
+        :return: تولیدکننده (شماره ردیف، دیکشنری مقادیر یا None، پیام خطا یا None)
+        """
+        with open(self.path, 'r', encoding='utf-8-sig', newline='') as file:
+            if self.is_csv:
+                for row_number, row in enumerate(csv.DictReader(file), 1):
+                    yield row_number, row, None
+                return
+            row_number = 0
+            for line in file:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield row_number, None, f"JSON نامعتبر: {str(e)}"
+                    continue
+                if not isinstance(row, dict):
+                    yield row_number, None, "ردیف JSONL باید یک شیء باشد"
+                    continue
+                yield row_number, row, None
+
+
+class LoadTestStats:
+    """
+    تجمیع نتایج آزمون بار سناریو: صدک‌های تأخیر هر اقدام، توان عملیاتی و نرخ خطا
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, step_labels):
+        """
+        :param step_labels: برچسب اقدامات به ترتیب اجرا (اولین مورد بارگذاری صفحه شروع است)
+        """
+        self.step_labels = list(step_labels)
+        self._latencies = [[] for _ in self.step_labels]
+        self._step_errors = [0] * len(self.step_labels)
+        self._iteration_ms = []
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.errors = {}
+        self.first_start = None
+        self.last_end = None
+
+    @staticmethod
+    def percentile(sorted_values, pct):
+        """
+        صدک به روش nearest-rank روی لیست مرتب شده
+        """
+        if not sorted_values:
+            return 0
+        rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def add_iteration(self, record):
+        """
+        افزودن رکورد یک تکرار سناریو (خروجی CrawlEngine._run_load_test_iteration)
+        """
+        self.iterations += 1
+        for step_idx, (ms, passed) in enumerate(record['steps']):
+            self._latencies[step_idx].append(ms)
+            if not passed:
+                self._step_errors[step_idx] += 1
+        if record['error'] is not None:
+            self.failed_iterations += 1
+            # خطاها بر اساس خط اول پیام گروه‌بندی می‌شوند
+            error_key = record['error'].strip().split('\n', 1)[0][:200]
+            self.errors[error_key] = self.errors.get(error_key, 0) + 1
+        self._iteration_ms.append((record['ended_at'] - record['started_at']) * 1000)
+        if self.first_start is None or record['started_at'] < self.first_start:
+            self.first_start = record['started_at']
+        if self.last_end is None or record['ended_at'] > self.last_end:
+            self.last_end = record['ended_at']
+
+    def _latency_row(self, label, latencies, errors):
+        latencies = sorted(latencies)
+        row = {'step': label, 'count': len(latencies), 'errors': errors,
+               'error_rate': round(errors / len(latencies), 4) if latencies else 0}
+        for pct in self.PERCENTILES:
+            row[f'p{pct}_ms'] = round(self.percentile(latencies, pct), 1)
+        row['mean_ms'] = round(sum(latencies) / len(latencies), 1) if latencies else 0
+        row['max_ms'] = round(latencies[-1], 1) if latencies else 0
+        return row
+
+    def summary(self):
+        """
+        :return: دیکشنری خلاصه (کل آزمون و ردیف آماری هر اقدام و کل تکرار)
+        """
+        elapsed_s = (self.last_end - self.first_start) if self.iterations else 0
+        return {
+            'iterations': self.iterations,
+            'failed_iterations': self.failed_iterations,
+            'error_rate': round(self.failed_iterations / self.iterations, 4) if self.iterations else 0,
+            'elapsed_s': round(elapsed_s, 2),
+            'throughput_per_s': round(self.iterations / elapsed_s, 3) if elapsed_s else 0,
+            'actions_per_s': round(sum(map(len, self._latencies)) / elapsed_s, 3) if elapsed_s else 0,
+            'steps': [
+                self._latency_row(label, latencies, errors)
+                for label, latencies, errors in zip(self.step_labels, self._latencies, self._step_errors)
+            ],
+            'iteration': self._latency_row('ITERATION', self._iteration_ms, self.failed_iterations),
+            'errors': dict(sorted(self.errors.items(), key=lambda item: -item[1])),
+        }
+
+
+class CrawlEngine:
+    """
+    هسته خزش مستقل از رابط کاربری؛ هم در برنامه اصلی و هم در فرآیندهای shard استفاده می‌شود
+    """
+    # تنظیماتی که برای هر اجرا به فرآیندهای shard منتقل می‌شوند
+    CRAWL_SETTING_NAMES = (
+        'crawl_concurrency', 'crawl_processes',
+        'http_first_fetch', 'js_render_hosts', 'http_seed_cookies',
+        'block_resources', 'blocked_resource_types', 'blocked_domains',
+        'page_pool_enabled', 'page_pool_max_uses',
+        'readiness_strategy', 'readiness_max_wait_ms', 'links_stable_ms', 'readiness_selectors',
+        'frontier_dedup', 'bloom_initial_capacity', 'bloom_error_rate',
+        'checkpoint_batch_size',
+        'host_max_concurrency', 'host_min_delay_ms', 'respect_crawl_delay', 'adaptive_host_concurrency',
+        'probe_boundary_links',
+        'max_retries', 'retry_base_delay_ms', 'retry_max_delay_ms', 'page_retry_budget', 'link_retry_budget',
+        'canonical_sort_query', 'canonical_denied_params', 'canonical_fold_trailing_slash', 'honor_canonical_links',
+    )
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+
+    # نشانه‌های صفحات SPA که محتوای آن‌ها فقط با اجرای جاوااسکریپت ساخته می‌شود
+    SPA_ROOT_PATTERN = re.compile(
+        r'<(div|main|app-root)[^>]*\bid=["\']?(root|app|__next|__nuxt|___gatsby|svelte)["\']?[^>]*>\s*</\1>'
+        r'|<app-root[^>]*>\s*</app-root>',
+        re.IGNORECASE
+    )
+    NOSCRIPT_JS_PATTERN = re.compile(r'<noscript[^>]*>[^<]*(enable|requires?)\s+javascript', re.IGNORECASE)
+    META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+    # دامنه‌های رایج ردیاب و آمار که در پروفایل مسدودسازی منابع درخواست‌های آن‌ها لغو می‌شود
+    DEFAULT_BLOCKED_DOMAINS = (
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+        'facebook.net', 'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'segment.io',
+        'scorecardresearch.com', 'mixpanel.com', 'newrelic.com', 'nr-data.net', 'yandex.ru/metrika',
+    )
+
+    # اندازه تقریبی هر درخواست لغو شده بر حسب نوع (بایت)؛ حجم واقعی بدون دانلود قابل اندازه‌گیری نیست
+    ESTIMATED_RESOURCE_BYTES = {
+        'image': 30000,
+        'media': 250000,
+        'font': 35000,
+        'stylesheet': 15000,
+        'script': 25000,
+    }
+
+    # پاسخ‌ها و خطاهای گذرایی که به جای ثبت به عنوان نتیجه نهایی دوباره امتحان می‌شوند
+    RETRY_STATUSES = (429, 503)
+    TRANSIENT_FETCH_ERRORS = (
+        'Timeout', 'net::ERR_TIMED_OUT', 'net::ERR_CONNECTION_RESET', 'net::ERR_CONNECTION_CLOSED',
+        'net::ERR_CONNECTION_REFUSED', 'net::ERR_EMPTY_RESPONSE', 'net::ERR_NETWORK_CHANGED',
+        'net::ERR_HTTP2_PROTOCOL_ERROR',
+    )
+
+    # خطاهای شبکه‌ای که نشانه خرابی منبع نیستند (لغو توسط خود صفحه یا پروفایل مسدودسازی)
+    BENIGN_ASSET_FAILURES = ('net::ERR_ABORTED', 'net::ERR_BLOCKED_BY_CLIENT')
+
+    # استراتژی‌های انتظار برای آماده شدن صفحه پس از domcontentloaded
+    READINESS_STRATEGIES = ('networkidle', 'dom', 'links_stable', 'networkidle_learned')
+
+    # کمترین سقف انتظار networkidle برای دامنه‌هایی که هرگز به حالت بیکار شبکه نمی‌رسند
+    READINESS_MIN_CAP_MS = 1000
+
+    # انتظار تا زمانی که مجموعه پیوندهای صفحه برای مدت مشخصی تغییر نکند (در یک فراخوانی evaluate)
+    LINKS_STABLE_SCRIPT = """([quietMs, maxMs]) => new Promise(resolve => {
+        const signature = () => {
+            const anchors = document.querySelectorAll('a[href]');
+            let length = 0;
+            for (const a of anchors) length += a.getAttribute('href').length;
+            return anchors.length + ':' + length;
+        };
+        const start = performance.now();
+        let last = signature();
+        let lastChange = start;
+        const timer = setInterval(() => {
+            const now = performance.now();
+            const current = signature();
+            if (current !== last) {
+                last = current;
+                lastChange = now;
+            }
+            if (now - lastChange >= quietMs) {
+                clearInterval(timer);
+                resolve(true);
+            } else if (now - start >= maxMs) {
+                clearInterval(timer);
+                resolve(false);
+            }
+        }, 100);
+    })"""
+
+    # استخراج تمام داده‌های مورد نیاز صفحه در یک رفت‌وبرگشت؛ مقادیر خالی href مانند get_attribute کنار گذاشته می‌شوند
+    LINK_EXTRACTION_SCRIPT = """() => ({
+        url: location.href,
+        title: document.title,
+        hrefs: Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href')).filter(Boolean),
+        canonical: (document.querySelector('link[rel~="canonical"][href]') || {}).href || null
+    })"""
+
+    def __init__(self, ui_queue=None):
+        """
+        :param ui_queue: صف پیام‌های لاگ و وضعیت
+        """
+        self.ui_queue = ui_queue if ui_queue is not None else queue.Queue()
+        self.browser_context = None
+        
+        # تنظیمات خزش همزمان (تعداد صفحاتی که به طور همزمان بارگذاری می‌شوند)
+        self.crawl_concurrency = 1
+        # تعداد فرآیندهای خزش؛ هر فرآیند مرورگر خود و بخشی از صف را در اختیار دارد
+        self.crawl_processes = 1
+        
+        # دریافت ابتدا با HTTP و استفاده از Playwright فقط برای صفحاتی که به جاوااسکریپت نیاز دارند
+        self.http_first_fetch = False
+        # دامنه‌هایی که همیشه با Playwright بارگذاری می‌شوند
+        self.js_render_hosts = set()
+        # کوکی‌های زمینه مرورگر (مثلاً پس از ورود توسط سناریو) برای نشست‌های HTTP
+        self.http_seed_cookies = []
+        self._http_local = threading.local()
+        
+        # پروفایل مسدودسازی منابع غیرضروری برای خزش ساختار لینک‌ها
+        self.block_resources = False
+        self.blocked_resource_types = {'image', 'media', 'font'}
+        self.blocked_domains = set(self.DEFAULT_BLOCKED_DOMAINS)
+        
+        # استفاده مجدد از صفحات به جای new_page/close برای هر آدرس؛
+        # هر صفحه پس از تعداد مشخصی استفاده برای جلوگیری از نشت حافظه بازسازی می‌شود
+        self.page_pool_enabled = True
+        self.page_pool_max_uses = 50
+        
+        # استراتژی انتظار برای آماده شدن صفحه (networkidle با سقف ثابت رفتار پیش‌فرض قبلی است)
+        self.readiness_strategy = 'networkidle'
+        self.readiness_max_wait_ms = 10000
+        # مدت زمانی که مجموعه پیوندها باید بدون تغییر بماند (استراتژی links_stable)
+        self.links_stable_ms = 500
+        # selector اختصاصی هر دامنه (دامنه -> CSS selector) که بر استراتژی انتخاب شده مقدم است
+        self.readiness_selectors = {}
+        # سابقه زمان رسیدن به networkidle برای هر دامنه (استراتژی networkidle_learned)
+        self._readiness_history = {}
+        self._readiness_lock = threading.Lock()
+        
+        # نحوه نگهداری آدرس‌های دیده شده: 'exact' (set) یا 'bloom' برای خزش‌های چند میلیون صفحه‌ای
+        self.frontier_dedup = 'exact'
+        self.bloom_initial_capacity = 100000
+        self.bloom_error_rate = 0.0001
+        
+        # ذخیره تدریجی وضعیت خزش برای ادامه پس از توقف (None یعنی غیرفعال)
+        self.checkpoint_dir = None
+        self.resume_crawl = True
+        self.checkpoint_batch_size = 200
+        self.crawl_checkpoint = None
+        
+        # سیاست مؤدبانه مشترک برای تمام درخواست‌ها به یک دامنه (خزش و بررسی لینک‌ها)
+        self.host_max_concurrency = 8
+        self.host_min_delay_ms = 0
+        self.respect_crawl_delay = True
+        self.adaptive_host_concurrency = True
+        
+        # آمار اجرای فعلی که از تمام کارگرها و فرآیندها جمع‌آوری می‌شود
+        self.crawl_stats = {}
+        self._stats_lock = threading.Lock()
+        
+        self.host_scheduler = self._new_host_scheduler()
+        
+        # تابعی که لینک‌های خارجی هر صفحه بلافاصله پس از پردازش آن دریافت می‌کند (بررسی همزمان لینک‌ها)
+        self.external_link_sink = None
+        # بررسی وضعیت لینک‌های داخلی عمق max_depth با درخواست HEAD/GET به جای بارگذاری کامل صفحه
+        self.probe_boundary_links = False
+        
+        # تلاش مجدد با تأخیر برای خطاهای گذرا؛ سهمیه‌ها برای کل یک اجرا هستند
+        self.max_retries = 3
+        self.retry_base_delay_ms = 1000
+        self.retry_max_delay_ms = 30000
+        self.page_retry_budget = 50
+        self.link_retry_budget = 200
+        self.retry_scheduler = self._new_retry_scheduler()
+        
+        # قوانین یکسان‌سازی آدرس‌ها پیش از افزودن به صف خزش و صف بررسی لینک‌ها
+        self.canonical_sort_query = True
+        self.canonical_denied_params = UrlCanonicalizer.DEFAULT_DENIED_PARAMS
+        self.canonical_fold_trailing_slash = False
+        # ثبت آدرس link rel=canonical صفحات در گزارش (مقصد آن سند جداگانه‌ای است و خزش آن حذف نمی‌شود)
+        self.honor_canonical_links = True
+        self.url_canonicalizer = self._new_url_canonicalizer()
+        self._url_variants = set()
+        self._url_variants_lock = threading.Lock()
+        
+        # منابع فرعی (تصویر، اسکریپت، استایل، XHR) مشاهده شده در رویدادهای شبکه صفحات، یکتا بر اساس آدرس
+        self.asset_health = {}
+        self._asset_lock = threading.Lock()
+
+    def _record_stat(self, name, amount=1):
+        """
+        افزایش یک شمارنده آماری خزش (امن برای استفاده در چند thread)
+        """
+        with self._stats_lock:
+            self.crawl_stats[name] = self.crawl_stats.get(name, 0) + amount
+
+    def _merge_crawl_stats(self, stats):
+        """
+        ادغام آمار دریافت شده از یک فرآیند shard
+        """
+        for name, amount in stats.items():
+            self._record_stat(name, amount)
+
+    def _is_broken_asset(self, asset):
+        """
+        خرابی یک منبع فرعی: کد وضعیت 4xx/5xx یا خطای شبکه (به جز لغو توسط خود صفحه)
+        """
+        status = asset['status']
+        if isinstance(status, int):
+            return status >= 400
+        return status not in self.BENIGN_ASSET_FAILURES
+
+    def _record_assets(self, page_url, assets):
+        """
+        ثبت منابع فرعی یک صفحه در مجموعه یکتای منابع خزش
+        
+        :param page_url: آدرس صفحه‌ای که منابع در آن بارگذاری شدند
+        :param assets: لیست منابع ثبت شده هنگام بارگذاری صفحه
+        :return: منابع خراب این صفحه (برای ذخیره در نتایج صفحه و گزارش لینک‌ها)
+        """
+        broken_assets = []
+        with self._asset_lock:
+            for asset in assets:
+                known = self.asset_health.get(asset['url'])
+                if known is None:
+                    self.asset_health[asset['url']] = dict(asset, pages=1, first_page=page_url)
+                else:
+                    known['pages'] += 1
+                if self._is_broken_asset(asset):
+                    broken_assets.append(asset)
+        return broken_assets
+
+    def _merge_asset_health(self, asset_health):
+        """
+        ادغام منابع فرعی دریافت شده از یک فرآیند shard
+        """
+        with self._asset_lock:
+            for url, asset in asset_health.items():
+                known = self.asset_health.get(url)
+                if known is None:
+                    self.asset_health[url] = asset
+                else:
+                    known['pages'] += asset['pages']
+
+    def _format_crawl_stats(self):
+        """
+        تهیه خلاصه متنی آمار خزش برای نمایش در لاگ
+        """
+        stats = self.crawl_stats
+        lines = []
+        if self.http_first_fetch:
+            lines.append(
+                f"Fetch tiers: {stats.get('http_fetches', 0)} page(s) via HTTP, "
+                f"{stats.get('playwright_fetches', 0)} via Playwright "
+                f"({stats.get('http_escalations', 0)} escalated from HTTP)\n"
+            )
+        if self.block_resources:
+            by_type = ", ".join(
+                f"{name.split(':', 1)[1]}: {count}"
+                for name, count in sorted(stats.items()) if name.startswith('blocked_type:')
+            )
+            lines.append(
+                f"Blocked resources: {stats.get('blocked_requests', 0)} request(s) skipped"
+                f"{f' ({by_type})' if by_type else ''}, "
+                f"~{stats.get('blocked_bytes_estimate', 0) / (1024 * 1024):.1f} MB not downloaded (estimated)\n"
+            )
+        waits = stats.get('readiness_waits', 0)
+        if waits:
+            lines.append(
+                f"Readiness wait ({self.readiness_strategy}): {stats.get('readiness_wait_ms', 0) / 1000:.1f}s total, "
+                f"avg {stats.get('readiness_wait_ms', 0) / waits:.0f} ms/page, "
+                f"{stats.get('readiness_timeouts', 0)} of {waits} hit the cap\n"
+            )
+        pool_acquires = stats.get('page_pool_hits', 0) + stats.get('page_pool_misses', 0)
+        if pool_acquires:
+            hit_rate = stats.get('page_pool_hits', 0) / pool_acquires * 100
+            created = stats.get('page_pool_misses', 0)
+            avg_create_ms = stats.get('page_pool_create_ms', 0) / created if created else 0
+            lines.append(
+                f"Page pool: {hit_rate:.0f}% hit rate ({stats.get('page_pool_hits', 0)}/{pool_acquires}), "
+                f"~{stats.get('page_pool_hits', 0) * avg_create_ms / 1000:.1f}s page creation saved "
+                f"(avg {avg_create_ms:.0f} ms per new page), "
+                f"{stats.get('page_pool_recycled', 0)} page(s) recycled\n"
+            )
+        if any(name in stats for name in ('host_wait_ms', 'host_backoffs', 'host_throttled_responses')):
+            lines.append(
+                f"Host politeness: {stats.get('host_wait_ms', 0) / 1000:.1f}s waiting for host slots, "
+                f"{stats.get('host_backoffs', 0)} backoff(s), "
+                f"{stats.get('host_throttled_responses', 0)} 429/503 response(s), "
+                f"robots Crawl-delay on {stats.get('robots_crawl_delay_hosts', 0)} host(s)\n"
+            )
+        collapsed = stats.get('canonical_variants', 0) + stats.get('canonical_aliases', 0)
+        if collapsed:
+            lines.append(
+                f"Canonical URLs: {stats.get('canonical_variants', 0)} URL variant(s) collapsed by the rules, "
+                f"{stats.get('canonical_aliases', 0)} same-host redirect alias(es) "
+                f"(up to {collapsed} fetch(es)/link check(s) avoided)\n"
+            )
+        retries = stats.get('page_retries', 0) + stats.get('link_retries', 0)
+        if retries or stats.get('retry_budget_exhausted') or stats.get('retry_gave_up'):
+            lines.append(
+                f"Retries: {stats.get('page_retries', 0)} page(s), {stats.get('link_retries', 0)} link check(s), "
+                f"{stats.get('retry_gave_up', 0)} gave up after {self.max_retries} attempt(s) or long Retry-After, "
+                f"{stats.get('retry_budget_exhausted', 0)} refused by the run budget\n"
+            )
+        if self.asset_health:
+            assets = list(self.asset_health.values())
+            ttfbs = [asset['ttfb_ms'] for asset in assets if asset.get('ttfb_ms') is not None]
+            avg_ttfb = f", avg TTFB {sum(ttfbs) / len(ttfbs):.0f} ms" if ttfbs else ""
+            lines.append(
+                f"Subresources: {len(assets)} unique asset(s), "
+                f"~{sum(asset.get('size') or 0 for asset in assets) / (1024 * 1024):.1f} MB by Content-Length, "
+                f"{sum(1 for asset in assets if self._is_broken_asset(asset))} broken{avg_ttfb}\n"
+            )
+        commits = stats.get('checkpoint_commits', 0)
+        if commits:
+            crawl_ms = stats.get('crawl_ms', 0)
+            share = f" ({stats.get('checkpoint_ms', 0) / crawl_ms * 100:.1f}% of crawl time)" if crawl_ms else ""
+            lines.append(
+                f"Checkpoint: {commits} commit(s), {stats.get('checkpoint_ms', 0) / 1000:.2f}s spent writing{share}\n"
+            )
+        return "".join(lines)
+
+    def _new_url_set(self):
+        """
+        ساخت مجموعه آدرس‌های دیده شده بر اساس تنظیم frontier_dedup
+        """
+        if self.frontier_dedup == 'bloom':
+            return ScalableBloomFilter(self.bloom_initial_capacity, self.bloom_error_rate)
+        return set()
+
+    def _new_host_scheduler(self, share=1):
+        """
+        ساخت زمان‌بند دامنه‌ها بر اساس تنظیمات فعلی
+
+        :param share: تعداد فرآیندهایی که ظرفیت هر دامنه بین آن‌ها تقسیم می‌شود
+        """
+        return HostScheduler(
+            max_per_host=self.host_max_concurrency,
+            min_delay_ms=self.host_min_delay_ms,
+            respect_crawl_delay=self.respect_crawl_delay,
+            adaptive=self.adaptive_host_concurrency,
+            share=share,
+            user_agent=self.USER_AGENT,
+            record_stat=self._record_stat
+        )
+
+    def _new_retry_scheduler(self, share=1):
+        """
+        ساخت صف تلاش‌های مجدد بر اساس تنظیمات فعلی
+
+        :param share: تعداد فرآیندهایی که سهمیه تلاش مجدد بین آن‌ها تقسیم می‌شود
+        """
+        return RetryScheduler(
+            budgets={
+                'page': max(1, self.page_retry_budget // share) if self.page_retry_budget else 0,
+                'link': self.link_retry_budget,
+            },
+            max_attempts=self.max_retries,
+            base_delay_ms=self.retry_base_delay_ms,
+            max_delay_ms=self.retry_max_delay_ms,
+            record_stat=self._record_stat,
+            log=lambda text: self.ui_queue.put({'type': 'log', 'text': text})
+        )
+
+    def _new_url_canonicalizer(self):
+        """
+        ساخت یکسان‌ساز آدرس‌ها بر اساس تنظیمات فعلی
+        """
+        return UrlCanonicalizer(
+            sort_query=self.canonical_sort_query,
+            denied_params=self.canonical_denied_params,
+            fold_trailing_slash=self.canonical_fold_trailing_slash
+        )
+
+    @staticmethod
+    def _site_host(url):
+        """
+        دامنه آدرس بدون پیشوند www. (www.example.com و example.com یک سایت هستند)
+        """
+        host = urlparse(url).netloc.lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def _same_host_aliases(self, url, candidates):
+        """
+        آدرس‌های جایگزین یک صفحه که می‌توانند دیده شده علامت بخورند؛ دامنه‌هایی که فقط در پیشوند
+        www. تفاوت دارند یک سایت حساب می‌شوند، اما آدرس‌های دامنه دیگر (مثلاً مقصد تغییر مسیر
+        خارج از سایت) وارد مجموعه آدرس‌های داخلی نمی‌شوند
+        
+        :param url: آدرس خزش شده صفحه
+        :param candidates: آدرس‌های زنجیره تغییر مسیر و آدرس نهایی
+        :return: لیست آدرس‌های هم‌دامنه غیر از خود صفحه
+        """
+        site_host = self._site_host(url)
+        return [
+            alias for alias in candidates
+            if alias and alias != url and self._site_host(alias) == site_host
+        ]
+
+    def _canonical_redirect_chain(self, chain):
+        """
+        شکل یکتای آدرس‌های زنجیره تغییر مسیر؛ لیست خالی اگر تغییر مسیری رخ نداده باشد
+
+        :param chain: آدرس‌های زنجیره از درخواست اول تا آدرس نهایی
+        """
+        chain = [self.url_canonicalizer.canonicalize(url) for url in chain]
+        # تغییر مسیرهایی که فقط شکل آدرس را تغییر می‌دهند (مثلاً /path به /path/ با یکسان‌سازی) حذف می‌شوند
+        chain = [url for index, url in enumerate(chain) if index == 0 or url != chain[index - 1]]
+        return chain if len(chain) > 1 else []
+
+    def _format_redirect_summary(self, crawled_pages_data):
+        """
+        خلاصه تغییر مسیرهای صفحات خزش شده برای لاگ؛ زنجیره‌های طولانی هزینه تأخیر دارند
+
+        :return: متن خلاصه یا رشته خالی اگر هیچ صفحه‌ای تغییر مسیر نداشت
+        """
+        hops = [len(data['redirect_chain']) - 1 for data in crawled_pages_data.values() if data.get('redirect_chain')]
+        if not hops:
+            return ""
+        return (
+            f"Redirects: {len(hops)} page(s) reached through redirects, longest chain {max(hops)} hop(s), "
+            f"{sum(1 for count in hops if count > 1)} chain(s) with more than one hop\n"
+        )
+
+    def _build_redirect_aliases(self, crawled_pages_data, link_index=None):
+        """
+        نقشه آدرس‌های جایگزین (هر گام زنجیره تغییر مسیر) به آدرس نهایی برای صفحات و لینک‌های بررسی شده
+
+        :return: دیکشنری آدرس جایگزین -> آدرس نهایی
+        """
+        chains = [data['redirect_chain'] for data in crawled_pages_data.values() if data.get('redirect_chain')]
+        if link_index is not None:
+            chains.extend(link_index.redirect_chains().values())
+        return {alias: chain[-1] for chain in chains for alias in chain[:-1]}
+
+    def _record_url_variants(self, variants):
+        """
+        شمارش گونه‌های جدید آدرس‌ها که به شکل یکتای خود تبدیل شدند؛
+        هر گونه جدید بدون یکسان‌سازی یک خزش یا بررسی لینک جداگانه می‌شد
+        """
+        with self._url_variants_lock:
+            new_variants = variants - self._url_variants
+            self._url_variants.update(new_variants)
+        if new_variants:
+            self._record_stat('canonical_variants', len(new_variants))
+
+    def _retry_page_later(self, frontier, url, depth, parent_url, reason, retry_after=None):
+        """
+        زمان‌بندی تلاش مجدد یک صفحه پس از خطای گذرا؛ کارگر بلافاصله به صفحه بعدی می‌رود
+
+        :return: True اگر تلاش مجدد زمان‌بندی شد (در غیر این صورت نتیجه فعلی نهایی است)
+        """
+        scheduled = frontier.retry_later(
+            url, depth, parent_url,
+            lambda callback: self.retry_scheduler.schedule('page', url, callback, retry_after)
+        )
+        if scheduled:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"Retry scheduled ({self.retry_scheduler.attempts('page', url)}/{self.max_retries}) "
+                        f"for {url}: {reason}\n\n"
+            })
+        return scheduled
+
+    def _is_transient_error(self, error):
+        """
+        تشخیص خطاهای گذرای بارگذاری صفحه که ارزش تلاش مجدد دارند
+        """
+        message = str(error)
+        return isinstance(error, TimeoutError) or any(marker in message for marker in self.TRANSIENT_FETCH_ERRORS)
+
+    def _open_crawl_checkpoint(self, start_url, max_depth):
+        """
+        باز کردن فایل checkpoint خزش؛ اگر ادامه خزش فعال باشد و اجرای قبلی ناتمام مانده باشد
+        وضعیت آن حفظ می‌شود، در غیر این صورت خزش از ابتدا ثبت می‌شود
+
+        :return: True اگر خزش از checkpoint ادامه می‌یابد
+        """
+        self.crawl_checkpoint = None
+        if not self.checkpoint_dir:
+            return False
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            checkpoint = CrawlCheckpoint(
+                CrawlCheckpoint.path_for(self.checkpoint_dir, start_url, max_depth),
+                self.checkpoint_batch_size,
+                record_stat=self._record_stat
+            )
+            resuming = self.resume_crawl and checkpoint.has_progress()
+            if not resuming:
+                checkpoint.reset()
+                checkpoint.start(start_url, max_depth)
+        except (OSError, sqlite3.Error) as e:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"Checkpointing disabled: {str(e)}\n\n"
+            })
+            return False
+        self.crawl_checkpoint = checkpoint
+        return resuming
+
+    def _get_crawl_settings(self):
+        """
+        تهیه تنظیمات اجرای فعلی به صورت دیکشنری قابل انتقال به فرآیندهای دیگر
+        """
+        return {name: getattr(self, name) for name in self.CRAWL_SETTING_NAMES}
+
+    def _apply_crawl_settings(self, settings):
+        """
+        اعمال تنظیمات دریافت شده از فرآیند اصلی
+        """
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    def _new_crawl_context(self, browser, storage_state=None):
+        """
+        ایجاد زمینه مرورگر با تنظیمات یکسان برای مرورگر اصلی و کارگرهای خزش
+        
+        :param browser: شیء مرورگر Playwright
+        :param storage_state: وضعیت ذخیره‌شده (کوکی‌ها و localStorage) برای انتقال به زمینه جدید
+        :return: زمینه مرورگر جدید
+        """
+        context = browser.new_context(
+            user_agent=self.USER_AGENT,
+            viewport={'width': 1280, 'height': 800},
+            storage_state=storage_state
+        )
+        # تنظیم زمان انتظار پیش‌فرض
+        context.set_default_timeout(60000)  # 60 seconds
+        
+        # لغو درخواست‌های تصاویر، ویدیو، فونت و ردیاب‌ها در پروفایل مسدودسازی منابع
+        if self.block_resources:
+            self._apply_crawl_profile(context, True)
+        return context
+
+    def _apply_crawl_profile(self, context, enabled):
+        """
+        فعال یا غیرفعال کردن پروفایل مسدودسازی منابع روی یک زمینه مرورگر
+        (زمینه مرورگر اصلی بین اجراها حفظ می‌شود، پس پروفایل باید برای هر اجرا دوباره اعمال شود)
+        
+        :param context: زمینه مرورگر
+        :param enabled: فعال بودن پروفایل
+        """
+        context.unroute("**/*", self._route_crawl_request)
+        if enabled:
+            context.route("**/*", self._route_crawl_request)
+
+    def _route_crawl_request(self, route):
+        """
+        تصمیم‌گیری برای هر درخواست شبکه در پروفایل مسدودسازی منابع
+        
+        :param route: شیء route پلی‌رایت
+        """
+        request = route.request
+        resource_type = request.resource_type
+        
+        # خود سند صفحه هرگز مسدود نمی‌شود
+        if resource_type != 'document':
+            if resource_type in self.blocked_resource_types:
+                self._skip_request(route, resource_type)
+                return
+            if self._is_blocked_domain(request.url):
+                self._skip_request(route, 'tracker')
+                return
+        
+        route.continue_()
+
+    def _is_blocked_domain(self, url):
+        """
+        بررسی تعلق آدرس به یکی از دامنه‌های لیست مسدودسازی (شامل زیردامنه‌ها و مسیرهای مشخص شده)
+        """
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        for blocked in self.blocked_domains:
+            blocked_host, _, blocked_path = blocked.partition('/')
+            if host == blocked_host or host.endswith('.' + blocked_host):
+                if not blocked_path or parsed.path.lstrip('/').startswith(blocked_path):
+                    return True
+        return False
+
+    def _skip_request(self, route, category):
+        """
+        لغو یک درخواست و ثبت آمار آن
+        """
+        try:
+            route.abort('blockedbyclient')
+        except Error:
+            # صفحه ممکن است در این فاصله بسته شده باشد
+            return
+        self._record_stat('blocked_requests')
+        self._record_stat(f'blocked_type:{category}')
+        estimate_type = 'script' if category == 'tracker' else category
+        self._record_stat('blocked_bytes_estimate', self.ESTIMATED_RESOURCE_BYTES.get(estimate_type, 5000))
+
+    def _launch_crawl_browser(self, playwright, headless=False, debug_port=None):
+        """
+        راه‌اندازی مرورگر Chromium با آرگومان‌های مورد نیاز خزش
+        
+        :param playwright: نمونه Playwright
+        :param headless: اجرای مرورگر بدون رابط گرافیکی
+        :param debug_port: پورت محلی CDP برای اتصال کارگرهای thread های دیگر (None یعنی بدون اشتراک)
+        :return: شیء مرورگر
+        """
+        args = ['--disable-web-security', '--no-sandbox', '--disable-features=IsolateOrigins,site-per-process']
+        if debug_port:
+            args.append(f'--remote-debugging-port={debug_port}')
+        return playwright.chromium.launch(headless=headless, args=args)
+
+    def _launch_shared_browser(self, playwright, headless=False):
+        """
+        راه‌اندازی مرورگری که کارگرهای همزمان به جای مرورگر مستقل به آن متصل می‌شوند؛
+        هر کارگر فقط یک زمینه در همین فرآیند Chromium اضافه می‌کند
+        
+        :param playwright: نمونه Playwright این thread
+        :param headless: اجرای مرورگر بدون رابط گرافیکی
+        :return: (شیء مرورگر, آدرس اتصال CDP)
+        """
+        # پورت CDP فقط روی 127.0.0.1 در دسترس است
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as port_socket:
+            port_socket.bind(('127.0.0.1', 0))
+            debug_port = port_socket.getsockname()[1]
+        browser = self._launch_crawl_browser(playwright, headless, debug_port)
+        return browser, f"http://127.0.0.1:{debug_port}"
+
+    def _connect_worker_browser(self, playwright, browser_endpoint):
+        """
+        اتصال کارگر thread دیگر به مرورگر مشترک (API همگام Playwright اشیای یک thread را در
+        thread دیگر نمی‌پذیرد، پس هر کارگر اتصال CDP خود را دارد)؛ بدون مرورگر مشترک یا در صورت
+        خطای اتصال، مرورگر بدون رابط مستقل راه‌اندازی می‌شود
+        
+        :param playwright: نمونه Playwright کارگر
+        :param browser_endpoint: آدرس اتصال CDP مرورگر مشترک (یا None)
+        :return: شیء مرورگر؛ close() برای مرورگر مشترک فقط زمینه‌های این کارگر را می‌بندد و اتصال را قطع می‌کند
+        """
+        if browser_endpoint:
+            try:
+                return playwright.chromium.connect_over_cdp(browser_endpoint)
+            except Error as e:
+                self.ui_queue.put({
+                    'type': 'log',
+                    'text': f"Could not attach to the shared browser ({str(e)}); launching a separate one.\n"
+                })
+        return self._launch_crawl_browser(playwright, headless=True)
+
+    def _run_crawl_workers(self, frontier, browser_context, crawled_pages_data, browser_endpoint=None):
+        """
+        خزش صف با تعداد کارگرهای تعیین شده در crawl_concurrency؛
+        thread فعلی با زمینه مرورگر داده شده یکی از کارگرها است
+        
+        :param frontier: صف مشترک آدرس‌ها
+        :param browser_context: زمینه مرورگر thread فعلی
+        :param crawled_pages_data: دیکشنری مشترک نتایج خزش
+        :param browser_endpoint: آدرس CDP مرورگر مشترک که کارگرها زمینه خود را در آن می‌سازند
+        """
+        concurrency = max(1, self.crawl_concurrency)
+        if concurrency == 1:
+            # خزش ترتیبی با زمینه مرورگر داده شده
+            self._crawl_frontier_loop(frontier, browser_context, crawled_pages_data)
+            return
+        
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"Concurrent crawl: {concurrency} pages in flight.\n\n"
+        })
+        
+        # انتقال کوکی‌ها و localStorage (مثلاً ورود انجام‌شده توسط سناریو) به کارگرها
+        storage_state = browser_context.storage_state()
+        
+        worker_threads = []
+        for worker_idx in range(concurrency - 1):
+            worker = threading.Thread(
+                target=self._crawl_worker_thread,
+                args=(frontier, crawled_pages_data, storage_state, browser_endpoint),
+                daemon=True
+            )
+            worker_threads.append(worker)
+            worker.start()
+        
+        # thread فعلی نیز با زمینه مرورگر اصلی به عنوان یکی از کارگرها عمل می‌کند
+        self._crawl_frontier_loop(frontier, browser_context, crawled_pages_data)
+        
+        for worker in worker_threads:
+            worker.join()
+
+    def _crawl_worker_thread(self, frontier, crawled_pages_data, storage_state, browser_endpoint=None):
+        """
+        کارگر خزش همزمان با زمینه جداگانه در مرورگر مشترک
+        
+        :param frontier: صف مشترک آدرس‌ها
+        :param crawled_pages_data: دیکشنری مشترک نتایج خزش
+        :param storage_state: وضعیت ذخیره‌شده زمینه مرورگر اصلی
+        :param browser_endpoint: آدرس CDP مرورگر مشترک
+        """
+        worker_playwright = None
+        worker_browser = None
+        try:
+            worker_playwright = sync_playwright().start()
+            worker_browser = self._connect_worker_browser(worker_playwright, browser_endpoint)
+            worker_context = self._new_crawl_context(worker_browser, storage_state)
+            
+            self._crawl_frontier_loop(frontier, worker_context, crawled_pages_data)
+            
+        except Exception as e:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"Crawl worker stopped: {str(e)}\n"
+            })
+        finally:
+            try:
+                if worker_browser:
+                    worker_browser.close()
+                if worker_playwright:
+                    worker_playwright.stop()
+            except Exception as e:
+                print(f"Error closing worker browser: {str(e)}")
+
+    def _crawl_frontier_loop(self, frontier, browser_context, crawled_pages_data):
+        """
+        دریافت آدرس‌ها از صف مشترک و خزش آن‌ها تا پایان صف
+        
+        :param frontier: صف مشترک آدرس‌ها (CrawlFrontier)
+        :param browser_context: زمینه مرورگری که این کارگر از آن استفاده می‌کند
+        :param crawled_pages_data: دیکشنری مشترک نتایج خزش
+        """
+        # هر کارگر مخزن صفحات خود را دارد (صفحات Playwright به thread سازنده وابسته‌اند)
+        page_pool = None
+        if self.page_pool_enabled:
+            page_pool = PagePool(browser_context, self.page_pool_max_uses, self._record_stat)
+        
+        try:
+            while True:
+                item = frontier.get()
+                if item is None:
+                    break
+                
+                current_url, current_depth, parent_url, page_number = item
+                try:
+                    # ارسال پیام به UI
+                    self.ui_queue.put({
+                        'type': 'log',
+                        'text': f"Crawling ({page_number}): {current_url} (Depth: {current_depth})\n"
+                    })
+                    
+                    try:
+                        page_info = self._fetch_page_info(current_url, browser_context, page_pool)
+                        
+                        # پاسخ‌های 429/503 و بارگذاری ناقص با تایم‌اوت در صورت وجود سهمیه دوباره امتحان می‌شوند
+                        if page_info['page_status_code'] in self.RETRY_STATUSES + ('Timeout',) and self._retry_page_later(
+                            frontier, current_url, current_depth, parent_url,
+                            f"status {page_info['page_status_code']}", page_info.get('retry_after')
+                        ):
+                            continue
+                        
+                        # آدرس‌های زنجیره تغییر مسیر و آدرس نهایی همین سند هستند و جداگانه خزش نمی‌شوند؛
+                        # آدرس rel=canonical سند دیگری است و فقط در گزارش ثبت می‌شود
+                        redirect_chain = page_info.get('redirect_chain', [])
+                        aliases = self._same_host_aliases(current_url, redirect_chain + [page_info.get('final_url')])
+                        if aliases:
+                            collapsed = frontier.mark_seen(aliases)
+                            if collapsed:
+                                self._record_stat('canonical_aliases', len(collapsed))
+                        
+                        title = page_info['title']
+                        internal_links = page_info['internal_links']
+                        external_links = page_info['external_links']
+                        status_code = page_info['page_status_code']
+                        assets = page_info.get('assets', [])
+                        broken_assets = self._record_assets(current_url, assets)
+                        
+                        crawled_pages_data[current_url] = {
+                            'title': title,
+                            'status': 'Crawled',
+                            'depth': current_depth,
+                            'links_count': len(internal_links) + len(external_links),
+                            'parent_url': parent_url,
+                            'status_code': status_code,
+                            'external_links': external_links,
+                            'wait_ms': page_info.get('wait_ms', 0),
+                            'broken_assets': broken_assets
+                        }
+                        if page_info.get('canonical_url') and page_info['canonical_url'] != current_url:
+                            crawled_pages_data[current_url]['canonical_url'] = page_info['canonical_url']
+                        if redirect_chain:
+                            crawled_pages_data[current_url]['redirect_chain'] = redirect_chain
+                        
+                        # ارسال اطلاعات صفحه به UI
+                        log_text = ""
+                        if self.crawl_concurrency > 1 or self.crawl_processes > 1:
+                            # در خزش همزمان لاگ صفحات در هم می‌آیند، پس آدرس صفحه را تکرار می‌کنیم
+                            log_text += f"Result ({page_number}): {current_url}\n"
+                        log_text += f"Title: {title}\n"
+                        log_text += f"Status: {status_code}\n"
+                        if redirect_chain:
+                            log_text += f"Redirected ({len(redirect_chain) - 1} hop(s)): {' -> '.join(redirect_chain)}\n"
+                        log_text += f"Ready wait: {page_info.get('wait_ms', 0)} ms\n"
+                        log_text += f"Found {len(internal_links)} internal links\n"
+                        log_text += f"External links found: {len(external_links)}\n"
+                        if assets:
+                            log_text += f"Subresources: {len(assets)} ({len(broken_assets)} broken)\n"
+                        log_text += "\n"
+                        
+                        self.ui_queue.put({
+                            'type': 'log',
+                            'text': log_text
+                        })
+                        
+                        # اضافه کردن لینک‌های داخلی به صف
+                        queued_links = []
+                        if current_depth >= frontier.max_depth and self.probe_boundary_links:
+                            # لینک‌های یک سطح پس از حداکثر عمق فقط از نظر کد وضعیت بررسی می‌شوند
+                            boundary_links = frontier.unseen_links(internal_links)
+                            crawled_pages_data[current_url]['boundary_links'] = boundary_links
+                            if self.external_link_sink and boundary_links:
+                                self.external_link_sink(current_url, boundary_links, LinkIndex.BOUNDARY)
+                        elif current_depth < frontier.max_depth:
+                            queued_links = frontier.put_links(internal_links, current_depth + 1, current_url)
+                            internal_links_count = len(queued_links)
+                            
+                            queued_text = ""
+                            for link in queued_links[:10]:
+                                queued_text += f"    → Queued: {link}\n"
+                            
+                            if internal_links_count > 10:
+                                queued_text += f"    ... and {internal_links_count - 10} more links\n"
+                                
+                            queued_text += f"    Total internal links queued: {internal_links_count}\n\n"
+                            self.ui_queue.put({
+                                'type': 'log',
+                                'text': queued_text
+                            })
+                        
+                        # لینک‌های خارجی بدون انتظار برای پایان خزش به صف بررسی فرستاده می‌شوند
+                        if self.external_link_sink and external_links:
+                            self.external_link_sink(current_url, external_links)
+                        
+                        # صفحات خطادار ثبت نمی‌شوند تا پس از ادامه خزش دوباره امتحان شوند
+                        if self.crawl_checkpoint:
+                            self.crawl_checkpoint.record_page(
+                                current_url, crawled_pages_data[current_url], queued_links, current_depth + 1
+                            )
+                                
+                    except Exception as e:
+                        if self._is_transient_error(e) and self._retry_page_later(
+                            frontier, current_url, current_depth, parent_url, str(e).splitlines()[0]
+                        ):
+                            continue
+                        
+                        crawled_pages_data[current_url] = {
+                            'title': 'Error',
+                            'status': f'Error: {str(e)}',
+                            'depth': current_depth,
+                            'links_count': 0,
+                            'parent_url': parent_url,
+                            'status_code': 'Error',
+                            'external_links': [],
+                            'wait_ms': 0
+                        }
+                        
+                        self.ui_queue.put({
+                            'type': 'log',
+                            'text': f"Error processing page: {str(e)}\n\n"
+                        })
+                finally:
+                    frontier.task_done()
+        finally:
+            if page_pool:
+                page_pool.close()
+
+    def _fetch_page_info(self, url, browser_context=None, page_pool=None):
+        """
+        دریافت اطلاعات صفحه؛ در حالت HTTP-first ابتدا دریافت ساده HTTP امتحان می‌شود
+        و فقط صفحاتی که به اجرای جاوااسکریپت نیاز دارند با Playwright بارگذاری می‌شوند
+        
+        :param url: آدرس صفحه
+        :param browser_context: زمینه مرورگر برای بارگذاری با Playwright
+        :param page_pool: مخزن صفحات قابل استفاده مجدد (اختیاری)
+        :return: دیکشنری با ساختار یکسان خروجی _fetch_page_info_with_playwright
+        """
+        if self.http_first_fetch and urlparse(url).netloc.lower() not in self.js_render_hosts:
+            page_info = self._fetch_page_info_with_http(url)
+            if page_info is not None:
+                self._record_stat('http_fetches')
+                return page_info
+            self._record_stat('http_escalations')
+        
+        self._record_stat('playwright_fetches')
+        return self._fetch_page_info_with_playwright(url, browser_context, page_pool)
+
+    def _get_http_session(self):
+        """
+        نشست HTTP مخصوص thread فعلی با connection pool و keep-alive
+        (نشست requests برای استفاده همزمان در چند thread طراحی نشده است)
+        """
+        session = getattr(self._http_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = self.USER_AGENT
+            for cookie in self.http_seed_cookies:
+                session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain'), path=cookie.get('path', '/')
+                )
+            self._http_local.session = session
+        return session
+
+    def _fetch_page_info_with_http(self, url):
+        """
+        دریافت صفحه با یک درخواست HTTP ساده و استخراج عنوان و پیوندها بدون مرورگر
+        
+        :param url: آدرس صفحه
+        :return: دیکشنری اطلاعات صفحه یا None اگر صفحه باید با Playwright بارگذاری شود
+        """
+        try:
+            with self.host_scheduler.slot(url) as slot:
+                response = self._get_http_session().get(url, timeout=(5, 15), allow_redirects=True)
+                slot.status = response.status_code
+        except requests.exceptions.RequestException:
+            # خطاهای شبکه با Playwright دوباره امتحان می‌شوند تا پیام خطا مانند قبل باشد
+            return None
+        
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type.lower():
+            return None
+        
+        html = self._decode_html(response)
+        parser = PageLinkParser()
+        try:
+            parser.feed(html)
+            parser.close()
+        except Exception:
+            return None
+        
+        if self._page_needs_javascript(html, parser):
+            return None
+        
+        # response.url آدرس نهایی پس از تغییر مسیرها است (معادل page.url)
+        page_info = self._build_page_info(
+            parser.title, response.url, parser.hrefs, response.status_code, canonical_href=parser.canonical_href
+        )
+        page_info['redirect_chain'] = self._canonical_redirect_chain(
+            [hop.url for hop in response.history] + [response.url]
+        )
+        # تأخیر درخواست شده سرور برای تلاش مجدد پاسخ‌های 429/503 (مانند مسیر Playwright)
+        page_info['retry_after'] = RetryScheduler.parse_retry_after(response.headers.get('Retry-After'))
+        return page_info
+
+    def _decode_html(self, response):
+        """
+        تبدیل بدنه پاسخ به متن؛ requests برای text/html بدون charset به اشتباه ISO-8859-1 فرض می‌کند
+        """
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            encoding = requests.utils.get_encoding_from_headers(response.headers)
+        else:
+            meta_match = self.META_CHARSET_PATTERN.search(response.content[:2048])
+            encoding = meta_match.group(1).decode('ascii') if meta_match else 'utf-8'
+        try:
+            return response.content.decode(encoding, errors='replace')
+        except LookupError:
+            return response.content.decode('utf-8', errors='replace')
+
+    def _page_needs_javascript(self, html, parser):
+        """
+        تشخیص صفحاتی که محتوای آن‌ها در سمت کاربر ساخته می‌شود
+        
+        :param html: متن HTML دریافت شده
+        :param parser: تجزیه‌گر اجرا شده روی همان HTML
+        :return: True اگر صفحه باید با Playwright بارگذاری شود
+        """
+        # بدنه خالی یا تقریباً خالی
+        if parser.visible_text_length < 50 and not parser.hrefs:
+            return True
+        
+        # ریشه خالی فریم‌ورک‌های SPA (React/Vue/Next/Nuxt/Angular/...)
+        if self.SPA_ROOT_PATTERN.search(html):
+            return True
+        
+        # صفحاتی که بدون جاوااسکریپت فقط پیام "لطفاً جاوااسکریپت را فعال کنید" نشان می‌دهند
+        if parser.script_count and self.NOSCRIPT_JS_PATTERN.search(html) and parser.visible_text_length < 500:
+            return True
+        
+        return False
+
+    def _build_page_info(self, title, base_url, raw_links, status_code, wait_ms=0, canonical_href=None):
+        """
+        ساخت دیکشنری اطلاعات صفحه از پیوندهای خام؛ بین روش‌های مختلف دریافت صفحه مشترک است
+        
+        :param title: عنوان صفحه
+        :param base_url: آدرس نهایی صفحه برای تبدیل آدرس‌های نسبی
+        :param raw_links: لیست مقادیر href پیوندها
+        :param status_code: کد وضعیت HTTP
+        :param wait_ms: زمان صرف شده برای انتظار آماده شدن صفحه (میلی‌ثانیه)
+        :param canonical_href: مقدار href تگ link rel=canonical صفحه (در صورت وجود)
+        :return: دیکشنری حاوی عنوان صفحه، لیست پیوندهای داخلی و خارجی و کد وضعیت HTTP
+        """
+        canonicalize = self.url_canonicalizer.canonicalize
+        
+        # تبدیل آدرس‌های نسبی به مطلق، یکسان‌سازی گونه‌های هر آدرس و حذف آدرس‌های تکراری
+        unique_links = set()
+        variants = set()
+        for href in raw_links:
+            absolute_url = self._normalize_url(href, base_url)
+            if absolute_url:  # فقط آدرس‌های معتبر (غیر None) اضافه می‌شوند
+                canonical_url = canonicalize(absolute_url)
+                if canonical_url != absolute_url:
+                    variants.add(absolute_url)
+                unique_links.add(canonical_url)
+        if variants:
+            self._record_url_variants(variants)
+        
+        # مرتب‌سازی پیوندها برای نمایش بهتر
+        sorted_links = sorted(list(unique_links))
+        
+        # تشخیص لینک‌های داخلی و خارجی (آدرس پایه بدون یکسان‌سازی برای تبدیل آدرس‌های نسبی لازم است)
+        final_url = canonicalize(base_url)
+        bd = urlparse(final_url).netloc
+        internal_links = []
+        external_links = []
+        
+        for link in sorted_links:
+            parsed_link = urlparse(link)
+            # فقط لینک‌های HTTP و HTTPS را بررسی می‌کنیم
+            if parsed_link.scheme in ('http', 'https'):
+                if parsed_link.netloc == bd:
+                    internal_links.append(link)
+                else:
+                    external_links.append(link)
+        
+        # آدرس اعلام شده در link rel=canonical (نسخه اصلی صفحه‌ای که با چند آدرس در دسترس است)
+        page_canonical_url = None
+        if canonical_href and self.honor_canonical_links:
+            absolute_url = self._normalize_url(canonical_href, base_url)
+            if absolute_url:
+                page_canonical_url = canonicalize(absolute_url)
+        
+        return {
+            'title': title,
+            'internal_links': internal_links,
+            'external_links': external_links,
+            'page_status_code': status_code,
+            'wait_ms': wait_ms,
+            'final_url': final_url,
+            'canonical_url': page_canonical_url
+        }
+
+    def _fetch_page_info_with_playwright(self, url, browser_context=None, page_pool=None):
+        """
+        استفاده از Playwright برای دریافت عنوان صفحه، پیوندها و کد وضعیت HTTP
+        با استفاده از زمینه مرورگر موجود
+        
+        :param url: آدرس وب‌سایت
+        :param browser_context: زمینه مرورگر مورد استفاده (پیش‌فرض: زمینه مرورگر اصلی)
+        :param page_pool: مخزن صفحات؛ در صورت وجود، صفحه به جای ایجاد و بستن از مخزن گرفته و به آن بازگردانده می‌شود
+        :return: دیکشنری حاوی عنوان صفحه، لیست پیوندهای داخلی و خارجی و کد وضعیت HTTP
+        """
+        if browser_context is None:
+            browser_context = self.browser_context
+        if not browser_context:
+            raise Exception("Browser context is not initialized")
+            
+        page = None
+        assets = {}
+        try:
+            # دریافت صفحه از مخزن یا ایجاد صفحه جدید در زمینه مرورگر موجود
+            page = page_pool.acquire() if page_pool else browser_context.new_page()
+            self._watch_page_assets(page, page_pool, assets)
+            
+            # استفاده از استراتژی بارگذاری domcontentloaded برای سرعت بیشتر
+            # ذخیره پاسخ برای دریافت کد وضعیت HTTP
+            with self.host_scheduler.slot(url) as slot:
+                response = page.goto(url, wait_until='domcontentloaded')
+                
+                # دریافت کد وضعیت HTTP
+                status_code = response.status if response else "N/A"
+                slot.status = status_code
+                retry_after = None
+                if status_code in self.RETRY_STATUSES:
+                    retry_after = RetryScheduler.parse_retry_after(response.headers.get('retry-after'))
+            
+            # زنجیره تغییر مسیرها از درخواست نهایی تا درخواست اول (بدون فراخوانی اضافه)
+            redirect_chain = []
+            request = response.request if response else None
+            while request is not None:
+                redirect_chain.append(request.url)
+                request = request.redirected_from
+            redirect_chain.reverse()
+            
+            # اجازه دادن به صفحه برای بارگذاری کامل بر اساس استراتژی انتخاب شده
+            wait_ms = self._wait_for_page_ready(page, url)
+            
+            # دریافت عنوان، آدرس نهایی و تمام پیوندها در یک فراخوانی
+            title, base_url, raw_links, canonical_href = self._extract_page_links(page)
+            
+            # تبدیل آدرس‌ها و تفکیک لینک‌های داخلی و خارجی
+            page_info = self._build_page_info(title, base_url, raw_links, status_code, wait_ms, canonical_href)
+            page_info['assets'] = list(assets.values())
+            page_info['retry_after'] = retry_after
+            page_info['redirect_chain'] = self._canonical_redirect_chain(redirect_chain)
+            return page_info
+                
+        except TimeoutError as te:
+            # در صورت تایم‌اوت، سعی در دریافت عنوان و پیوندها در هر صورت
+            try:
+                status_code = "Timeout"  # کد وضعیت برای تایم‌اوت
+                
+                # تلاش برای استخراج پیوندها حتی در صورت بارگذاری ناقص صفحه
+                if page:
+                    title, base_url, raw_links, canonical_href = self._extract_page_links(page)
+                else:
+                    title, base_url, raw_links, canonical_href = "Unknown", url, [], None
+                
+                page_info = self._build_page_info(
+                    f"{title} (Note: Page loaded partially)", base_url, raw_links, status_code,
+                    canonical_href=canonical_href
+                )
+                page_info['assets'] = list(assets.values())
+                return page_info
+            except:
+                raise Exception(f"Timeout after 60 seconds. The website '{url}' is taking too long to respond.")
+                
+        except Error as e:
+            # تلاش برای استخراج کد خطا از متن خطا
+            error_message = str(e)
+            status_code = "Error"
+            
+            # بررسی آیا کد خطای HTTP در پیام خطا آمده است
+            if "status=" in error_message:
+                try:
+                    status_part = error_message.split("status=")[1]
+                    status_code = status_part.split()[0]  # گرفتن عدد بعد از status=
+                except:
+                    pass
+            
+            raise Exception(f"Playwright error: {error_message}")
+        finally:
+            # بستن صفحه (یا بازگرداندن آن به مخزن) پس از اتمام کار، اما نگه داشتن مرورگر و زمینه آن
+            if page:
+                try:
+                    if page_pool:
+                        page_pool.release(page)
+                    else:
+                        page.close()
+                except:
+                    pass  # در صورت بروز خطا در بستن صفحه، آن را نادیده می‌گیریم
+
+    def _watch_page_assets(self, page, page_pool, assets):
+        """
+        ثبت وضعیت منابع فرعی صفحه از رویدادهای شبکه‌ای که مرورگر در هر صورت تولید می‌کند
+        (بدون هیچ درخواست اضافه). listener ها با بازگشت صفحه به مخزن یا بستن آن حذف می‌شوند
+        
+        :param page: صفحه Playwright
+        :param page_pool: مخزن صفحات (None یعنی صفحه پس از استفاده بسته می‌شود)
+        :param assets: دیکشنری آدرس -> اطلاعات منبع که در طول بارگذاری صفحه پر می‌شود
+        """
+        def _is_subresource(request):
+            if not request.url.startswith(('http://', 'https://')):
+                return False
+            try:
+                # خود سند صفحه منبع فرعی نیست (iframe ها به عنوان منبع ثبت می‌شوند)
+                return not (request.is_navigation_request() and request.frame.parent_frame is None)
+            except Error:
+                return True
+        
+        def _on_response(response):
+            request = response.request
+            if not _is_subresource(request):
+                return
+            try:
+                size = int(response.headers.get('content-length', ''))
+            except ValueError:
+                size = None
+            response_start = request.timing.get('responseStart', -1)
+            assets[request.url] = {
+                'url': request.url,
+                'type': request.resource_type,
+                'status': response.status,
+                'size': size,
+                'ttfb_ms': round(response_start) if response_start >= 0 else None,
+            }
+        
+        def _on_request_failed(request):
+            if not _is_subresource(request):
+                return
+            failure = request.failure or 'Error'
+            # درخواست‌های لغو شده توسط پروفایل مسدودسازی منابع جزو منابع صفحه نیستند
+            if failure == 'net::ERR_BLOCKED_BY_CLIENT' and self.block_resources:
+                return
+            assets[request.url] = {
+                'url': request.url,
+                'type': request.resource_type,
+                'status': failure,
+                'size': None,
+                'ttfb_ms': None,
+            }
+        
+        for event, handler in (('response', _on_response), ('requestfailed', _on_request_failed)):
+            if page_pool:
+                page_pool.add_listener(page, event, handler)
+            else:
+                page.on(event, handler)
+
+    def _wait_for_page_ready(self, page, url):
+        """
+        انتظار برای آماده شدن صفحه پس از domcontentloaded بر اساس استراتژی انتخاب شده
+        
+        :param page: شیء صفحه Playwright
+        :param url: آدرس درخواست شده
+        :return: زمان صرف شده برای انتظار (میلی‌ثانیه)
+        """
+        host = urlparse(url).netloc.lower()
+        selector = self.readiness_selectors.get(host)
+        strategy = 'selector' if selector else self.readiness_strategy
+        
+        start_time = time.perf_counter()
+        timed_out = False
+        try:
+            if strategy == 'selector':
+                page.wait_for_selector(selector, state='attached', timeout=self.readiness_max_wait_ms)
+            elif strategy == 'links_stable':
+                timed_out = not page.evaluate(
+                    self.LINKS_STABLE_SCRIPT, [self.links_stable_ms, self.readiness_max_wait_ms]
+                )
+            elif strategy == 'networkidle_learned':
+                page.wait_for_load_state('networkidle', timeout=self._readiness_cap(host))
+            elif strategy == 'networkidle':
+                page.wait_for_load_state('networkidle', timeout=self.readiness_max_wait_ms)
+            # استراتژی dom: domcontentloaded کافی است
+        except Exception:
+            # اگر انتظار با مشکل مواجه شد، با محتوای فعلی صفحه ادامه می‌دهیم
+            timed_out = True
+        
+        wait_ms = (time.perf_counter() - start_time) * 1000
+        if strategy == 'networkidle_learned':
+            self._learn_readiness(host, wait_ms, timed_out)
+        
+        self._record_stat('readiness_waits')
+        self._record_stat('readiness_wait_ms', wait_ms)
+        if timed_out:
+            self._record_stat('readiness_timeouts')
+        return round(wait_ms)
+
+    def _readiness_cap(self, host):
+        """
+        سقف انتظار networkidle برای یک دامنه بر اساس زمان‌های مشاهده شده قبلی
+        
+        :param host: دامنه صفحه
+        :return: سقف انتظار (میلی‌ثانیه)
+        """
+        with self._readiness_lock:
+            history = self._readiness_history.get(host)
+            if not history:
+                return self.readiness_max_wait_ms
+            durations = sorted(ms for ms in history if ms is not None)
+            timeouts = len(history) - len(durations)
+        
+        # دامنه‌هایی که اغلب به networkidle نمی‌رسند (long-polling، ردیاب‌ها) فقط سقف کوتاه می‌گیرند
+        if timeouts > len(durations):
+            return min(self.readiness_max_wait_ms, self.READINESS_MIN_CAP_MS)
+        
+        p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+        return int(min(self.readiness_max_wait_ms, max(self.READINESS_MIN_CAP_MS, p90 * 1.5)))
+
+    def _learn_readiness(self, host, wait_ms, timed_out):
+        """
+        ثبت نتیجه انتظار networkidle برای یادگیری سقف انتظار دامنه (۲۰ نتیجه اخیر)
+        """
+        with self._readiness_lock:
+            history = self._readiness_history.setdefault(host, deque(maxlen=20))
+            history.append(None if timed_out else wait_ms)
+
+    def _extract_page_links(self, page):
+        """
+        استخراج عنوان، آدرس فعلی و مقدار href تمام پیوندهای صفحه با یک فراخوانی evaluate
+        (به جای یک رفت‌وبرگشت IPC برای هر پیوند)
+        
+        :param page: شیء صفحه Playwright
+        :return: tuple شامل (عنوان، آدرس صفحه، لیست مقادیر href، آدرس link rel=canonical یا None)
+        """
+        result = page.evaluate(self.LINK_EXTRACTION_SCRIPT)
+        return result['title'], result['url'], result['hrefs'], result.get('canonical')
+
+    def _normalize_url(self, href, base_url):
+        """
+        تبدیل آدرس‌های نسبی به آدرس‌های مطلق و فیلتر کردن آدرس‌های غیر استاندارد
+        
+        :param href: آدرس پیوند
+        :param base_url: آدرس پایه صفحه
+        :return: آدرس مطلق یا None برای آدرس‌های غیر استاندارد
+        """
+        # حذف لنگرها (fragments) از آدرس
+        href = href.split('#')[0]
+        
+        # رد کردن آدرس‌های جاوااسکریپت، تلفن، ایمیل و غیره
+        if href.startswith(('javascript:', 'tel:', 'mailto:', 'ftp:', 'file:', 'sms:', 'skype:', 'whatsapp:')):
+            return None
+                            
+        # اگر آدرس خالی باشد، بازگشت به صفحه فعلی است
+        if not href:
+            return base_url
+            
+        # تبدیل آدرس نسبی به مطلق
+        absolute_url = urljoin(base_url, href)
+        
+        # بررسی طرح آدرس - فقط http و https را قبول می‌کنیم
+        parsed_url = urlparse(absolute_url)
+        if parsed_url.scheme not in ('http', 'https'):
+            return None
+            
+        # حذف پارامترهای اضافی اگر لازم است (اختیاری)
+        clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+        if parsed_url.query:
+            clean_url += f"?{parsed_url.query}"
+            
+        return clean_url
+
+    def _run_timed_scenario_steps(self, page, steps, think_s=0):
+        """
+        اجرای اقدامات سناریو بدون لاگ هر اقدام و اندازه‌گیری زمان هر کدام
+        
+        :param page: شیء صفحه Playwright
+        :param steps: اقدامات برنامه سناریو
+        :param think_s: مکث بین اقدامات (ثانیه) که در زمان اقدامات حساب نمی‌شود
+        :return: (لیست زمان‌بندی اقدامات اجرا شده, پیام خطا یا None)
+        """
+        timings = []
+        for step_idx, step in enumerate(steps):
+            if think_s and step_idx:
+                time.sleep(think_s)
+            step_start = time.perf_counter()
+            try:
+                step.run(page)
+            except Exception as e:
+                timings.append({
+                    'type': step.action_type,
+                    'ms': round((time.perf_counter() - step_start) * 1000, 1),
+                    'passed': False
+                })
+                return timings, str(e)
+            timings.append({
+                'type': step.action_type,
+                'ms': round((time.perf_counter() - step_start) * 1000, 1),
+                'passed': True
+            })
+        return timings, None
+
+    def _run_load_test_users(self, plan, url, user_ids, config, storage_state, start_at, stop_event):
+        """
+        اجرای کاربران مجازی آزمون بار در این فرآیند، هر کاربر در thread جداگانه
+        
+        :param plan: برنامه کامپایل شده سناریو
+        :param url: آدرسی که هر تکرار سناریو از آن شروع می‌شود
+        :param user_ids: شماره کاربران مجازی این فرآیند (برای زمان‌بندی شروع تدریجی)
+        :param config: تنظیمات آزمون بار (users، ramp_up_s، duration_s، iterations، think_ms)
+        :param storage_state: وضعیت ذخیره‌شده ورود برای زمینه‌های کاربران (یا None)
+        :param start_at: زمان شروع آزمون (time.time)
+        :param stop_event: رویداد توقف آزمون
+        :return: لیست رکوردهای تکرارهای اجرا شده
+        """
+        records = []
+        user_threads = []
+        # کاربران مجازی این فرآیند زمینه‌های خود را در یک مرورگر مشترک می‌سازند
+        owner_playwright = sync_playwright().start()
+        shared_browser = None
+        try:
+            shared_browser, browser_endpoint = self._launch_shared_browser(owner_playwright, headless=True)
+            for user_idx in user_ids:
+                user_thread = threading.Thread(
+                    target=self._load_test_user,
+                    args=(plan, url, user_idx, config, storage_state, start_at, stop_event, records, browser_endpoint),
+                    daemon=True
+                )
+                user_threads.append(user_thread)
+                user_thread.start()
+            for user_thread in user_threads:
+                user_thread.join()
+        finally:
+            try:
+                if shared_browser:
+                    shared_browser.close()
+                owner_playwright.stop()
+            except Exception as e:
+                print(f"Error closing load test browser: {str(e)}")
+        return records
+
+    def _load_test_user(self, plan, url, user_idx, config, storage_state, start_at, stop_event, records,
+                        browser_endpoint=None):
+        """
+        یک کاربر مجازی: اتصال جداگانه به مرورگر مشترک و زمینه تازه برای هر تکرار سناریو
+        تا پایان مدت آزمون یا تعداد تکرارها
+        """
+        # شروع تدریجی کاربران در طول ramp-up؛ مدت آزمون پس از پایان ramp-up شمرده می‌شود
+        ramp_up_s = config['ramp_up_s']
+        if stop_event.wait(max(0, start_at + ramp_up_s * user_idx / config['users'] - time.time())):
+            return
+        deadline = start_at + ramp_up_s + config['duration_s'] if config['duration_s'] else None
+        think_s = config['think_ms'] / 1000
+        # بارگذاری صفحه شروع نیز به عنوان یک اقدام زمان‌بندی می‌شود
+        steps = (ScenarioStep('LOAD', f" به {url}", None, operator.methodcaller('goto', url, wait_until='domcontentloaded')),)
+        steps += plan.steps
+        
+        user_playwright = None
+        user_browser = None
+        try:
+            user_playwright = sync_playwright().start()
+            user_browser = self._connect_worker_browser(user_playwright, browser_endpoint)
+            iteration = 0
+            while not stop_event.is_set():
+                if config['iterations'] and iteration >= config['iterations']:
+                    break
+                if deadline and time.time() >= deadline:
+                    break
+                records.append(self._run_load_test_iteration(user_browser, storage_state, steps, think_s))
+                iteration += 1
+                if think_s and stop_event.wait(think_s):
+                    break
+        except Exception as e:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"کاربر مجازی {user_idx + 1} متوقف شد: {str(e)}\n"
+            })
+        finally:
+            try:
+                if user_browser:
+                    user_browser.close()
+                if user_playwright:
+                    user_playwright.stop()
+            except Exception as e:
+                print(f"Error closing load test browser: {str(e)}")
+
+    def _run_load_test_iteration(self, browser, storage_state, steps, think_s):
+        """
+        یک تکرار سناریو در زمینه مرورگر تازه
+        
+        :return: رکورد تکرار (زمان شروع و پایان، زمان هر اقدام و خطا)
+        """
+        record = {'started_at': time.time(), 'steps': [], 'error': None}
+        context = None
+        try:
+            context = self._new_crawl_context(browser, storage_state)
+            # سناریو بدون پروفایل مسدودسازی منابع اجرا می‌شود
+            self._apply_crawl_profile(context, False)
+            timings, record['error'] = self._run_timed_scenario_steps(context.new_page(), steps, think_s)
+            record['steps'] = [(timing['ms'], timing['passed']) for timing in timings]
+        except Exception as e:
+            record['error'] = str(e)
+        finally:
+            if context:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+        record['ended_at'] = time.time()
+        return record
+
+
+def _shard_crawl_process(shard_id, inboxes, log_queue, result_queue, pending_by_depth, current_level,
+                         done_event, max_depth, settings, storage_state, checkpoint_path=None):
+    """
+    نقطه ورود فرآیند shard: راه‌اندازی مرورگر مستقل و خزش آدرس‌های متعلق به این shard
+    
+    :param shard_id: شماره این shard
+    :param inboxes: صف‌های ورودی تمام shard ها
+    :param log_queue: صف پیام‌های لاگ که توسط فرآیند اصلی به UI منتقل می‌شود
+    :param result_queue: صف ارسال نتایج نهایی به فرآیند اصلی
+    :param pending_by_depth: شمارنده مشترک آدرس‌های پردازش نشده به تفکیک عمق
+    :param current_level: عمق در حال خزش
+    :param done_event: رویداد مشترک پایان خزش
+    :param max_depth: حداکثر عمق خزش
+    :param settings: تنظیمات خزش فرآیند اصلی
+    :param storage_state: وضعیت ذخیره‌شده زمینه مرورگر اصلی
+    :param checkpoint_path: فایل checkpoint مشترک خزش (None یعنی بدون checkpoint)
+    """
+    engine = CrawlEngine(log_queue)
+    engine._apply_crawl_settings(settings)
+    # هر shard سهم مساوی از ظرفیت هر دامنه دارد تا مجموع درخواست‌ها از سیاست دامنه بیشتر نشود
+    engine.host_scheduler = engine._new_host_scheduler(share=engine.crawl_processes)
+    engine.retry_scheduler = engine._new_retry_scheduler(share=engine.crawl_processes)
+    engine.url_canonicalizer = engine._new_url_canonicalizer()
+    visited_urls = engine._new_url_set()
+    sent_urls = engine._new_url_set()
+    
+    if checkpoint_path:
+        # آدرس‌های ثبت شده قبلاً ارسال شده‌اند (آدرس‌های در انتظار را فرآیند اصلی دوباره ارسال می‌کند)
+        checkpoint = CrawlCheckpoint(checkpoint_path)
+        for url in checkpoint.iter_seen_urls():
+            sent_urls.add(url)
+        for url in checkpoint.iter_page_urls():
+            if shard_for_url(url, len(inboxes)) == shard_id:
+                visited_urls.add(url)
+        checkpoint.close()
+        engine.crawl_checkpoint = CheckpointQueueWriter(log_queue)
+    
+    frontier = ShardFrontier(
+        shard_id, inboxes, pending_by_depth, current_level, done_event, max_depth,
+        visited_urls=visited_urls, sent_urls=sent_urls
+    )
+    
+    def _send_external_links(page_url, links, kind=LinkIndex.EXTERNAL):
+        # بررسی لینک‌ها در فرآیند اصلی انجام می‌شود
+        log_queue.put({'type': 'external_links', 'page': page_url, 'links': links, 'kind': kind})
+    engine.external_link_sink = _send_external_links
+    crawled_pages_data = {}
+    
+    shard_playwright = None
+    shard_browser = None
+    try:
+        shard_playwright = sync_playwright().start()
+        shard_browser, browser_endpoint = engine._launch_shared_browser(shard_playwright, headless=True)
+        engine.browser_context = engine._new_crawl_context(shard_browser, storage_state)
+        engine._run_crawl_workers(frontier, engine.browser_context, crawled_pages_data, browser_endpoint)
+    except Exception as e:
+        log_queue.put({
+            'type': 'log',
+            'text': f"Shard {shard_id} stopped: {str(e)}\n"
+        })
+    finally:
+        try:
+            if shard_browser:
+                shard_browser.close()
+            if shard_playwright:
+                shard_playwright.stop()
+        except Exception as e:
+            print(f"Error closing shard browser: {str(e)}")
+        result_queue.put((
+            shard_id, crawled_pages_data, frontier.pages_dispatched, engine.crawl_stats, engine.asset_health
+        ))
+
+
+def _load_test_process(process_id, plan, url, user_ids, config, storage_state, start_at, stop_event,
+                       log_queue, result_queue):
+    """
+    نقطه ورود فرآیند آزمون بار: اجرای کاربران مجازی سهم این فرآیند و ارسال رکوردهای تکرار
+    
+    :param process_id: شماره این فرآیند
+    :param plan: برنامه کامپایل شده سناریو
+    :param url: آدرس شروع هر تکرار
+    :param user_ids: شماره کاربران مجازی این فرآیند
+    :param config: تنظیمات آزمون بار
+    :param storage_state: وضعیت ذخیره‌شده ورود (یا None)
+    :param start_at: زمان شروع آزمون
+    :param stop_event: رویداد مشترک توقف آزمون
+    :param log_queue: صف پیام‌های لاگ که توسط فرآیند اصلی به UI منتقل می‌شود
+    :param result_queue: صف ارسال نتایج به فرآیند اصلی
+    """
+    engine = CrawlEngine(log_queue)
+    records = []
+    try:
+        records = engine._run_load_test_users(plan, url, user_ids, config, storage_state, start_at, stop_event)
+    finally:
+        result_queue.put((process_id, records))
+
+
+class WebsiteTesterApp(CrawlEngine):
+    """
+    کلاس اصلی برنامه آزمون وب‌سایت‌ها با Tkinter و Playwright
+    """
+    # مهلت اتصال آزمایشی به هر دامنه پیش از بررسی لینک‌های آن (کوتاه‌تر از مهلت درخواست‌ها)
+    HOST_PROBE_TIMEOUT_S = 5
+    # اقدامات سناریو روی المنت و متد Playwright متناظر با هر کدام
+    SCENARIO_ELEMENT_ACTIONS = {'FILL_INPUT': 'fill', 'CLICK_ELEMENT': 'click', 'CHECK_ELEMENT': 'check'}
+    SCENARIO_GET_BY_PATTERN = re.compile(r'get_by_(\w+)\s*\((.*)\)')
+    SCENARIO_GET_BY_METHODS = ('role', 'text', 'label', 'placeholder', 'test_id', 'title', 'alt_text')
+    # فیلدهای عددی اقدامات؛ مقادیر جایگذاری شده از ردیف داده به عدد صحیح برگردانده می‌شوند
+    SCENARIO_INT_FIELDS = frozenset({'timeout'})
+
+    def __init__(self, master):
+        """
+        راه‌اندازی اولیه برنامه
+        :param master: پنجره اصلی Tkinter
+        """
+        self.master = master
+        self.master.title("Website Test Tool - Alpha")
+        
+        # اندازه پیش‌فرض پنجره (پس از ساخت ابزارک‌ها به اندازه ردیف‌های تنظیمات بزرگ‌تر می‌شود)
+        self.window_width = 800
+        self.window_height = 600
+        
+        # متغیرهای مربوط به Playwright و مرورگر
+        self.playwright = None
+        self.browser = None
+        self.browser_context = None
+        # آدرس CDP مرورگر اصلی که کارگرهای خزش و اجراکننده‌های سناریو به آن متصل می‌شوند
+        self.browser_endpoint = None
+        
+        # وضعیت برنامه
+        self._crawling_in_progress = False
+        self.has_crawl_data = False
+        self.crawled_pages_data = {}
+        self.start_url = ""
+        
+        # متغیرهای گزارش لینک‌ها
+        self.link_index = LinkIndex()
+        self.all_broken_assets = []
+        # تعداد thread های ثابت بررسی لینک‌های خارجی (سقف هر دامنه را زمان‌بند دامنه‌ها تعیین می‌کند)
+        self.link_check_workers = 16
+        # حافظه ماندگار وضعیت لینک‌ها بین اجراها (None یعنی غیرفعال)
+        self.link_cache_path = None
+        self.link_cache_ttls = dict(LinkStatusCache.DEFAULT_TTLS)
+        # نادیده گرفتن حافظه و بررسی دوباره تمام لینک‌ها
+        self.force_link_refresh = False
+        self.link_status_cache = None
+        # کارگرهای بررسی لینک که همزمان با خزش اجرا می‌شوند
+        self._link_check_threads = []
+        # نتیجه بررسی DNS و اتصال هر دامنه در اجرای فعلی
+        self._host_probes = {}
+        self._host_probes_lock = threading.Lock()
+        
+        # متغیرهای جدید برای threading
+        self.ui_queue = queue.Queue()
+        self.crawl_thread = None
+
+        # راه‌اندازی هسته خزش و تنظیمات پیش‌فرض آن
+        super().__init__(self.ui_queue)
+        self.active_frontier = None
+        self.shard_stop_event = None
+
+        # متغیر برای سناریوی فعلی (برنامه کامپایل شده ScenarioPlan)
+        self.current_scenario = None
+        # برنامه‌های کامپایل شده سناریو بر اساس مسیر فایل: (mtime, اندازه, برنامه)
+        self._scenario_plans = {}
+        # تعداد اجراهای همزمان سناریو روی صفحات منطبق و نتایج آخرین اجرا
+        self.scenario_concurrency = 4
+        self.scenario_results = []
+        # رویداد توقف آزمون بار در حال اجرا
+        self.load_test_stop_event = None
+        
+        # دایرکتوری پیش‌فرض برای ذخیره خودکار گزارش‌ها
+        self.default_auto_save_dir = os.path.join(os.path.expanduser("~"), "WebsiteTesterApp_Reports")
+        # ایجاد دایرکتوری پیش‌فرض اگر وجود نداشته باشد
+        try:
+            os.makedirs(self.default_auto_save_dir, exist_ok=True)
+        except Exception as e:
+            print(f"خطا در ایجاد دایرکتوری پیش‌فرض ذخیره‌سازی: {e}")
+        # فایل‌های checkpoint خزش‌های ناتمام
+        self.checkpoint_dir = os.path.join(self.default_auto_save_dir, "checkpoints")
+        self.link_cache_path = os.path.join(self.default_auto_save_dir, "link_status_cache.sqlite")
+        # وضعیت‌های ورود ذخیره شده سناریوها و مدت اعتبار آن‌ها (0 یعنی سناریو در هر اجرا دوباره اجرا می‌شود)
+        self.auth_state_dir = os.path.join(self.default_auto_save_dir, "auth_states")
+        self.auth_state_ttl_hours = 0
+        
+        # ایجاد ابزارک‌های رابط کاربری
+        self._create_widgets()
+        self._fit_window_to_widgets()
+        
+        # اطمینان از بستن مرورگر در زمان خروج
+        self.master.protocol("WM_DELETE_WINDOW", self._on_closing)
+
+        # شروع پردازش پیام‌های UI
+        self._process_ui_queue()
+    
+    def _fit_window_to_widgets(self):
+        """
+        تنظیم اندازه، حداقل اندازه و موقعیت پنجره بر اساس عرض ردیف‌های تنظیمات
+        تا ردیف‌های آزمون بار و داده‌های سناریو بریده نشوند؛ کاهش ارتفاع فقط ناحیه خروجی را کوچک می‌کند
+        """
+        self.master.update_idletasks()
+        screen_width = self.master.winfo_screenwidth()
+        screen_height = self.master.winfo_screenheight()
+        self.window_width = min(max(self.window_width, self.master.winfo_reqwidth()), screen_width)
+        self.window_height = min(self.window_height, screen_height)
+        self.master.minsize(self.window_width, min(self.window_height, 480))
+        self.master.resizable(True, True)
+        x_position = (screen_width - self.window_width) // 2
+        y_position = (screen_height - self.window_height) // 2
+        self.master.geometry(f"{self.window_width}x{self.window_height}+{x_position}+{y_position}")
+    
+    def _create_widgets(self):
+        """
+        ایجاد و چیدمان تمام ابزارک‌های رابط کاربری
+        """
+        # فریم بالایی برای ورود آدرس و دکمه‌ها
+        self.top_frame = tk.Frame(self.master)
+        self.top_frame.pack(fill='x', padx=10, pady=5)
+        
+        # بخش ورود آدرس سایت
+        self.url_label = tk.Label(self.top_frame, text="Enter Website URL:", font=("Arial", 10))
+        self.url_label.pack(side='left', pady=5)
+        
+        self.url_entry = tk.Entry(self.top_frame, width=50, font=("Arial", 10))
+        self.url_entry.pack(side='left', padx=5, pady=5, expand=True, fill='x')
+        
+        # افزودن فیلد تنظیم حداکثر عمق خزش
+        self.max_depth_label = tk.Label(self.top_frame, text="Max Crawl Depth:", font=("Arial", 10))
+        self.max_depth_label.pack(side='left', pady=5)
+        
+        self.max_depth_entry = tk.Entry(self.top_frame, width=5, font=("Arial", 10))
+        self.max_depth_entry.insert(0, "1")  # مقدار پیش‌فرض
+        self.max_depth_entry.pack(side='left', padx=(0, 5), pady=5)
+        
+        # دکمه شروع آزمون
+        self.start_button = tk.Button(
+            self.top_frame, 
+            text="Start Test", 
+            font=("Arial", 10),
+            command=self._handle_start_test
+        )
+        self.start_button.pack(side='left', pady=5, padx=5)
+        
+        # دکمه ذخیره گزارش‌ها
+        self.save_reports_button = tk.Button(
+            self.top_frame,
+            text="Save Reports",
+            font=("Arial", 10),
+            command=self._handle_save_reports,
+            state=tk.DISABLED  # در ابتدا غیرفعال است
+        )
+        self.save_reports_button.pack(side='left', pady=5, padx=5)
+        
+        # فریم دوم برای ورود فایل سناریو و ضبط سناریو
+        self.scenario_frame = tk.Frame(self.master)
+        self.scenario_frame.pack(fill='x', padx=10, pady=0)
+        
+        # برچسب فایل سناریو
+        self.scenario_label = tk.Label(self.scenario_frame, text="Scenario File (JSON):", font=("Arial", 10))
+        self.scenario_label.pack(side='left', pady=5)
+        
+        # ورودی مسیر فایل سناریو
+        self.scenario_file_entry = tk.Entry(self.scenario_frame, width=50, font=("Arial", 10))
+        self.scenario_file_entry.pack(side='left', padx=5, pady=5, expand=True, fill='x')
+        
+        # دکمه مرور برای انتخاب فایل سناریو
+        self.browse_scenario_button = tk.Button(
+            self.scenario_frame,
+            text="Browse...",
+            font=("Arial", 10),
+            command=self._browse_for_scenario_file
+        )
+        self.browse_scenario_button.pack(side='left', pady=5, padx=5)
+        
+        # دکمه ضبط سناریو
+        self.record_scenario_button = tk.Button(
+            self.scenario_frame,
+            text="Record Scenario",
+            font=("Arial", 10),
+            command=self._handle_record_scenario
+        )
+        self.record_scenario_button.pack(side='left', pady=5, padx=5)
+        
+        # دکمه جدید تبدیل اسکریپت به JSON
+        self.convert_script_button = tk.Button(
+            self.scenario_frame,
+            text="Convert Script...",
+            font=("Arial", 10),
+            command=self._handle_convert_script_to_json
+        )
         self.convert_script_button.pack(side='left', pady=5, padx=5)
+
+        # مدت استفاده مجدد از ورود سناریو (ساعت)؛ 0 یعنی سناریو در هر اجرا دوباره اجرا می‌شود
+        self.auth_ttl_label = tk.Label(self.scenario_frame, text="Reuse login (h):", font=("Arial", 10))
+        self.auth_ttl_label.pack(side='left', pady=5)
+
+        self.auth_ttl_entry = tk.Entry(self.scenario_frame, width=4, font=("Arial", 10))
+        self.auth_ttl_entry.insert(0, "0")
+        self.auth_ttl_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # فریم سوم برای تنظیمات پیشرفته خزش
+        self.options_frame = tk.Frame(self.master)
+        self.options_frame.pack(fill='x', padx=10, pady=0)
+
+        # تعداد صفحاتی که به طور همزمان بارگذاری می‌شوند
+        self.concurrency_label = tk.Label(self.options_frame, text="Parallel Pages:", font=("Arial", 10))
+        self.concurrency_label.pack(side='left', pady=5)
+
+        self.concurrency_entry = tk.Entry(self.options_frame, width=5, font=("Arial", 10))
+        self.concurrency_entry.insert(0, "1")  # مقدار پیش‌فرض: خزش ترتیبی
+        self.concurrency_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # تعداد فرآیندهای خزش (هر فرآیند مرورگر مستقل دارد)
+        self.processes_label = tk.Label(self.options_frame, text="Processes:", font=("Arial", 10))
+        self.processes_label.pack(side='left', pady=5)
+
+        self.processes_entry = tk.Entry(self.options_frame, width=5, font=("Arial", 10))
+        self.processes_entry.insert(0, "1")  # مقدار پیش‌فرض: یک فرآیند
+        self.processes_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # تعداد اجراهای همزمان سناریو روی صفحات منطبق با الگوی هدف
+        self.scenario_concurrency_label = tk.Label(self.options_frame, text="Scenario runs:", font=("Arial", 10))
+        self.scenario_concurrency_label.pack(side='left', pady=5)
+
+        self.scenario_concurrency_entry = tk.Entry(self.options_frame, width=4, font=("Arial", 10))
+        self.scenario_concurrency_entry.insert(0, str(self.scenario_concurrency))
+        self.scenario_concurrency_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # استراتژی انتظار برای آماده شدن صفحه
+        self.readiness_label = tk.Label(self.options_frame, text="Wait:", font=("Arial", 10))
+        self.readiness_label.pack(side='left', pady=5)
+
+        self.readiness_combobox = ttk.Combobox(
+            self.options_frame,
+            values=CrawlEngine.READINESS_STRATEGIES,
+            state='readonly',
+            width=18,
+            font=("Arial", 10)
+        )
+        self.readiness_combobox.set('networkidle')  # رفتار پیش‌فرض قبلی
+        self.readiness_combobox.pack(side='left', padx=(0, 5), pady=5)
+
+        # ادامه خزش ناتمام قبلی همین آدرس و عمق از checkpoint
+        self.resume_crawl_var = tk.BooleanVar(value=True)
+        self.resume_crawl_check = tk.Checkbutton(
+            self.options_frame,
+            text="Resume",
+            font=("Arial", 10),
+            variable=self.resume_crawl_var
+        )
+        self.resume_crawl_check.pack(side='left', pady=5, padx=5)
+
+        # تعداد کارگرهای بررسی لینک‌های خارجی
+        self.link_workers_label = tk.Label(self.options_frame, text="Link checkers:", font=("Arial", 10))
+        self.link_workers_label.pack(side='left', pady=5)
+
+        self.link_workers_entry = tk.Entry(self.options_frame, width=4, font=("Arial", 10))
+        self.link_workers_entry.insert(0, str(self.link_check_workers))
+        self.link_workers_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # فریم چهارم برای تنظیمات نحوه دریافت صفحات
+        self.fetch_options_frame = tk.Frame(self.master)
+        self.fetch_options_frame.pack(fill='x', padx=10, pady=0)
+
+        # دریافت ابتدا با HTTP و استفاده از مرورگر فقط برای صفحات وابسته به جاوااسکریپت
+        self.http_first_var = tk.BooleanVar(value=False)
+        self.http_first_check = tk.Checkbutton(
+            self.fetch_options_frame,
+            text="HTTP-first",
+            font=("Arial", 10),
+            variable=self.http_first_var
+        )
+        self.http_first_check.pack(side='left', pady=5, padx=5)
+
+        # پروفایل خزش سبک: مسدود کردن تصاویر، ویدیو، فونت‌ها و ردیاب‌ها
+        self.block_resources_var = tk.BooleanVar(value=False)
+        self.block_resources_check = tk.Checkbutton(
+            self.fetch_options_frame,
+            text="Block media",
+            font=("Arial", 10),
+            variable=self.block_resources_var
+        )
+        self.block_resources_check.pack(side='left', pady=5, padx=5)
+
+        # بررسی دوباره تمام لینک‌های خارجی بدون استفاده از نتایج ذخیره شده اجراهای قبلی
+        self.force_link_refresh_var = tk.BooleanVar(value=False)
+        self.force_link_refresh_check = tk.Checkbutton(
+            self.fetch_options_frame,
+            text="Recheck links",
+            font=("Arial", 10),
+            variable=self.force_link_refresh_var
+        )
+        self.force_link_refresh_check.pack(side='left', pady=5, padx=5)
+
+        # بررسی کد وضعیت لینک‌های داخلی یک سطح پس از حداکثر عمق (بدون بارگذاری صفحه)
+        self.probe_boundary_var = tk.BooleanVar(value=False)
+        self.probe_boundary_check = tk.Checkbutton(
+            self.fetch_options_frame,
+            text="Probe boundary",
+            font=("Arial", 10),
+            variable=self.probe_boundary_var
+        )
+        self.probe_boundary_check.pack(side='left', pady=5, padx=5)
+
+        # حداکثر درخواست همزمان و حداقل فاصله درخواست‌ها به هر دامنه
+        self.host_concurrency_label = tk.Label(self.fetch_options_frame, text="Per host:", font=("Arial", 10))
+        self.host_concurrency_label.pack(side='left', pady=5)
+
+        self.host_concurrency_entry = tk.Entry(self.fetch_options_frame, width=4, font=("Arial", 10))
+        self.host_concurrency_entry.insert(0, "8")
+        self.host_concurrency_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        self.host_delay_label = tk.Label(self.fetch_options_frame, text="Delay (ms):", font=("Arial", 10))
+        self.host_delay_label.pack(side='left', pady=5)
+
+        self.host_delay_entry = tk.Entry(self.fetch_options_frame, width=6, font=("Arial", 10))
+        self.host_delay_entry.insert(0, "0")
+        self.host_delay_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # حداکثر تلاش مجدد هر صفحه یا لینک پس از خطای گذرا (0 یعنی بدون تلاش مجدد)
+        self.retries_label = tk.Label(self.fetch_options_frame, text="Retries:", font=("Arial", 10))
+        self.retries_label.pack(side='left', pady=5)
+
+        self.retries_entry = tk.Entry(self.fetch_options_frame, width=3, font=("Arial", 10))
+        self.retries_entry.insert(0, str(self.max_retries))
+        self.retries_entry.pack(side='left', padx=(0, 5), pady=5)
+
+        # دامنه‌هایی که همیشه با مرورگر بارگذاری می‌شوند (جدا شده با کاما)
+        self.js_hosts_label = tk.Label(self.fetch_options_frame, text="JS-only hosts:", font=("Arial", 10))
+        self.js_hosts_label.pack(side='left', pady=5)
+
+        self.js_hosts_entry = tk.Entry(self.fetch_options_frame, width=15, font=("Arial", 10))
+        self.js_hosts_entry.pack(side='left', padx=(0, 5), pady=5, expand=True, fill='x')
+
+        # فریم تنظیمات آزمون بار سناریو با کاربران مجازی همزمان
+        self.load_test_frame = tk.Frame(self.master)
+        self.load_test_frame.pack(fill='x', padx=10, pady=0)
+
+        self.load_test_entries = {}
+        # (کلید تنظیمات، برچسب، مقدار پیش‌فرض، عرض)؛ مدت 0 یعنی فقط تعداد تکرار و تکرار 0 یعنی فقط مدت
+        for key, label_text, default_value, width in (
+            ('users', "Virtual users:", "10", 4),
+            ('ramp_up_s', "Ramp-up (s):", "10", 4),
+            ('duration_s', "Duration (s):", "60", 5),
+            ('iterations', "Iterations/user:", "0", 4),
+            ('think_ms', "Think (ms):", "1000", 5),
+            ('processes', "LT processes:", "1", 3),
+        ):
+            tk.Label(self.load_test_frame, text=label_text, font=("Arial", 10)).pack(side='left', pady=5)
+            entry = tk.Entry(self.load_test_frame, width=width, font=("Arial", 10))
+            entry.insert(0, default_value)
+            entry.pack(side='left', padx=(0, 5), pady=5)
+            self.load_test_entries[key] = entry
+
+        self.load_test_button = tk.Button(
+            self.load_test_frame,
+            text="Run Load Test",
+            font=("Arial", 10),
+            command=self._handle_start_load_test
+        )
+        self.load_test_button.pack(side='left', pady=5, padx=5)
+
+        # فریم اجرای داده‌محور سناریو: مقادیر {{ستون}} اقدامات از هر ردیف فایل داده خوانده می‌شوند
+        self.dataset_frame = tk.Frame(self.master)
+        self.dataset_frame.pack(fill='x', padx=10, pady=0)
+
+        self.dataset_label = tk.Label(self.dataset_frame, text="Dataset (CSV/JSONL):", font=("Arial", 10))
+        self.dataset_label.pack(side='left', pady=5)
+
+        self.dataset_file_entry = tk.Entry(self.dataset_frame, width=50, font=("Arial", 10))
+        self.dataset_file_entry.pack(side='left', padx=5, pady=5, expand=True, fill='x')
+
+        self.browse_dataset_button = tk.Button(
+            self.dataset_frame,
+            text="Browse...",
+            font=("Arial", 10),
+            command=self._browse_for_dataset_file
+        )
+        self.browse_dataset_button.pack(side='left', pady=5, padx=5)
+
+        self.dataset_run_button = tk.Button(
+            self.dataset_frame,
+            text="Run Dataset",
+            font=("Arial", 10),
+            command=self._handle_start_dataset_run
+        )
+        self.dataset_run_button.pack(side='left', pady=5, padx=5)
+
+        # فریم برای notebook با سه تب (لاگ، درختی، گزارش لینک)
+        self.notebook = ttk.Notebook(self.master)
+        self.notebook.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        # ایجاد تب‌ها
+        self.log_frame = ttk.Frame(self.notebook)
+        self.result_frame = ttk.Frame(self.notebook)
+        self.link_report_frame = ttk.Frame(self.notebook)
+        
+        self.notebook.add(self.log_frame, text="Log")
+        self.notebook.add(self.result_frame, text="Tree View")
+        self.notebook.add(self.link_report_frame, text="Link Report")
+        
+        # ذخیره اندیس تب گزارش لینک
+        self.link_report_tab_index = 2
+        
+        # ناحیه نمایش خروجی متنی (لاگ)
+        self.output_text_area = tk.Text(self.log_frame, font=("Arial", 10))
+        self.output_text_area.pack(expand=True, fill='both', padx=5, pady=5)
+        
+        # اضافه کردن اسکرول‌بار برای متن
+        self.text_scrollbar = ttk.Scrollbar(self.log_frame, command=self.output_text_area.yview)
+        self.text_scrollbar.pack(side='right', fill='y')
+        self.output_text_area.config(yscrollcommand=self.text_scrollbar.set)
+        
+        # درخت نتایج
+        self.tree = None
+        
+        # ناحیه گزارش لینک
+        self.link_report_area = tk.Text(self.link_report_frame, font=("Arial", 10))
+        self.link_report_area.pack(expand=True, fill='both', padx=5, pady=5)
+        self.link_report_scrollbar = ttk.Scrollbar(self.link_report_frame,
+                                                   command=self.link_report_area.yview)
+        self.link_report_scrollbar.pack(side='right', fill='y')
+        self.link_report_area.config(yscrollcommand=self.link_report_scrollbar.set)
+    
+    def _handle_convert_script_to_json(self):
+        """
+        مدیریت تبدیل اسکریپت پایتون تولید شده توسط codegen به فرمت JSON سناریو
+        """
+        # درخواست فایل اسکریپت پایتون ورودی
+        input_py_path = filedialog.askopenfilename(
+            title="انتخاب فایل اسکریپت پایتون از codegen",
+            filetypes=(("Python files", "*.py"), ("All files", "*.*"))
+        )
+        
+        # اگر کاربر فایلی انتخاب نکرده باشد، خروج
+        if not input_py_path:
+            return
+            
+        # درخواست مسیر ذخیره‌سازی فایل JSON
+        output_json_path = filedialog.asksaveasfilename(
+            title="ذخیره فایل سناریو JSON",
+            defaultextension=".json",
+            filetypes=(("JSON files", "*.json"), ("All files", "*.*"))
+        )
+        
+        # اگر کاربر مسیر ذخیره‌سازی را انتخاب نکرده باشد، خروج
+        if not output_json_path:
+            return
+            
+        # تلاش برای تجزیه و تحلیل اسکریپت و تبدیل آن به فرمت JSON
+        try:
+            # لاگ شروع تبدیل
+            self.output_text_area.insert(tk.END, f"شروع تبدیل اسکریپت {os.path.basename(input_py_path)} به فرمت JSON...\n")
+            self.output_text_area.see(tk.END)
+            self.output_text_area.update_idletasks()
+            
+            # فراخوانی متد تجزیه اسکریپت
+            actions, target_url = self._parse_codegen_script(input_py_path)
+            
+            # بررسی اینکه آیا تجزیه موفقیت‌آمیز بوده است
+            if not actions:
+                raise ValueError("هیچ اقدامی از اسکریپت استخراج نشد. لطفاً اسکریپت را بررسی کنید.")
+                
+            # ساخت ساختار کامل سناریو JSON
+            script_name = os.path.basename(input_py_path).replace('.py', '')
+            scenario_data = {
+                "name": f"Scenario_{script_name}",
+                "target_url_pattern": target_url,
+                "actions": actions
+            }
+            
+            # ذخیره داده‌های JSON در فایل خروجی
+            with open(output_json_path, 'w', encoding='utf-8') as json_file:
+                json.dump(scenario_data, json_file, ensure_ascii=False, indent=2)
+                
+            # نمایش پیام موفقیت
+            success_msg = f"تبدیل با موفقیت انجام شد. {len(actions)} اقدام استخراج شد.\nفایل JSON در مسیر زیر ذخیره شد:\n{output_json_path}\n\n"
+            messagebox.showinfo("تبدیل موفقیت‌آمیز", success_msg)
+            
+            # افزودن به لاگ
+            self.output_text_area.insert(tk.END, success_msg)
+            self.output_text_area.see(tk.END)
+            
+            # قرار دادن مسیر فایل JSON در فیلد ورودی سناریو
+            self.scenario_file_entry.delete(0, tk.END)
+            self.scenario_file_entry.insert(0, output_json_path)
+            
+        except Exception as e:
+            # نمایش پیام خطا
+            error_msg = f"خطا در تبدیل اسکریپت: {str(e)}"
+            messagebox.showerror("خطا در تبدیل", error_msg)
+            
+            # افزودن به لاگ
+            self.output_text_area.insert(tk.END, error_msg + "\n\n")
+            self.output_text_area.see(tk.END)
+    
+    def _parse_codegen_script(self, python_script_path):
+        """
+        تجزیه و تحلیل اسکریپت پایتون تولید شده توسط codegen و استخراج اقدامات
+        
+        :param python_script_path: مسیر فایل اسکریپت پایتون
+        :return: tuple شامل (لیست اقدامات استخراج شده، URL هدف)
+        """
+        # خواندن محتوای فایل اسکریپت
+        try:
+            with open(python_script_path, 'r', encoding='utf-8') as script_file:
+                script_content = script_file.read()
+        except Exception as e:
+            raise ValueError(f"خطا در خواندن فایل اسکریپت: {str(e)}")
+            
+        # لیست برای ذخیره اقدامات استخراج شده
+        actions = []
+        
+        # متغیر برای ذخیره URL هدف (از اولین page.goto)
+        target_url = None
+        
+        # خواندن محتوا به خطوط برای تشخیص کلیک‌های تکراری
+        script_lines = script_content.splitlines()
+        
+        # الگوهای regex برای تطبیق با دستورات مختلف Playwright
+        
+        # الگوی page.goto - پشتیبانی از هر دو نوع کوتیشن
+        goto_pattern = re.compile(r'page\.goto\(["\']([^"\']+)["\']\s*(?:,\s*{[^}]*})?\)')
+        goto_matches = goto_pattern.findall(script_content)
+        if goto_matches:
+            target_url = goto_matches[0]  # اولین URL پیدا شده به عنوان URL هدف
+        
+        # لیست برای نگهداری اقدامات کلیک (برای فیلتر کردن کلیک‌های تکراری)
+        click_actions = []
+        
+        # تجزیه و تحلیل خط به خط
+        i = 0
+        while i < len(script_lines):
+            line = script_lines[i].strip()
+            
+            # بررسی خط کلیک
+            if '.click()' in line:
+                # تطبیق الگوی با page.locator().click()
+                locator_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.click\((?:[^)]*)\)', line)
+                
+                if locator_match:
+                    selector = locator_match.group(1)
+                    skip_click = False
+                    
+                    # بررسی خط بعدی برای fill روی همان المنت
+                    if i + 1 < len(script_lines):
+                        next_line = script_lines[i + 1].strip()
+                        if '.fill(' in next_line:
+                            next_locator_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.fill\(', next_line)
+                            if next_locator_match and next_locator_match.group(1) == selector:
+                                        skip_click = True
+                    
+                    if not skip_click:
+                        actions.append({
+                            "type": "CLICK_ELEMENT",
+                            "selector": selector
+                        })
+                    
+                # تطبیق الگوی با page.get_by_xxx().click()
+                getby_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.click\((?:[^)]*)\)', line)
+                if getby_match:
+                    selector_method = getby_match.group(1)
+                    skip_click = False
+                    
+                    # بررسی خط بعدی برای fill روی همان المنت
+                    if i + 1 < len(script_lines):
+                        next_line = script_lines[i + 1].strip()
+                        if '.fill(' in next_line:
+                            next_getby_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.fill\(', next_line)
+                            if next_getby_match and next_getby_match.group(1) == selector_method:
+                                skip_click = True
+                    
+                    if not skip_click:
+                        actions.append({
+                            "type": "CLICK_ELEMENT",
+                            "selector": selector_method
+                        })
+            
+            # بررسی خط check (چک باکس)
+            elif '.check()' in line:
+                # تطبیق الگوی با page.locator().check()
+                locator_check_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.check\((?:[^)]*)\)', line)
+                
+                if locator_check_match:
+                    selector = locator_check_match.group(1)
+                    actions.append({
+                        "type": "CHECK_ELEMENT",
+                        "selector": selector
+                    })
+                
+                # تطبیق الگوی با page.get_by_xxx().check()
+                getby_check_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.check\((?:[^)]*)\)', line)
+                if getby_check_match:
+                    selector_method = getby_check_match.group(1)
+                    actions.append({
+                        "type": "CHECK_ELEMENT",
+                        "selector": selector_method
+                    })
+            
+            # تطبیق با page.fill (با استفاده از page.locator و سایر روش‌ها)
+            elif '.fill(' in line:
+                # الگو برای page.locator().fill()
+                locator_fill_match = re.search(r'page\.locator\(["\']([^"\']+)["\']\)\.fill\(["\']([^"\']*)["\'](?:\s*,\s*{[^}]*})?\)', line)
+                if locator_fill_match:
+                    selector = locator_fill_match.group(1)
+                    text = locator_fill_match.group(2)
+                    actions.append({
+                        "type": "FILL_INPUT",
+                        "selector": selector,
+                        "text": text
+                    })
+                
+                # الگو برای page.get_by_xxx().fill()
+                getby_fill_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.fill\(["\']([^"\']*)["\'](?:\s*,\s*{[^}]*})?\)', line)
+                if getby_fill_match:
+                    selector_method = getby_fill_match.group(1)
+                    text = getby_fill_match.group(2)
+                    actions.append({
+                        "type": "FILL_INPUT",
+                        "selector": selector_method,
+                        "text": text
+                    })
+            
+            # تطبیق با page.wait_for_navigation و page.wait_for_load_state
+            elif 'page.wait_for_navigation' in line:
+                # الگو برای page.wait_for_navigation با یا بدون timeout
+                wait_nav_match = re.search(r'page\.wait_for_navigation\((?:{.*?timeout["\']?\s*:\s*(\d+).*?}|.*?)\)', line)
+                if wait_nav_match:
+                    timeout_match = wait_nav_match.group(1)
+                    timeout = int(timeout_match) if timeout_match else 30000  # مقدار پیش‌فرض 30 ثانیه
+                    actions.append({
+                        "type": "WAIT_FOR_NAVIGATION",
+                        "timeout": timeout
+                    })
+                    
+            elif 'page.wait_for_load_state' in line:
+                # الگو برای page.wait_for_load_state با یا بدون timeout
+                wait_load_match = re.search(r'page\.wait_for_load_state\(["\']?(\w+)?["\']?(?:.*?timeout["\']?\s*:\s*(\d+).*?)?\)', line)
+                if wait_load_match:
+                    state = wait_load_match.group(1)
+                    timeout_match = wait_load_match.group(2)
+                    timeout = int(timeout_match) if timeout_match else 30000  # مقدار پیش‌فرض 30 ثانیه
+                    actions.append({
+                        "type": "WAIT_FOR_NAVIGATION",
+                        "timeout": timeout,
+                        "state": state if state else "load"
+                    })
+            
+            i += 1
+            
+        # اگر URL هدف پیدا نشد، از نام فایل به عنوان جایگزین استفاده می‌کنیم
+        if not target_url:
+            target_url = os.path.basename(python_script_path).replace('.py', '')
+            
+        # اضافه کردن پیام لاگ با جزئیات اقدامات استخراج شده
+        action_types_count = {}
+        for action in actions:
+            action_type = action['type']
+            action_types_count[action_type] = action_types_count.get(action_type, 0) + 1
+            
+        log_msg = f"تجزیه اسکریپت کامل شد. استخراج {len(actions)} اقدام:\n"
+        for action_type, count in action_types_count.items():
+            log_msg += f"  • {action_type}: {count} مورد\n"
+            
+        self.output_text_area.insert(tk.END, log_msg)
+        self.output_text_area.see(tk.END)
         
-        # فریم برای notebook با سه تب (لاگ، درختی، گزارش لینک)
-        self.notebook = ttk.Notebook(self.master)
-        self.notebook.pack(fill='both', expand=True, padx=10, pady=5)
+        return actions, target_url
+
+    def _handle_record_scenario(self):
+        """
+        مدیریت دکمه ضبط سناریو - راه‌اندازی ابزار codegen پلی‌رایت
+        """
+        # درخواست URL شروع برای ضبط سناریو
+        start_url = simpledialog.askstring(
+            "ضبط سناریو", 
+            "لطفاً آدرس URL شروع برای ضبط سناریو را وارد کنید:", 
+            parent=self.master
+        )
         
-        # ایجاد تب‌ها
-        self.log_frame = ttk.Frame(self.notebook)
-        self.result_frame = ttk.Frame(self.notebook)
-        self.link_report_frame = ttk.Frame(self.notebook)
+        # بررسی اینکه URL وارد شده باشد
+        if not start_url:
+            return
+            
+        # اضافه کردن پروتکل پیش‌فرض اگر لازم باشد
+        if not start_url.startswith(('http://', 'https://')):
+            start_url = 'https://' + start_url
+            
+        # تعیین مسیر فایل خروجی برای اقدامات ضبط شده
+        output_dir = self.default_auto_save_dir
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        record_filename = f"recorded_actions_{timestamp}.py"
+        output_path = os.path.join(output_dir, record_filename)
         
-        self.notebook.add(self.log_frame, text="Log")
-        self.notebook.add(self.result_frame, text="Tree View")
-        self.notebook.add(self.link_report_frame, text="Link Report")
+        # اطمینان از وجود دایرکتوری خروجی
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except Exception as e:
+            messagebox.showerror("خطا", f"خطا در ایجاد دایرکتوری خروجی: {str(e)}")
+            return
+            
+        # اطلاع‌رسانی به کاربر در مورد شروع ضبط
+        messagebox.showinfo(
+            "ضبط سناریو شروع شد", 
+            "ضبط سناریو شروع شده است. لطفاً با پنجره مرورگر جدید کار کنید.\n"
+            "پس از اتمام، پنجره Playwright Inspector را ببندید."
+        )
         
-        # ذخیره اندیس تب گزارش لینک
-        self.link_report_tab_index = 2
+        # تلاش برای اجرای دستور codegen پلی‌رایت
+        try:
+            # ایجاد و اجرای دستور codegen
+            command = [
+                r"C:\Users\mohmmad moein\AppData\Roaming\npm\playwright.cmd",
+                "codegen",
+                start_url,
+                "-o", output_path,
+                "--target", "python", # <--- تغییر در اینجا
+                "-b", "chromium"
+            ]
+            
+            # اضافه کردن پیام به ناحیه لاگ
+            self.output_text_area.insert(tk.END, f"شروع ضبط سناریو برای {start_url}...\n")
+            self.output_text_area.see(tk.END)
+            self.output_text_area.update_idletasks()
+            
+            # اجرای codegen به عنوان یک فرآیند فرعی
+            process = subprocess.run(command, check=True)
+            
+            # اطلاع‌رسانی به کاربر پس از اتمام ضبط
+            messagebox.showinfo(
+                "ضبط سناریو تمام شد", 
+                f"ضبط سناریو با موفقیت به پایان رسید.\n"
+                f"اقدامات در فایل زیر ذخیره شدند:\n{output_path}\n\n"
+                f"می‌توانید از دکمه \"Convert Script...\" برای تبدیل این فایل به سناریو JSON استفاده کنید."
+            )
+            
+            # اضافه کردن پیام به ناحیه لاگ
+            self.output_text_area.insert(tk.END, f"ضبط سناریو با موفقیت به پایان رسید. اقدامات در {output_path} ذخیره شدند.\n\n")
+            self.output_text_area.see(tk.END)
+            self.output_text_area.update_idletasks()
+            
+        except FileNotFoundError:
+            # خطا اگر دستور playwright پیدا نشود
+            error_msg = (
+                "دستور 'playwright' یافت نشد. لطفاً مطمئن شوید که پلی‌رایت نصب شده است.\n"
+                "برای نصب پلی‌رایت: 'pip install playwright' و سپس 'playwright install'\n"
+            )
+            messagebox.showerror("خطا", error_msg)
+            self.output_text_area.insert(tk.END, error_msg + "\n")
+            self.output_text_area.see(tk.END)
+            
+        except subprocess.CalledProcessError as e:
+            # خطا اگر اجرای codegen با خطا مواجه شود
+            error_msg = f"خطا در اجرای ضبط سناریو: {str(e)}"
+            messagebox.showerror("خطا", error_msg)
+            self.output_text_area.insert(tk.END, error_msg + "\n")
+            self.output_text_area.see(tk.END)
+            
+        except Exception as e:
+            # سایر خطاها
+            error_msg = f"خطای غیرمنتظره: {str(e)}"
+            messagebox.showerror("خطا", error_msg)
+            self.output_text_area.insert(tk.END, error_msg + "\n")
+            self.output_text_area.see(tk.END)
+
+    def _browse_for_scenario_file(self):
+        """
+        باز کردن پنجره انتخاب فایل برای انتخاب فایل سناریو JSON
+        """
+        file_path = filedialog.askopenfilename(
+            title="انتخاب فایل سناریو JSON",
+            filetypes=(("JSON files", "*.json"), ("All files", "*.*"))
+        )
+        if file_path:  # اگر کاربر فایلی انتخاب کرده باشد
+            self.scenario_file_entry.delete(0, tk.END)  # پاک کردن متن فعلی
+            self.scenario_file_entry.insert(0, file_path)  # اضافه کردن مسیر جدید
+    
+    def _browse_for_dataset_file(self):
+        """
+        باز کردن پنجره انتخاب فایل داده CSV یا JSONL برای اجرای داده‌محور سناریو
+        """
+        file_path = filedialog.askopenfilename(
+            title="انتخاب فایل داده CSV یا JSONL",
+            filetypes=(("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl *.ndjson"), ("All files", "*.*"))
+        )
+        if file_path:
+            self.dataset_file_entry.delete(0, tk.END)
+            self.dataset_file_entry.insert(0, file_path)
+    
+    def _load_scenario(self, file_path):
+        """
+        بارگذاری، اعتبارسنجی و کامپایل فایل سناریو JSON؛ تا زمانی که فایل تغییر نکند
+        برنامه کامپایل شده قبلی دوباره استفاده می‌شود
         
-        # ناحیه نمایش خروجی متنی (لاگ)
-        self.output_text_area = tk.Text(self.log_frame, font=("Arial", 10))
-        self.output_text_area.pack(expand=True, fill='both', padx=5, pady=5)
+        :param file_path: مسیر فایل سناریو JSON
+        :return: برنامه کامپایل شده سناریو (ScenarioPlan) یا None در صورت خطا
+        """
+        try:
+            # بررسی وجود فایل
+            if not os.path.exists(file_path):
+                self.output_text_area.insert(tk.END, f"خطا: فایل سناریو '{file_path}' یافت نشد.\n")
+                return None
+            
+            cache_key = os.path.abspath(file_path)
+            file_stat = os.stat(cache_key)
+            cached = self._scenario_plans.get(cache_key)
+            if cached and cached[:2] == (file_stat.st_mtime_ns, file_stat.st_size):
+                return cached[2]
+                
+            # باز کردن و خواندن فایل JSON
+            with open(file_path, 'r', encoding='utf-8') as file:
+                scenario_data = json.load(file)
+                
+            # اعتبارسنجی ساختار پایه
+            required_keys = ["name", "target_url_pattern", "actions"]
+            for key in required_keys:
+                if key not in scenario_data:
+                    self.output_text_area.insert(tk.END, f"خطا: کلید '{key}' در فایل سناریو یافت نشد.\n")
+                    return None
+                    
+            # اعتبارسنجی نوع داده‌ها
+            if not isinstance(scenario_data["name"], str):
+                self.output_text_area.insert(tk.END, "خطا: فیلد 'name' باید یک رشته باشد.\n")
+                return None
+                
+            if not isinstance(scenario_data["target_url_pattern"], str):
+                self.output_text_area.insert(tk.END, "خطا: فیلد 'target_url_pattern' باید یک رشته باشد.\n")
+                return None
+                
+            if not isinstance(scenario_data["actions"], list):
+                self.output_text_area.insert(tk.END, "خطا: فیلد 'actions' باید یک لیست باشد.\n")
+                return None
+                
+            # سناریو معتبر است؛ کامپایل یک باره اقدامات
+            plan = self._compile_scenario(scenario_data)
+            for warning in plan.warnings:
+                self.output_text_area.insert(tk.END, f"{warning}\n")
+            self._scenario_plans[cache_key] = (file_stat.st_mtime_ns, file_stat.st_size, plan)
+            return plan
+            
+        except json.JSONDecodeError as e:
+            self.output_text_area.insert(tk.END, f"خطا در تجزیه فایل JSON: {str(e)}\n")
+            return None
+            
+        except ValueError as e:
+            self.output_text_area.insert(tk.END, f"خطا در اقدامات سناریو: {str(e)}\n")
+            return None
+            
+        except Exception as e:
+            self.output_text_area.insert(tk.END, f"خطا در بارگذاری فایل سناریو: {str(e)}\n")
+            return None
+    
+    def _on_closing(self):
+        """
+        مدیریت رویداد بستن پنجره - اطمینان از بستن مرورگر و thread ها
+        """
+        # توقف کاربران مجازی آزمون بار در حال اجرا
+        if self.load_test_stop_event:
+            self.load_test_stop_event.set()
         
-        # اضافه کردن اسکرول‌بار برای متن
-        self.text_scrollbar = ttk.Scrollbar(self.log_frame, command=self.output_text_area.yview)
-        self.text_scrollbar.pack(side='right', fill='y')
-        self.output_text_area.config(yscrollcommand=self.text_scrollbar.set)
+        # ذخیره آخرین دسته checkpoint؛ خزش در اجرای بعدی از همین نقطه ادامه می‌یابد
+        if self.crawl_checkpoint:
+            self.crawl_checkpoint.close()
         
-        # درخت نتایج
-        self.tree = None
+        # متوقف کردن کارگرهای خزش همزمان و فرآیندهای shard
+        if self.active_frontier:
+            self.active_frontier.close()
+        if self.shard_stop_event:
+            self.shard_stop_event.set()
         
-        # ناحیه گزارش لینک
-        self.link_report_area = tk.Text(self.link_report_frame, font=("Arial", 10))
-        self.link_report_area.pack(expand=True, fill='both', padx=5, pady=5)
-        self.link_report_scrollbar = ttk.Scrollbar(self.link_report_frame,
-                                                   command=self.link_report_area.yview)
-        self.link_report_scrollbar.pack(side='right', fill='y')
-        self.link_report_area.config(yscrollcommand=self.link_report_scrollbar.set)
+        # متوقف کردن crawling thread اگر در حال اجرا است
+        if self.crawl_thread and self.crawl_thread.is_alive():
+            # نمی‌توانیم thread را مجبور به توقف کنیم، اما مرورگر را می‌بندیم
+            self._close_browser()
+            # صبر کوتاهی برای اتمام thread
+            try:
+                self.crawl_thread.join(timeout=2)
+            except:
+                pass
+        
+        self._close_browser()
+        self.master.destroy()
     
-    def _handle_convert_script_to_json(self):
+    def _close_browser(self):
         """
-        مدیریت تبدیل اسکریپت پایتون تولید شده توسط codegen به فرمت JSON سناریو
+        بستن مرورگر و آزادسازی منابع آن به درستی
         """
-        # درخواست فایل اسکریپت پایتون ورودی
-        input_py_path = filedialog.askopenfilename(
-            title="انتخاب فایل اسکریپت پایتون از codegen",
-            filetypes=(("Python files", "*.py"), ("All files", "*.*"))
-        )
-        
-        # اگر کاربر فایلی انتخاب نکرده باشد، خروج
-        if not input_py_path:
-            return
+        try:
+            if self.browser:
+                self.browser.close()
+                self.browser = None
+                self.browser_endpoint = None
             
-        # درخواست مسیر ذخیره‌سازی فایل JSON
-        output_json_path = filedialog.asksaveasfilename(
-            title="ذخیره فایل سناریو JSON",
-            defaultextension=".json",
-            filetypes=(("JSON files", "*.json"), ("All files", "*.*"))
-        )
-        
-        # اگر کاربر مسیر ذخیره‌سازی را انتخاب نکرده باشد، خروج
-        if not output_json_path:
-            return
+            if self.playwright:
+                self.playwright.stop()  # استفاده صحیح از stop() به جای del
+                self.playwright = None
+                
+            self.browser_context = None
+            
+        except Exception as e:
+            print(f"Error closing browser: {str(e)}")
+    
+    def _init_browser(self):
+        """
+        راه‌اندازی مرورگر Playwright به درستی
+        """
+        if self.browser and self.playwright and self.browser_context:
+            return True
             
-        # تلاش برای تجزیه و تحلیل اسکریپت و تبدیل آن به فرمت JSON
         try:
-            # لاگ شروع تبدیل
-            self.output_text_area.insert(tk.END, f"شروع تبدیل اسکریپت {os.path.basename(input_py_path)} به فرمت JSON...\n")
-            self.output_text_area.see(tk.END)
-            self.output_text_area.update_idletasks()
-            
-            # فراخوانی متد تجزیه اسکریپت
-            actions, target_url = self._parse_codegen_script(input_py_path)
+            # راه‌اندازی نمونه Playwright 
+            if not self.playwright:
+                self.playwright = sync_playwright().start()
             
-            # بررسی اینکه آیا تجزیه موفقیت‌آمیز بوده است
-            if not actions:
-                raise ValueError("هیچ اقدامی از اسکریپت استخراج نشد. لطفاً اسکریپت را بررسی کنید.")
-                
-            # ساخت ساختار کامل سناریو JSON
-            script_name = os.path.basename(input_py_path).replace('.py', '')
-            scenario_data = {
-                "name": f"Scenario_{script_name}",
-                "target_url_pattern": target_url,
-                "actions": actions
-            }
+            # راه‌اندازی مرورگر
+            if not self.browser:
+                self.browser, self.browser_endpoint = self._launch_shared_browser(self.playwright, headless=False)
             
-            # ذخیره داده‌های JSON در فایل خروجی
-            with open(output_json_path, 'w', encoding='utf-8') as json_file:
-                json.dump(scenario_data, json_file, ensure_ascii=False, indent=2)
+            # ایجاد زمینه مرورگر
+            if not self.browser_context:
+                self.browser_context = self._new_crawl_context(self.browser)
                 
-            # نمایش پیام موفقیت
-            success_msg = f"تبدیل با موفقیت انجام شد. {len(actions)} اقدام استخراج شد.\nفایل JSON در مسیر زیر ذخیره شد:\n{output_json_path}\n\n"
-            messagebox.showinfo("تبدیل موفقیت‌آمیز", success_msg)
-            
-            # افزودن به لاگ
-            self.output_text_area.insert(tk.END, success_msg)
-            self.output_text_area.see(tk.END)
-            
-            # قرار دادن مسیر فایل JSON در فیلد ورودی سناریو
-            self.scenario_file_entry.delete(0, tk.END)
-            self.scenario_file_entry.insert(0, output_json_path)
+            return True
             
         except Exception as e:
-            # نمایش پیام خطا
-            error_msg = f"خطا در تبدیل اسکریپت: {str(e)}"
-            messagebox.showerror("خطا در تبدیل", error_msg)
-            
-            # افزودن به لاگ
-            self.output_text_area.insert(tk.END, error_msg + "\n\n")
-            self.output_text_area.see(tk.END)
+            self.output_text_area.insert(tk.END, f"Error initializing browser: {str(e)}\n")
+            self._close_browser()  # اطمینان از پاکسازی منابع در صورت خطا
+            return False
     
-    def _parse_codegen_script(self, python_script_path):
+    def _handle_start_test(self):
         """
-        تجزیه و تحلیل اسکریپت پایتون تولید شده توسط codegen و استخراج اقدامات
-        
-        :param python_script_path: مسیر فایل اسکریپت پایتون
-        :return: tuple شامل (لیست اقدامات استخراج شده، URL هدف)
+        پردازش دکمه شروع آزمون و اجرای خزش وب روی آدرس وارد شده
         """
-        # خواندن محتوای فایل اسکریپت
-        try:
-            with open(python_script_path, 'r', encoding='utf-8') as script_file:
-                script_content = script_file.read()
-        except Exception as e:
-            raise ValueError(f"خطا در خواندن فایل اسکریپت: {str(e)}")
+        # جلوگیری از شروع چندین عملیات خزش همزمان
+        if self._crawling_in_progress:
+            self._clear_output()
+            self.output_text_area.insert(tk.END, "A crawl is already in progress. Please wait for it to finish.")
+            return
+        
+        # دریافت آدرس از فیلد ورودی
+        url = self.url_entry.get().strip()
+        
+        # بررسی خالی نبودن فیلد آدرس
+        if not url:
+            self._clear_output()
+            self.output_text_area.insert(tk.END, "Error: Please enter a valid URL.")
+            return
             
-        # لیست برای ذخیره اقدامات استخراج شده
-        actions = []
+        # اگر پروتکل مشخص نشده، https را پیش فرض قرار می‌دهیم
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
         
-        # متغیر برای ذخیره URL هدف (از اولین page.goto)
-        target_url = None
+        # ذخیره آدرس شروع برای استفاده در گزارش‌ها
+        self.start_url = url
         
-        # خواندن محتوا به خطوط برای تشخیص کلیک‌های تکراری
-        script_lines = script_content.splitlines()
+        # دریافت و اعتبارسنجی حداکثر عمق خزش
+        max_depth_text = self.max_depth_entry.get().strip()
+        try:
+            max_depth = int(max_depth_text)
+            if max_depth < 0:
+                self._clear_output()
+                messagebox.showerror("خطا", "مقدار عمق خزش باید یک عدد صحیح غیرمنفی باشد.")
+                return
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "لطفاً یک عدد صحیح برای حداکثر عمق خزش وارد کنید.")
+            return
         
-        # الگوهای regex برای تطبیق با دستورات مختلف Playwright
+        # دریافت و اعتبارسنجی تعداد صفحات همزمان
+        concurrency_text = self.concurrency_entry.get().strip()
+        try:
+            concurrency = int(concurrency_text)
+            if concurrency < 1:
+                self._clear_output()
+                messagebox.showerror("خطا", "تعداد صفحات همزمان باید یک عدد صحیح مثبت باشد.")
+                return
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "لطفاً یک عدد صحیح برای تعداد صفحات همزمان وارد کنید.")
+            return
+        self.crawl_concurrency = concurrency
         
-        # الگوی page.goto - پشتیبانی از هر دو نوع کوتیشن
-        goto_pattern = re.compile(r'page\.goto\(["\']([^"\']+)["\']\s*(?:,\s*{[^}]*})?\)')
-        goto_matches = goto_pattern.findall(script_content)
-        if goto_matches:
-            target_url = goto_matches[0]  # اولین URL پیدا شده به عنوان URL هدف
+        # دریافت و اعتبارسنجی تعداد فرآیندهای خزش
+        processes_text = self.processes_entry.get().strip()
+        try:
+            processes = int(processes_text)
+            if processes < 1:
+                self._clear_output()
+                messagebox.showerror("خطا", "تعداد فرآیندها باید یک عدد صحیح مثبت باشد.")
+                return
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "لطفاً یک عدد صحیح برای تعداد فرآیندها وارد کنید.")
+            return
+        self.crawl_processes = processes
         
-        # لیست برای نگهداری اقدامات کلیک (برای فیلتر کردن کلیک‌های تکراری)
-        click_actions = []
+        # دریافت و اعتبارسنجی سیاست درخواست به هر دامنه
+        try:
+            host_concurrency = int(self.host_concurrency_entry.get().strip())
+            host_delay_ms = int(self.host_delay_entry.get().strip())
+            if host_concurrency < 1 or host_delay_ms < 0:
+                raise ValueError
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "سقف درخواست همزمان هر دامنه باید عدد صحیح مثبت و فاصله درخواست‌ها عدد صحیح غیرمنفی باشد.")
+            return
+        self.host_max_concurrency = host_concurrency
+        self.host_min_delay_ms = host_delay_ms
         
-        # تجزیه و تحلیل خط به خط
-        i = 0
-        while i < len(script_lines):
-            line = script_lines[i].strip()
-            
-            # بررسی خط کلیک
-            if '.click()' in line:
-                # تطبیق الگوی با page.locator().click()
-                locator_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.click\((?:[^)]*)\)', line)
-                
-                if locator_match:
-                    selector = locator_match.group(1)
-                    skip_click = False
-                    
-                    # بررسی خط بعدی برای fill روی همان المنت
-                    if i + 1 < len(script_lines):
-                        next_line = script_lines[i + 1].strip()
-                        if '.fill(' in next_line:
-                            next_locator_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.fill\(', next_line)
-                            if next_locator_match and next_locator_match.group(1) == selector:
-                                        skip_click = True
-                    
-                    if not skip_click:
-                        actions.append({
-                            "type": "CLICK_ELEMENT",
-                            "selector": selector
-                        })
-                    
-                # تطبیق الگوی با page.get_by_xxx().click()
-                getby_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.click\((?:[^)]*)\)', line)
-                if getby_match:
-                    selector_method = getby_match.group(1)
-                    skip_click = False
-                    
-                    # بررسی خط بعدی برای fill روی همان المنت
-                    if i + 1 < len(script_lines):
-                        next_line = script_lines[i + 1].strip()
-                        if '.fill(' in next_line:
-                            next_getby_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.fill\(', next_line)
-                            if next_getby_match and next_getby_match.group(1) == selector_method:
-                                skip_click = True
-                    
-                    if not skip_click:
-                        actions.append({
-                            "type": "CLICK_ELEMENT",
-                            "selector": selector_method
-                        })
-            
-            # بررسی خط check (چک باکس)
-            elif '.check()' in line:
-                # تطبیق الگوی با page.locator().check()
-                locator_check_match = re.search(r'page\.locator\(["\']([^"\']+)["\'](?:\s*,\s*{[^}]*})?\)\.check\((?:[^)]*)\)', line)
-                
-                if locator_check_match:
-                    selector = locator_check_match.group(1)
-                    actions.append({
-                        "type": "CHECK_ELEMENT",
-                        "selector": selector
-                    })
-                
-                # تطبیق الگوی با page.get_by_xxx().check()
-                getby_check_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.check\((?:[^)]*)\)', line)
-                if getby_check_match:
-                    selector_method = getby_check_match.group(1)
-                    actions.append({
-                        "type": "CHECK_ELEMENT",
-                        "selector": selector_method
-                    })
-            
-            # تطبیق با page.fill (با استفاده از page.locator و سایر روش‌ها)
-            elif '.fill(' in line:
-                # الگو برای page.locator().fill()
-                locator_fill_match = re.search(r'page\.locator\(["\']([^"\']+)["\']\)\.fill\(["\']([^"\']*)["\'](?:\s*,\s*{[^}]*})?\)', line)
-                if locator_fill_match:
-                    selector = locator_fill_match.group(1)
-                    text = locator_fill_match.group(2)
-                    actions.append({
-                        "type": "FILL_INPUT",
-                        "selector": selector,
-                        "text": text
-                    })
-                
-                # الگو برای page.get_by_xxx().fill()
-                getby_fill_match = re.search(r'page\.(get_by_\w+\([^)]*\))\.fill\(["\']([^"\']*)["\'](?:\s*,\s*{[^}]*})?\)', line)
-                if getby_fill_match:
-                    selector_method = getby_fill_match.group(1)
-                    text = getby_fill_match.group(2)
-                    actions.append({
-                        "type": "FILL_INPUT",
-                        "selector": selector_method,
-                        "text": text
-                    })
+        # دریافت و اعتبارسنجی حداکثر تلاش مجدد
+        try:
+            max_retries = int(self.retries_entry.get().strip())
+            if max_retries < 0:
+                raise ValueError
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "تعداد تلاش مجدد باید عدد صحیح غیرمنفی باشد.")
+            return
+        self.max_retries = max_retries
+        
+        # دریافت و اعتبارسنجی تعداد اجراهای همزمان سناریو
+        try:
+            scenario_concurrency = int(self.scenario_concurrency_entry.get().strip())
+            if scenario_concurrency < 1:
+                raise ValueError
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "تعداد اجراهای همزمان سناریو باید یک عدد صحیح مثبت باشد.")
+            return
+        self.scenario_concurrency = scenario_concurrency
+        
+        # دریافت و اعتبارسنجی مدت استفاده مجدد از ورود سناریو
+        try:
+            auth_state_ttl_hours = float(self.auth_ttl_entry.get().strip())
+            if not 0 <= auth_state_ttl_hours < float('inf'):
+                raise ValueError
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "مدت استفاده مجدد از ورود باید عددی غیرمنفی (ساعت) باشد.")
+            return
+        self.auth_state_ttl_hours = auth_state_ttl_hours
+        
+        # دریافت و اعتبارسنجی تعداد کارگرهای بررسی لینک
+        try:
+            link_workers = int(self.link_workers_entry.get().strip())
+            if link_workers < 1:
+                raise ValueError
+        except ValueError:
+            self._clear_output()
+            messagebox.showerror("خطا", "تعداد کارگرهای بررسی لینک باید یک عدد صحیح مثبت باشد.")
+            return
+        self.link_check_workers = link_workers
+        
+        # تنظیمات دریافت HTTP-first
+        self.http_first_fetch = self.http_first_var.get()
+        self.js_render_hosts = {
+            host.strip().lower() for host in self.js_hosts_entry.get().split(',') if host.strip()
+        }
+        
+        # پروفایل مسدودسازی منابع برای این اجرا
+        self.block_resources = self.block_resources_var.get()
+        
+        # استراتژی انتظار برای آماده شدن صفحات
+        self.readiness_strategy = self.readiness_combobox.get()
+        
+        # ادامه خزش از checkpoint یا شروع از ابتدا
+        self.resume_crawl = self.resume_crawl_var.get()
+        self.force_link_refresh = self.force_link_refresh_var.get()
+        self.probe_boundary_links = self.probe_boundary_var.get()
+        
+        # پاک کردن ناحیه خروجی
+        self._clear_output()
+        self._clear_tree_view()
+        self.link_index = LinkIndex()
+        self.all_broken_assets = []
+        self.scenario_results = []
+        self.link_report_area.delete(1.0, tk.END)
+        
+        # بررسی فایل سناریو
+        scenario_file_path = self.scenario_file_entry.get().strip()
+        if scenario_file_path:
+            self.current_scenario = self._load_scenario(scenario_file_path)
+            if self.current_scenario:
+                scenario_name = self.current_scenario.name
+                target_pattern = self.current_scenario.target_url_pattern
+                self.output_text_area.insert(tk.END, f"سناریو '{scenario_name}' برای الگوی URL '{target_pattern}' بارگذاری شد.\n\n")
+        else:
+            self.current_scenario = None
+        
+        # تغییر به تب لاگ برای نمایش پیشرفت
+        self.notebook.select(0)
+        
+        # تنظیم وضعیت رابط کاربری
+        self._crawling_in_progress = True
+        self.has_crawl_data = False
+        self.save_reports_button.config(state=tk.DISABLED)
+        self.start_button.config(state=tk.DISABLED)
+        self.start_button.update_idletasks()
+        
+        # شروع crawling در thread جداگانه با استفاده از عمق تعیین شده توسط کاربر
+        self.crawl_thread = threading.Thread(
+            target=self._perform_crawl_threaded, 
+            args=(url, max_depth),
+            daemon=True
+        )
+        self.crawl_thread.start()
+
+    def _compile_scenario(self, scenario_data):
+        """
+        تبدیل داده JSON سناریو به برنامه تغییرناپذیر؛ اعتبارسنجی اقدامات، تجزیه selector ها و
+        ساخت توضیحات لاگ فقط یک بار انجام می‌شود
+        
+        :param scenario_data: دیکشنری بارگذاری شده از فایل سناریو
+        :return: شیء ScenarioPlan
+        :raises ValueError: اگر یکی از اقدامات نامعتبر باشد
+        """
+        steps = []
+        warnings = []
+        for action_idx, action_obj in enumerate(scenario_data["actions"]):
+            step = self._compile_action(action_obj, action_idx)
+            if step is None:
+                # اقدام ناشناخته در برنامه قرار نمی‌گیرد
+                warnings.append(f"هشدار: نوع اقدام '{action_obj['type']}' پشتیبانی نمی‌شود و نادیده گرفته می‌شود.")
+                continue
+            # اقدامات دارای {{ستون}} برای هر ردیف داده دوباره با مقادیر ردیف کامپایل می‌شوند
+            if any(isinstance(value, str) and ScenarioPlan.PLACEHOLDER_PATTERN.search(value)
+                   for value in action_obj.values()):
+                step.template = dict(action_obj)
+            steps.append(step)
+        
+        return ScenarioPlan(scenario_data["name"], scenario_data["target_url_pattern"], steps, warnings)
+
+    def _compile_action(self, action_obj, action_idx=0, warn=True):
+        """
+        اعتبارسنجی و کامپایل یک اقدام سناریو
+        
+        :param action_obj: دیکشنری اقدام
+        :param action_idx: شماره اقدام در سناریو (برای پیام خطا)
+        :param warn: ارسال هشدارهای کامپایل selector به رابط کاربری
+        :return: شیء ScenarioStep یا None برای نوع اقدام ناشناخته
+        :raises ValueError: اگر اقدام نامعتبر باشد
+        """
+        # بررسی ساختار اقدام
+        if not isinstance(action_obj, dict) or 'type' not in action_obj:
+            raise ValueError(f"اقدام شماره {action_idx+1} فاقد فیلد 'type' است.")
+        
+        action_type = action_obj['type']
+        if action_type in self.SCENARIO_ELEMENT_ACTIONS:
+            required = ('selector', 'text') if action_type == "FILL_INPUT" else ('selector',)
+            if any(key not in action_obj for key in required):
+                raise ValueError(f"اقدام {action_type} فاقد {' یا '.join(repr(k) for k in required)} است.")
             
-            # تطبیق با page.wait_for_navigation و page.wait_for_load_state
-            elif 'page.wait_for_navigation' in line:
-                # الگو برای page.wait_for_navigation با یا بدون timeout
-                wait_nav_match = re.search(r'page\.wait_for_navigation\((?:{.*?timeout["\']?\s*:\s*(\d+).*?}|.*?)\)', line)
-                if wait_nav_match:
-                    timeout_match = wait_nav_match.group(1)
-                    timeout = int(timeout_match) if timeout_match else 30000  # مقدار پیش‌فرض 30 ثانیه
-                    actions.append({
-                        "type": "WAIT_FOR_NAVIGATION",
-                        "timeout": timeout
-                    })
+            selector = action_obj['selector']
+            locate = self._compile_selector(selector, warn)
+            method_name = self.SCENARIO_ELEMENT_ACTIONS[action_type]
+            short_selector = self._get_short_selector_description(selector)
+            if action_type == "FILL_INPUT":
+                text = action_obj['text']
+                description = f" در {short_selector} با مقدار {text}"
+                act = operator.methodcaller(method_name, text)
+            else:
+                description = f" روی {short_selector}"
+                act = operator.methodcaller(method_name)
+        
+        elif action_type == "GOTO_URL":
+            if 'url' not in action_obj:
+                raise ValueError("اقدام GOTO_URL فاقد 'url' است.")
+            url = action_obj['url']
+            description = f" به {url}"
+            locate, act = None, operator.methodcaller('goto', url)
+        
+        elif action_type == "WAIT_FOR_NAVIGATION":
+            # زمان انتظار پیش‌فرض 30 ثانیه
+            timeout = action_obj.get("timeout", 30000)
+            state = action_obj.get("state", "load")
+            description = f" با مهلت {timeout}ms و حالت {state}"
+            locate, act = None, operator.methodcaller('wait_for_load_state', state, timeout=timeout)
+        
+        else:
+            return None
+        
+        return ScenarioStep(action_type, description, locate, act)
+
+    def _bind_scenario_steps(self, plan, row):
+        """
+        جایگذاری مقادیر یک ردیف داده در اقدامات دارای {{ستون}}؛ سایر اقدامات بدون تغییر استفاده می‌شوند
+        
+        :param plan: برنامه کامپایل شده سناریو
+        :param row: دیکشنری مقادیر ردیف (نام ستون -> مقدار)
+        :return: تاپل اقدامات آماده اجرا
+        :raises ValueError: اگر مقدار یکی از ستون‌ها در ردیف نباشد یا به نوع فیلد تبدیل نشود
+        """
+        def _fill(match):
+            value = row.get(match.group(1))
+            if value is None:
+                raise ValueError(f"مقدار ستون '{match.group(1)}' در ردیف داده یافت نشد")
+            return str(value)
+        
+        def _bind(key, value):
+            if not isinstance(value, str):
+                return value
+            whole_match = ScenarioPlan.PLACEHOLDER_PATTERN.fullmatch(value.strip())
+            if whole_match and row.get(whole_match.group(1)) is not None:
+                # مقدار تنها یک {{ستون}} است: نوع مقدار ردیف (مثلا عدد در JSONL) حفظ می‌شود
+                bound = row[whole_match.group(1)]
+            else:
+                bound = ScenarioPlan.PLACEHOLDER_PATTERN.sub(_fill, value)
+            return self._coerce_scenario_field(key, bound)
+        
+        steps = []
+        for action_idx, step in enumerate(plan.steps):
+            if step.template is None:
+                steps.append(step)
+                continue
+            bound_action = {key: _bind(key, value) for key, value in step.template.items()}
+            # هشدارهای selector یک بار هنگام کامپایل برنامه گزارش شده‌اند و برای هر ردیف تکرار نمی‌شوند
+            steps.append(self._compile_action(bound_action, action_idx, warn=False))
+        return tuple(steps)
+
+    def _coerce_scenario_field(self, key, value):
+        """
+        برگرداندن مقدار جایگذاری شده به نوع اصلی فیلد اقدام (مثلا timeout عددی)
+        
+        :param key: نام فیلد اقدام
+        :param value: مقدار پس از جایگذاری ستون‌ها
+        :return: عدد صحیح برای فیلدهای SCENARIO_INT_FIELDS و رشته برای سایر فیلدها
+        :raises ValueError: اگر مقدار فیلد عددی عدد صحیح نباشد
+        """
+        if key not in self.SCENARIO_INT_FIELDS:
+            return str(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            number = None
+        if number is None or not number.is_integer():
+            raise ValueError(f"مقدار '{value}' برای فیلد عددی '{key}' معتبر نیست")
+        return int(number)
+
+    def _compile_selector(self, selector, warn=True):
+        """
+        تبدیل رشته selector به تابع سازنده locator (بدون تجزیه دوباره هنگام اجرا)
+        
+        :param selector: رشته selector (CSS، XPath یا get_by_xxx)
+        :param warn: ارسال هشدار selector های پشتیبانی نشده به رابط کاربری
+        :return: تابعی که صفحه Playwright را گرفته و locator را برمی‌گرداند
+        :raises ValueError: اگر پارامتر اصلی متد get_by_ یافت نشود
+        """
+        # بررسی اگر selector یک عبارت get_by_ است
+        if selector.startswith('get_by_'):
+            method_match = self.SCENARIO_GET_BY_PATTERN.search(selector)
+            if method_match:
+                method_name = method_match.group(1)
+                if method_name in self.SCENARIO_GET_BY_METHODS:
+                    # استخراج پارامترهای متد با در نظر گرفتن نقل قول‌ها
+                    params = self._parse_function_params(method_match.group(2))
+                    value = params.get('positional', [None])[0] if params.get('positional') else None
+                    if value is None:
+                        raise ValueError(f"پارامتر {method_name} در {selector} پیدا نشد")
                     
-            elif 'page.wait_for_load_state' in line:
-                # الگو برای page.wait_for_load_state با یا بدون timeout
-                wait_load_match = re.search(r'page\.wait_for_load_state\(["\']?(\w+)?["\']?(?:.*?timeout["\']?\s*:\s*(\d+).*?)?\)', line)
-                if wait_load_match:
-                    state = wait_load_match.group(1)
-                    timeout_match = wait_load_match.group(2)
-                    timeout = int(timeout_match) if timeout_match else 30000  # مقدار پیش‌فرض 30 ثانیه
-                    actions.append({
-                        "type": "WAIT_FOR_NAVIGATION",
-                        "timeout": timeout,
-                        "state": state if state else "load"
+                    # حذف نقل قول‌ها و تبدیل مقادیر بولی رشته‌ای به بولی واقعی
+                    kwargs = {}
+                    if method_name != 'test_id':
+                        for k, v in params.get('named', {}).items():
+                            if v.startswith('"') or v.startswith("'"):
+                                v = v.strip('"\'')
+                            elif v.lower() in ('true', 'false'):
+                                v = (v.lower() == 'true')
+                            kwargs[k] = v
+                    return operator.methodcaller(f"get_by_{method_name}", value.strip('"\''), **kwargs)
+                
+                # selector های get_by_ ناشناخته با locator ساده امتحان می‌شوند
+                if warn:
+                    self.ui_queue.put({
+                        'type': 'log',
+                        'text': f"هشدار: نوع متد get_by_{method_name} پشتیبانی نمی‌شود. تلاش با locator ساده.\n"
                     })
-            
-            i += 1
-            
-        # اگر URL هدف پیدا نشد، از نام فایل به عنوان جایگزین استفاده می‌کنیم
-        if not target_url:
-            target_url = os.path.basename(python_script_path).replace('.py', '')
-            
-        # اضافه کردن پیام لاگ با جزئیات اقدامات استخراج شده
-        action_types_count = {}
-        for action in actions:
-            action_type = action['type']
-            action_types_count[action_type] = action_types_count.get(action_type, 0) + 1
-            
-        log_msg = f"تجزیه اسکریپت کامل شد. استخراج {len(actions)} اقدام:\n"
-        for action_type, count in action_types_count.items():
-            log_msg += f"  • {action_type}: {count} مورد\n"
-            
-        self.output_text_area.insert(tk.END, log_msg)
-        self.output_text_area.see(tk.END)
         
-        return actions, target_url
+        # پشتیبانی از سایر الگوهای locator
+        elif selector.startswith('xpath=') or selector.startswith('//'):
+            # تبدیل به xpath صریح
+            xpath_selector = selector if selector.startswith('xpath=') else f"xpath={selector}"
+            return operator.methodcaller('locator', xpath_selector)
+        
+        elif selector.startswith('text=') or (selector.startswith('"') and selector.endswith('"')) or (selector.startswith("'") and selector.endswith("'")):
+            # تبدیل به text selector صریح
+            if selector.startswith('"') or selector.startswith("'"):
+                return operator.methodcaller('locator', f"text={selector[1:-1]}")
+            return operator.methodcaller('locator', selector)
+        
+        # در صورتی که الگوهای خاص تطبیق نداشتند یا selector یک CSS یا XPath ساده است
+        return operator.methodcaller('locator', selector)
 
-    def _handle_record_scenario(self):
+    def _execute_scenario_actions(self, page, steps):
         """
-        مدیریت دکمه ضبط سناریو - راه‌اندازی ابزار codegen پلی‌رایت
+        اجرای اقدامات کامپایل شده سناریو روی یک صفحه Playwright
+        
+        :param page: شیء صفحه Playwright که اقدامات روی آن اجرا می‌شوند
+        :param steps: اقدامات برنامه سناریو (ScenarioPlan.steps)
+        :return: True در صورت موفقیت، False در صورت شکست
         """
-        # درخواست URL شروع برای ضبط سناریو
-        start_url = simpledialog.askstring(
-            "ضبط سناریو", 
-            "لطفاً آدرس URL شروع برای ضبط سناریو را وارد کنید:", 
-            parent=self.master
-        )
+        if not steps:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': "خطا: لیست اقدامات سناریو خالی یا نامعتبر است.\n"
+            })
+            return False
         
-        # بررسی اینکه URL وارد شده باشد
-        if not start_url:
-            return
+        step_count = len(steps)
+        for action_idx, step in enumerate(steps):
+            action_log = f"اجرای اقدام سناریو {action_idx+1}/{step_count}: {step.action_type}{step.description}"
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"{action_log} - شروع...\n"
+            })
             
-        # اضافه کردن پروتکل پیش‌فرض اگر لازم باشد
-        if not start_url.startswith(('http://', 'https://')):
-            start_url = 'https://' + start_url
+            try:
+                step.run(page)
+            except Exception as e:
+                # ثبت خطای اقدام
+                self.ui_queue.put({
+                    'type': 'log',
+                    'text': f"{action_log} - خطا: {str(e)}\n"
+                })
+                return False
             
-        # تعیین مسیر فایل خروجی برای اقدامات ضبط شده
-        output_dir = self.default_auto_save_dir
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        record_filename = f"recorded_actions_{timestamp}.py"
-        output_path = os.path.join(output_dir, record_filename)
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"{action_log} - موفق\n"
+            })
+                
+        # همه اقدامات با موفقیت اجرا شدند
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"تمام {step_count} اقدام سناریو با موفقیت اجرا شدند.\n"
+        })
+        return True
+
+    def _open_auth_snapshot(self, plan, crawl_url):
+        """
+        :return: وضعیت ورود ذخیره شده سناریو برای دامنه خزش یا None اگر استفاده مجدد از ورود غیرفعال است
+        """
+        if not self.auth_state_dir or self.auth_state_ttl_hours <= 0:
+            return None
+        return StorageStateSnapshot(
+            StorageStateSnapshot.path_for(
+                self.auth_state_dir, plan.name, plan.target_url_pattern, urlparse(crawl_url).netloc
+            ),
+            self.auth_state_ttl_hours * 3600
+        )
+
+    def _restore_auth_snapshot(self, auth_snapshot):
+        """
+        جایگزینی زمینه مرورگر اصلی با زمینه‌ای که وضعیت ورود ذخیره شده را دارد؛
+        کارگرهای خزش، فرآیندهای shard و اجراهای سناریو وضعیت را از همین زمینه دریافت می‌کنند
         
-        # اطمینان از وجود دایرکتوری خروجی
+        :return: True اگر وضعیت معتبری بازیابی شد
+        """
+        storage_state, age_s = auth_snapshot.load()
+        if storage_state is None:
+            return False
         try:
-            os.makedirs(output_dir, exist_ok=True)
+            new_context = self._new_crawl_context(self.browser, storage_state)
         except Exception as e:
-            messagebox.showerror("خطا", f"خطا در ایجاد دایرکتوری خروجی: {str(e)}")
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"خطا در بازیابی وضعیت ورود ذخیره شده: {str(e)}. سناریو دوباره اجرا می‌شود.\n"
+            })
+            auth_snapshot.clear()
+            return False
+        self._apply_crawl_profile(new_context, False)
+        try:
+            self.browser_context.close()
+        except Exception:
+            pass
+        self.browser_context = new_context
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"اطلاعات: از وضعیت ورود ذخیره شده سناریو استفاده می‌شود "
+                    f"(عمر {age_s / 60:.0f} دقیقه، انقضا پس از {(auth_snapshot.ttl_s - age_s) / 60:.0f} دقیقه).\n\n"
+        })
+        return True
+
+    def _save_auth_snapshot(self, auth_snapshot):
+        """
+        ذخیره کوکی‌ها و localStorage زمینه اصلی پس از اجرای موفق سناریو
+        """
+        try:
+            auth_snapshot.save(self.browser_context.storage_state())
+        except (OSError, Error) as e:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"هشدار: ذخیره وضعیت ورود سناریو ممکن نشد: {str(e)}\n"
+            })
             return
-            
-        # اطلاع‌رسانی به کاربر در مورد شروع ضبط
-        messagebox.showinfo(
-            "ضبط سناریو شروع شد", 
-            "ضبط سناریو شروع شده است. لطفاً با پنجره مرورگر جدید کار کنید.\n"
-            "پس از اتمام، پنجره Playwright Inspector را ببندید."
-        )
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"اطلاعات: وضعیت ورود سناریو برای {self.auth_state_ttl_hours:g} ساعت ذخیره شد.\n\n"
+        })
+
+    def _run_scenario_on_urls(self, plan, urls):
+        """
+        اجرای موازی سناریو روی چند آدرس؛ هر آدرس در زمینه مرورگر جداگانه با کوکی‌های زمینه اصلی اجرا می‌شود
         
-        # تلاش برای اجرای دستور codegen پلی‌رایت
-        try:
-            # ایجاد و اجرای دستور codegen
-            command = [
-                r"C:\Users\mohmmad moein\AppData\Roaming\npm\playwright.cmd",
-                "codegen",
-                start_url,
-                "-o", output_path,
-                "--target", "python", # <--- تغییر در اینجا
-                "-b", "chromium"
-            ]
-            
-            # اضافه کردن پیام به ناحیه لاگ
-            self.output_text_area.insert(tk.END, f"شروع ضبط سناریو برای {start_url}...\n")
-            self.output_text_area.see(tk.END)
-            self.output_text_area.update_idletasks()
-            
-            # اجرای codegen به عنوان یک فرآیند فرعی
-            process = subprocess.run(command, check=True)
-            
-            # اطلاع‌رسانی به کاربر پس از اتمام ضبط
-            messagebox.showinfo(
-                "ضبط سناریو تمام شد", 
-                f"ضبط سناریو با موفقیت به پایان رسید.\n"
-                f"اقدامات در فایل زیر ذخیره شدند:\n{output_path}\n\n"
-                f"می‌توانید از دکمه \"Convert Script...\" برای تبدیل این فایل به سناریو JSON استفاده کنید."
-            )
-            
-            # اضافه کردن پیام به ناحیه لاگ
-            self.output_text_area.insert(tk.END, f"ضبط سناریو با موفقیت به پایان رسید. اقدامات در {output_path} ذخیره شدند.\n\n")
-            self.output_text_area.see(tk.END)
-            self.output_text_area.update_idletasks()
-            
-        except FileNotFoundError:
-            # خطا اگر دستور playwright پیدا نشود
-            error_msg = (
-                "دستور 'playwright' یافت نشد. لطفاً مطمئن شوید که پلی‌رایت نصب شده است.\n"
-                "برای نصب پلی‌رایت: 'pip install playwright' و سپس 'playwright install'\n"
-            )
-            messagebox.showerror("خطا", error_msg)
-            self.output_text_area.insert(tk.END, error_msg + "\n")
-            self.output_text_area.see(tk.END)
-            
-        except subprocess.CalledProcessError as e:
-            # خطا اگر اجرای codegen با خطا مواجه شود
-            error_msg = f"خطا در اجرای ضبط سناریو: {str(e)}"
-            messagebox.showerror("خطا", error_msg)
-            self.output_text_area.insert(tk.END, error_msg + "\n")
-            self.output_text_area.see(tk.END)
-            
-        except Exception as e:
-            # سایر خطاها
-            error_msg = f"خطای غیرمنتظره: {str(e)}"
-            messagebox.showerror("خطا", error_msg)
-            self.output_text_area.insert(tk.END, error_msg + "\n")
-            self.output_text_area.see(tk.END)
+        :param plan: برنامه کامپایل شده سناریو
+        :param urls: آدرس‌های منطبق با الگوی هدف
+        :return: لیست نتایج هر آدرس به ترتیب آدرس
+        """
+        if not urls:
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"اطلاعات: صفحه خزش شده دیگری با الگوی سناریو '{plan.name}' مطابقت ندارد.\n\n"
+            })
+            return []
+        
+        runner_count = min(max(1, self.scenario_concurrency), len(urls))
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"اجرای سناریو '{plan.name}' روی {len(urls)} صفحه منطبق با {runner_count} اجرای همزمان...\n"
+        })
+        
+        # انتقال کوکی‌ها و localStorage (مثلاً ورود انجام‌شده توسط سناریو) به زمینه‌های اجرا
+        storage_state = self.browser_context.storage_state()
+        work_queue = queue.Queue()
+        for url in urls:
+            work_queue.put((url, url, None, None))
+        for _ in range(runner_count):
+            work_queue.put(None)
+        results = {}
+        
+        run_start = time.perf_counter()
+        runner_threads = self._start_scenario_runners(
+            plan, work_queue, storage_state, results.__setitem__, runner_count, self.browser_endpoint
+        )
+        for runner in runner_threads:
+            runner.join()
+        elapsed_s = time.perf_counter() - run_start
+        
+        # آدرس‌هایی که هیچ اجراکننده‌ای (به دلیل خطای راه‌اندازی مرورگر) به آن‌ها نرسید
+        while True:
+            try:
+                work_item = work_queue.get_nowait()
+            except queue.Empty:
+                break
+            if work_item is None:
+                continue
+            url = work_item[1]
+            results[url] = {
+                'url': url, 'passed': False, 'failed_step': None, 'error': "اجراکننده سناریو در دسترس نبود",
+                'load_ms': 0, 'total_ms': 0, 'steps': []
+            }
+        
+        ordered_results = [results[url] for url in sorted(results)]
+        self.ui_queue.put({
+            'type': 'log',
+            'text': self._format_scenario_summary(plan, ordered_results, runner_count, elapsed_s)
+        })
+        return ordered_results
 
-    def _browse_for_scenario_file(self):
+    def _start_scenario_runners(self, plan, work_queue, storage_state, on_result, runner_count, browser_endpoint):
         """
-        باز کردن پنجره انتخاب فایل برای انتخاب فایل سناریو JSON
+        راه‌اندازی thread های اجراکننده سناریو
+        
+        :param browser_endpoint: آدرس CDP مرورگر مشترکی که اجراکننده‌ها زمینه‌های خود را در آن می‌سازند
+        :return: لیست thread های اجراکننده
         """
-        file_path = filedialog.askopenfilename(
-            title="انتخاب فایل سناریو JSON",
-            filetypes=(("JSON files", "*.json"), ("All files", "*.*"))
-        )
-        if file_path:  # اگر کاربر فایلی انتخاب کرده باشد
-            self.scenario_file_entry.delete(0, tk.END)  # پاک کردن متن فعلی
-            self.scenario_file_entry.insert(0, file_path)  # اضافه کردن مسیر جدید
-    
-    def _load_scenario(self, file_path):
+        runner_threads = []
+        for _ in range(runner_count):
+            runner = threading.Thread(
+                target=self._scenario_runner_thread,
+                args=(plan, work_queue, storage_state, on_result, browser_endpoint),
+                daemon=True
+            )
+            runner_threads.append(runner)
+            runner.start()
+        return runner_threads
+
+    def _scenario_runner_thread(self, plan, work_queue, storage_state, on_result, browser_endpoint=None):
         """
-        بارگذاری و اعتبارسنجی فایل سناریو JSON
+        اجراکننده سناریو با اتصال جداگانه به مرورگر مشترک؛ هر کار زمینه سبک جداگانه‌ای در همان مرورگر دارد
         
-        :param file_path: مسیر فایل سناریو JSON
-        :return: دیکشنری حاوی اطلاعات سناریو یا None در صورت خطا
+        :param plan: برنامه کامپایل شده سناریو
+        :param work_queue: صف مشترک کارها (کلید، آدرس، ردیف داده یا None، نام کار در لاگ یا None)؛
+                           None به جای کار یعنی پایان کارها
+        :param storage_state: وضعیت ذخیره‌شده زمینه مرورگر اصلی
+        :param on_result: تابع دریافت نتیجه هر کار (کلید، نتیجه)
+        :param browser_endpoint: آدرس CDP مرورگر مشترک
         """
+        runner_playwright = None
+        runner_browser = None
         try:
-            # بررسی وجود فایل
-            if not os.path.exists(file_path):
-                self.output_text_area.insert(tk.END, f"خطا: فایل سناریو '{file_path}' یافت نشد.\n")
-                return None
-                
-            # باز کردن و خواندن فایل JSON
-            with open(file_path, 'r', encoding='utf-8') as file:
-                scenario_data = json.load(file)
-                
-            # اعتبارسنجی ساختار پایه
-            required_keys = ["name", "target_url_pattern", "actions"]
-            for key in required_keys:
-                if key not in scenario_data:
-                    self.output_text_area.insert(tk.END, f"خطا: کلید '{key}' در فایل سناریو یافت نشد.\n")
-                    return None
-                    
-            # اعتبارسنجی نوع داده‌ها
-            if not isinstance(scenario_data["name"], str):
-                self.output_text_area.insert(tk.END, "خطا: فیلد 'name' باید یک رشته باشد.\n")
-                return None
-                
-            if not isinstance(scenario_data["target_url_pattern"], str):
-                self.output_text_area.insert(tk.END, "خطا: فیلد 'target_url_pattern' باید یک رشته باشد.\n")
-                return None
-                
-            if not isinstance(scenario_data["actions"], list):
-                self.output_text_area.insert(tk.END, "خطا: فیلد 'actions' باید یک لیست باشد.\n")
-                return None
+            runner_playwright = sync_playwright().start()
+            runner_browser = self._connect_worker_browser(runner_playwright, browser_endpoint)
+            while True:
+                work_item = work_queue.get()
+                if work_item is None:
+                    break
+                key, url, row, label = work_item
+                on_result(key, self._run_scenario_in_new_context(plan, runner_browser, storage_state, url, row, label))
                 
-            # سناریو معتبر است
-            return scenario_data
-            
-        except json.JSONDecodeError as e:
-            self.output_text_area.insert(tk.END, f"خطا در تجزیه فایل JSON: {str(e)}\n")
-            return None
-            
         except Exception as e:
-            self.output_text_area.insert(tk.END, f"خطا در بارگذاری فایل سناریو: {str(e)}\n")
-            return None
-    
-    def _on_closing(self):
-        """
-        مدیریت رویداد بستن پنجره - اطمینان از بستن مرورگر و thread ها
-        """
-        # متوقف کردن crawling thread اگر در حال اجرا است
-        if self.crawl_thread and self.crawl_thread.is_alive():
-            # نمی‌توانیم thread را مجبور به توقف کنیم، اما مرورگر را می‌بندیم
-            self._close_browser()
-            # صبر کوتاهی برای اتمام thread
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"اجراکننده سناریو متوقف شد: {str(e)}\n"
+            })
+        finally:
             try:
-                self.crawl_thread.join(timeout=2)
-            except:
-                pass
-        
-        self._close_browser()
-        self.master.destroy()
-    
-    def _close_browser(self):
+                if runner_browser:
+                    runner_browser.close()
+                if runner_playwright:
+                    runner_playwright.stop()
+            except Exception as e:
+                print(f"Error closing scenario runner browser: {str(e)}")
+
+    def _run_scenario_in_new_context(self, plan, browser, storage_state, url, row=None, label=None):
         """
-        بستن مرورگر و آزادسازی منابع آن به درستی
+        اجرای سناریو روی یک آدرس در زمینه مرورگر تازه و ثبت نتیجه آن
+        
+        :param row: ردیف داده برای جایگذاری در اقدامات دارای {{ستون}} (None یعنی اقدامات بدون تغییر)
+        :param label: نام کار در لاگ (پیش‌فرض آدرس)
+        :return: دیکشنری نتیجه اجرا (موفقیت، اقدام ناموفق، خطا و زمان‌بندی‌ها)
         """
+        result = {'url': url, 'passed': False, 'failed_step': None, 'error': None,
+                  'load_ms': 0, 'total_ms': 0, 'steps': []}
+        run_start = time.perf_counter()
+        context = None
         try:
-            if self.browser:
-                self.browser.close()
-                self.browser = None
-            
-            if self.playwright:
-                self.playwright.stop()  # استفاده صحیح از stop() به جای del
-                self.playwright = None
-                
-            self.browser_context = None
+            steps = plan.steps if row is None else self._bind_scenario_steps(plan, row)
+        except ValueError as e:
+            result['error'] = str(e)
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"  سناریو روی {label or url}: ناموفق: {result['error']}\n"
+            })
+            return result
+        try:
+            context = self._new_crawl_context(browser, storage_state)
+            # سناریو بدون پروفایل مسدودسازی منابع اجرا می‌شود
+            self._apply_crawl_profile(context, False)
+            page = context.new_page()
+            page.goto(url, wait_until='domcontentloaded')
+            result['load_ms'] = round((time.perf_counter() - run_start) * 1000, 1)
             
+            result['steps'], result['error'] = self._run_timed_scenario_steps(page, steps)
+            result['passed'] = result['error'] is None
+            if not result['passed']:
+                result['failed_step'] = len(result['steps'])
         except Exception as e:
-            print(f"Error closing browser: {str(e)}")
-    
-    def _init_browser(self):
+            result['error'] = str(e)
+        finally:
+            if context:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+        result['total_ms'] = round((time.perf_counter() - run_start) * 1000, 1)
+        
+        if result['passed']:
+            status_text = "موفق"
+        elif result['failed_step']:
+            status_text = (f"ناموفق در اقدام {result['failed_step']} "
+                           f"({result['steps'][-1]['type']}): {result['error']}")
+        else:
+            status_text = f"ناموفق در بارگذاری صفحه: {result['error']}"
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"  سناریو روی {label or url}: {status_text} ({result['total_ms']:.0f}ms)\n"
+        })
+        return result
+
+    def _format_scenario_summary(self, plan, results, runner_count, elapsed_s):
         """
-        راه‌اندازی مرورگر Playwright به درستی
+        خلاصه نتایج اجرای موازی سناریو: تعداد موفق/ناموفق و میانگین زمان هر اقدام
         """
-        if self.browser and self.playwright and self.browser_context:
-            return True
-            
-        try:
-            # راه‌اندازی نمونه Playwright 
-            if not self.playwright:
-                self.playwright = sync_playwright().start()
-            
-            # راه‌اندازی مرورگر
-            if not self.browser:
-                self.browser = self.playwright.chromium.launch(
-                    headless=False,
-                    args=['--disable-web-security', '--no-sandbox', '--disable-features=IsolateOrigins,site-per-process']
+        passed_count = sum(1 for result in results if result['passed'])
+        lines = [
+            f"نتیجه سناریو '{plan.name}': {passed_count}/{len(results)} صفحه موفق در {elapsed_s:.1f} ثانیه "
+            f"({runner_count} اجرای همزمان)."
+        ]
+        for step_idx, step in enumerate(plan.steps):
+            step_times = [result['steps'][step_idx]['ms'] for result in results if len(result['steps']) > step_idx]
+            if step_times:
+                lines.append(
+                    f"  اقدام {step_idx+1} ({step.action_type}): میانگین {sum(step_times) / len(step_times):.0f}ms، "
+                    f"بیشینه {max(step_times):.0f}ms در {len(step_times)} اجرا"
                 )
+        return "\n".join(lines) + "\n\n"
+
+    def _handle_start_load_test(self):
+        """
+        اجرای سناریوی بارگذاری شده به عنوان آزمون بار با کاربران مجازی همزمان
+        """
+        if self._crawling_in_progress:
+            self._clear_output()
+            self.output_text_area.insert(tk.END, "A crawl or load test is already in progress. Please wait for it to finish.")
+            return
+        
+        url = self.url_entry.get().strip()
+        if not url:
+            self._clear_output()
+            self.output_text_area.insert(tk.END, "Error: Please enter a valid URL.")
+            return
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        # دریافت و اعتبارسنجی تنظیمات آزمون بار
+        try:
+            config = {key: float(entry.get().strip()) for key, entry in self.load_test_entries.items()}
+            for key in ('users', 'iterations', 'processes'):
+                if config[key] != int(config[key]):
+                    raise ValueError
+                config[key] = int(config[key])
+            if (config['users'] < 1 or config['processes'] < 1 or config['iterations'] < 0
+                    or not all(0 <= config[key] < float('inf') for key in ('ramp_up_s', 'duration_s', 'think_ms'))
+                    or not (config['duration_s'] or config['iterations'])):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror(
+                "خطا",
+                "تنظیمات آزمون بار نامعتبر است: تعداد کاربران و فرآیندها باید عدد صحیح مثبت، سایر مقادیر غیرمنفی "
+                "و حداقل یکی از مدت یا تعداد تکرار بیشتر از صفر باشد."
+            )
+            return
+        
+        self._clear_output()
+        scenario_file_path = self.scenario_file_entry.get().strip()
+        plan = self._load_scenario(scenario_file_path) if scenario_file_path else None
+        if not plan:
+            self.output_text_area.insert(tk.END, "خطا: برای آزمون بار ابتدا یک فایل سناریو معتبر انتخاب کنید.\n")
+            return
+        # مدت استفاده مجدد از ورود نامعتبر یعنی بدون وضعیت ورود ذخیره شده
+        try:
+            self.auth_state_ttl_hours = max(0.0, float(self.auth_ttl_entry.get().strip()))
+        except ValueError:
+            self.auth_state_ttl_hours = 0
+        
+        self.notebook.select(0)
+        self._crawling_in_progress = True
+        self.start_button.config(state=tk.DISABLED)
+        self.load_test_button.config(state=tk.DISABLED)
+        self.dataset_run_button.config(state=tk.DISABLED)
+        
+        self.crawl_thread = threading.Thread(
+            target=self._perform_load_test_threaded,
+            args=(plan, url, config),
+            daemon=True
+        )
+        self.crawl_thread.start()
+
+    def _perform_load_test_threaded(self, plan, url, config):
+        """
+        اجرای آزمون بار در thread جداگانه و ذخیره گزارش آن
+        """
+        try:
+            end_condition = []
+            if config['duration_s']:
+                end_condition.append(f"{config['duration_s']:g} ثانیه پس از ramp-up")
+            if config['iterations']:
+                end_condition.append(f"{config['iterations']} تکرار برای هر کاربر")
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"آزمون بار سناریو '{plan.name}' روی {url}: {config['users']} کاربر مجازی در "
+                        f"{config['processes']} فرآیند، ramp-up {config['ramp_up_s']:g} ثانیه، "
+                        f"مکث {config['think_ms']:g}ms، پایان: {' یا '.join(end_condition)}.\n\n"
+            })
             
-            # ایجاد زمینه مرورگر
-            if not self.browser_context:
-                self.browser_context = self.browser.new_context(
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                    viewport={'width': 1280, 'height': 800}
-                )
-                # تنظیم زمان انتظار پیش‌فرض
-                self.browser_context.set_default_timeout(60000)  # 60 seconds
-                
-            return True
+            # کاربران مجازی از وضعیت ورود ذخیره شده سناریو (در صورت وجود) استفاده می‌کنند
+            storage_state = None
+            auth_snapshot = self._open_auth_snapshot(plan, url)
+            if auth_snapshot:
+                storage_state, _age_s = auth_snapshot.load()
             
+            stats = self._run_load_test(plan, url, config, storage_state)
+            summary = stats.summary()
+            json_path, csv_path = self._export_load_test_report(plan, url, config, summary)
+            self.ui_queue.put({
+                'type': 'log',
+                'text': self._format_load_test_summary(plan, summary)
+                        + f"گزارش آزمون بار ذخیره شد:\n{json_path}\n{csv_path}\n\n"
+            })
         except Exception as e:
-            self.output_text_area.insert(tk.END, f"Error initializing browser: {str(e)}\n")
-            self._close_browser()  # اطمینان از پاکسازی منابع در صورت خطا
-            return False
-    
-    def _handle_start_test(self):
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"خطا در اجرای آزمون بار: {str(e)}\n"
+            })
+        finally:
+            self.load_test_stop_event = None
+            self.ui_queue.put({'type': 'load_test_complete'})
+
+    def _run_load_test(self, plan, url, config, storage_state):
         """
-        پردازش دکمه شروع آزمون و اجرای خزش وب روی آدرس وارد شده
+        تقسیم کاربران مجازی بین فرآیندها و تجمیع رکوردهای تکرار آن‌ها
+        
+        :return: شیء LoadTestStats
+        """
+        process_count = min(config['processes'], config['users'])
+        user_ids = list(range(config['users']))
+        stats = LoadTestStats(['LOAD'] + [f"{idx + 1}:{step.action_type}" for idx, step in enumerate(plan.steps)])
+        
+        if process_count == 1:
+            self.load_test_stop_event = threading.Event()
+            for record in self._run_load_test_users(
+                plan, url, user_ids, config, storage_state, time.time(), self.load_test_stop_event
+            ):
+                stats.add_iteration(record)
+            return stats
+        
+        # هر فرآیند سهم مساوی از کاربران دارد؛ شروع تدریجی بر اساس شماره سراسری کاربر است
+        mp_context = multiprocessing.get_context('spawn')
+        log_queue = mp_context.Queue()
+        result_queue = mp_context.Queue()
+        self.load_test_stop_event = mp_context.Event()
+        start_at = time.time()
+        processes = []
+        for process_id in range(process_count):
+            process = mp_context.Process(
+                target=_load_test_process,
+                args=(process_id, plan, url, user_ids[process_id::process_count], config, storage_state,
+                      start_at, self.load_test_stop_event, log_queue, result_queue),
+                daemon=True
+            )
+            processes.append(process)
+            process.start()
+        
+        finished_processes = 0
+        while finished_processes < process_count:
+            while True:
+                try:
+                    self.ui_queue.put(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                _process_id, records = result_queue.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    self.ui_queue.put({
+                        'type': 'log',
+                        'text': "همه فرآیندهای آزمون بار پیش از ارسال نتایج خارج شدند.\n"
+                    })
+                    break
+                continue
+            finished_processes += 1
+            for record in records:
+                stats.add_iteration(record)
+        
+        for process in processes:
+            process.join(timeout=5)
+        return stats
+
+    def _handle_start_dataset_run(self):
+        """
+        اجرای سناریو برای هر ردیف فایل داده با مقادیر ردیف به جای {{ستون}} در اقدامات
         """
-        # جلوگیری از شروع چندین عملیات خزش همزمان
         if self._crawling_in_progress:
             self._clear_output()
-            self.output_text_area.insert(tk.END, "A crawl is already in progress. Please wait for it to finish.")
+            self.output_text_area.insert(tk.END, "A crawl or load test is already in progress. Please wait for it to finish.")
             return
         
-        # دریافت آدرس از فیلد ورودی
         url = self.url_entry.get().strip()
-        
-        # بررسی خالی نبودن فیلد آدرس
         if not url:
             self._clear_output()
             self.output_text_area.insert(tk.END, "Error: Please enter a valid URL.")
             return
-            
-        # اگر پروتکل مشخص نشده، https را پیش فرض قرار می‌دهیم
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        # ذخیره آدرس شروع برای استفاده در گزارش‌ها
-        self.start_url = url
-        
-        # دریافت و اعتبارسنجی حداکثر عمق خزش
-        max_depth_text = self.max_depth_entry.get().strip()
+        # دریافت و اعتبارسنجی تعداد زمینه‌های همزمان
         try:
-            max_depth = int(max_depth_text)
-            if max_depth < 0:
-                self._clear_output()
-                messagebox.showerror("خطا", "مقدار عمق خزش باید یک عدد صحیح غیرمنفی باشد.")
-                return
+            concurrency = int(self.scenario_concurrency_entry.get().strip())
+            if concurrency < 1:
+                raise ValueError
         except ValueError:
-            self._clear_output()
-            messagebox.showerror("خطا", "لطفاً یک عدد صحیح برای حداکثر عمق خزش وارد کنید.")
+            messagebox.showerror("خطا", "تعداد اجراهای همزمان سناریو باید یک عدد صحیح مثبت باشد.")
             return
+        self.scenario_concurrency = concurrency
         
-        # پاک کردن ناحیه خروجی
         self._clear_output()
-        self._clear_tree_view()
-        self.all_broken_links.clear()
-        self.all_external_links_info.clear()
-        self.link_report_area.delete(1.0, tk.END)
-        
-        # بررسی فایل سناریو
         scenario_file_path = self.scenario_file_entry.get().strip()
-        if scenario_file_path:
-            self.current_scenario = self._load_scenario(scenario_file_path)
-            if self.current_scenario:
-                scenario_name = self.current_scenario["name"]
-                target_pattern = self.current_scenario["target_url_pattern"]
-                self.output_text_area.insert(tk.END, f"سناریو '{scenario_name}' برای الگوی URL '{target_pattern}' بارگذاری شد.\n\n")
-        else:
-            self.current_scenario = None
+        plan = self._load_scenario(scenario_file_path) if scenario_file_path else None
+        if not plan:
+            self.output_text_area.insert(tk.END, "خطا: برای اجرای داده‌محور ابتدا یک فایل سناریو معتبر انتخاب کنید.\n")
+            return
+        if not plan.placeholders:
+            self.output_text_area.insert(
+                tk.END, "هشدار: سناریو هیچ {{ستون}} ندارد؛ تمام ردیف‌ها همان مقادیر سناریو را اجرا می‌کنند.\n"
+            )
         
-        # تغییر به تب لاگ برای نمایش پیشرفت
-        self.notebook.select(0)
+        # بررسی فایل داده و ستون‌های لازم (فقط سطر عنوان CSV خوانده می‌شود)
+        dataset_path = self.dataset_file_entry.get().strip()
+        try:
+            if not os.path.isfile(dataset_path):
+                raise ValueError(f"فایل داده '{dataset_path}' یافت نشد")
+            dataset = ScenarioDataset(dataset_path)
+            columns = dataset.columns()
+        except (OSError, ValueError) as e:
+            self.output_text_area.insert(tk.END, f"خطا: {str(e)}\n")
+            return
+        missing_columns = plan.placeholders - columns if columns is not None else set()
+        if missing_columns:
+            self.output_text_area.insert(
+                tk.END, f"خطا: ستون‌های {', '.join(sorted(missing_columns))} در فایل داده وجود ندارند.\n"
+            )
+            return
         
-        # تنظیم وضعیت رابط کاربری
+        try:
+            self.auth_state_ttl_hours = max(0.0, float(self.auth_ttl_entry.get().strip()))
+        except ValueError:
+            self.auth_state_ttl_hours = 0
+        
+        self.notebook.select(0)
         self._crawling_in_progress = True
-        self.has_crawl_data = False
-        self.save_reports_button.config(state=tk.DISABLED)
         self.start_button.config(state=tk.DISABLED)
-        self.start_button.update_idletasks()
+        self.load_test_button.config(state=tk.DISABLED)
+        self.dataset_run_button.config(state=tk.DISABLED)
         
-        # شروع crawling در thread جداگانه با استفاده از عمق تعیین شده توسط کاربر
-        self.crawl_thread = threading.Thread(
-            target=self._perform_crawl_threaded, 
-            args=(url, max_depth),
+        self.crawl_thread = threading.Thread(
+            target=self._perform_dataset_run_threaded,
+            args=(plan, url, dataset),
             daemon=True
         )
         self.crawl_thread.start()
 
-    def _execute_scenario_actions(self, page, actions):
+    def _perform_dataset_run_threaded(self, plan, url, dataset):
         """
-        اجرای اقدامات سناریو روی یک صفحه Playwright
-        
-        :param page: شیء صفحه Playwright که اقدامات روی آن اجرا می‌شوند
-        :param actions: لیست اقدامات سناریو برای اجرا
-        :return: True در صورت موفقیت، False در صورت شکست
+        اجرای داده‌محور سناریو در thread جداگانه
         """
-        if not actions or not isinstance(actions, list):
+        owner_playwright = None
+        shared_browser = None
+        try:
+            # زمینه‌ها از وضعیت ورود ذخیره شده سناریو (در صورت وجود) استفاده می‌کنند
+            storage_state = None
+            auth_snapshot = self._open_auth_snapshot(plan, url)
+            if auth_snapshot:
+                storage_state, _age_s = auth_snapshot.load()
+            # اجراکننده‌ها زمینه‌های خود را در یک مرورگر مشترک بدون رابط می‌سازند
+            owner_playwright = sync_playwright().start()
+            shared_browser, browser_endpoint = self._launch_shared_browser(owner_playwright, headless=True)
+            self._run_scenario_dataset(plan, url, dataset, storage_state, browser_endpoint)
+        except Exception as e:
             self.ui_queue.put({
                 'type': 'log',
-                'text': "خطا: لیست اقدامات سناریو خالی یا نامعتبر است.\n"
+                'text': f"خطا در اجرای داده‌محور سناریو: {str(e)}\n"
             })
-            return False
+        finally:
+            try:
+                if shared_browser:
+                    shared_browser.close()
+                if owner_playwright:
+                    owner_playwright.stop()
+            except Exception as e:
+                print(f"Error closing data run browser: {str(e)}")
+            self.ui_queue.put({'type': 'load_test_complete'})
+
+    def _run_scenario_dataset(self, plan, url, dataset, storage_state, browser_endpoint=None):
+        """
+        توزیع ردیف‌های فایل داده بین اجراکننده‌های سناریو؛ ردیف‌ها از صف محدود خوانده می‌شوند تا
+        فایل هرگز کامل در حافظه نباشد و نتیجه هر ردیف بلافاصله در فایل JSONL نتایج نوشته می‌شود
+        
+        :param plan: برنامه کامپایل شده سناریو
+        :param url: آدرسی که اجرای هر ردیف از آن شروع می‌شود
+        :param dataset: شیء ScenarioDataset
+        :param storage_state: وضعیت ذخیره‌شده ورود (یا None)
+        :param browser_endpoint: آدرس CDP مرورگر مشترک اجراکننده‌ها
+        :return: مسیر فایل نتایج
+        """
+        runner_count = max(1, self.scenario_concurrency)
+        report_dir = os.path.join(self.default_auto_save_dir, "data_runs")
+        os.makedirs(report_dir, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_name = re.sub(r'[^\w-]+', '_', plan.name)
+        results_path = os.path.join(report_dir, f"{safe_name}_{timestamp}.jsonl")
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"اجرای داده‌محور سناریو '{plan.name}' از {dataset.path} با {runner_count} زمینه همزمان...\n"
+        })
+        
+        # فقط شمارنده‌ها و مجموع زمان هر اقدام در حافظه نگه داشته می‌شوند
+        totals = {'rows': 0, 'passed': 0}
+        step_totals = [[0.0, 0, 0.0] for _ in plan.steps]
+        results_lock = threading.Lock()
+        
+        with open(results_path, "w", encoding="utf-8") as results_file:
+            def _record_result(row_number, result):
+                result = dict(result, row=row_number)
+                with results_lock:
+                    results_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    totals['rows'] += 1
+                    totals['passed'] += result['passed']
+                    for step_idx, timing in enumerate(result['steps']):
+                        step_total = step_totals[step_idx]
+                        step_total[0] += timing['ms']
+                        step_total[1] += 1
+                        step_total[2] = max(step_total[2], timing['ms'])
             
-        for action_idx, action_obj in enumerate(actions):
-            # بررسی ساختار اقدام
-            if not isinstance(action_obj, dict) or 'type' not in action_obj:
-                self.ui_queue.put({
-                    'type': 'log',
-                    'text': f"خطا: اقدام شماره {action_idx+1} فاقد فیلد 'type' است.\n"
-                })
-                return False
-                
-            action_type = action_obj['type']
-            action_log = f"اجرای اقدام سناریو {action_idx+1}/{len(actions)}: {action_type}"
+            # صف محدود: خواندن فایل با سرعت اجرای ردیف‌ها پیش می‌رود
+            work_queue = queue.Queue(maxsize=runner_count * 2)
+            run_start = time.perf_counter()
+            runner_threads = self._start_scenario_runners(
+                plan, work_queue, storage_state, _record_result, runner_count, browser_endpoint
+            )
             
-            try:
-                if action_type == "FILL_INPUT":
-                    # بررسی وجود فیلدهای لازم
-                    if 'selector' not in action_obj or 'text' not in action_obj:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: اقدام FILL_INPUT فاقد 'selector' یا 'text' است.\n"
-                        })
-                        return False
-                        
-                    selector = action_obj['selector']
-                    text = action_obj['text']
-                    action_log += f" در {self._get_short_selector_description(selector)} با مقدار {text}"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - شروع...\n"
-                    })
-                    
-                    # پیدا کردن المنت با استفاده از انواع مختلف selector
-                    element = self._get_element_by_selector(page, selector)
-                    if not element:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: المنت با selector '{selector}' پیدا نشد.\n"
-                        })
-                        return False
-                    
-                    # پر کردن فیلد
-                    element.fill(text)
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - موفق\n"
-                    })
-                    
-                elif action_type == "CLICK_ELEMENT":
-                    # بررسی وجود فیلدهای لازم
-                    if 'selector' not in action_obj:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: اقدام CLICK_ELEMENT فاقد 'selector' است.\n"
-                        })
-                        return False
-                        
-                    selector = action_obj['selector']
-                    action_log += f" روی {self._get_short_selector_description(selector)}"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - شروع...\n"
-                    })
-                    
-                    # پیدا کردن المنت با استفاده از انواع مختلف selector
-                    element = self._get_element_by_selector(page, selector)
-                    if not element:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: المنت با selector '{selector}' پیدا نشد.\n"
-                        })
-                        return False
-                    
-                    # کلیک روی عنصر
-                    element.click()
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - موفق\n"
-                    })
-                    
-                elif action_type == "CHECK_ELEMENT":
-                    # بررسی وجود فیلدهای لازم
-                    if 'selector' not in action_obj:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: اقدام CHECK_ELEMENT فاقد 'selector' است.\n"
-                        })
-                        return False
-                        
-                    selector = action_obj['selector']
-                    action_log += f" روی {self._get_short_selector_description(selector)}"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - شروع...\n"
-                    })
-                    
-                    # پیدا کردن المنت با استفاده از انواع مختلف selector
-                    element = self._get_element_by_selector(page, selector)
-                    if not element:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: المنت با selector '{selector}' پیدا نشد.\n"
-                        })
-                        return False
-                    
-                    # فعال کردن چک باکس
-                    element.check()
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - موفق\n"
-                    })
-                    
-                elif action_type == "GOTO_URL":
-                    # بررسی وجود فیلدهای لازم
-                    if 'url' not in action_obj:
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"خطا: اقدام GOTO_URL فاقد 'url' است.\n"
-                        })
-                        return False
-                        
-                    url = action_obj['url']
-                    action_log += f" به {url}"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - شروع...\n"
-                    })
-                    
-                    # رفتن به URL
-                    page.goto(url)
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - موفق\n"
-                    })
-                    
-                elif action_type == "WAIT_FOR_NAVIGATION":
-                    # دریافت زمان انتظار (پیش‌فرض 30 ثانیه)
-                    timeout = action_obj.get("timeout", 30000)
-                    state = action_obj.get("state", "load")
-                    action_log += f" با مهلت {timeout}ms و حالت {state}"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"{action_log} - شروع...\n"
-                    })
-                    
-                    # انتظار برای بارگذاری صفحه
-                    page.wait_for_load_state(state, timeout=timeout)
-                    
+            def _put_work(work_item):
+                while True:
+                    try:
+                        work_queue.put(work_item, timeout=0.5)
+                        return True
+                    except queue.Full:
+                        if not any(runner.is_alive() for runner in runner_threads):
+                            return False
+            
+            runners_available = True
+            for row_number, row, error in dataset:
+                if error:
                     self.ui_queue.put({
                         'type': 'log',
-                        'text': f"{action_log} - موفق\n"
+                        'text': f"  ردیف {row_number} نادیده گرفته شد: {error}\n"
                     })
-                    
-                else:
-                    # نوع اقدام ناشناخته
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"هشدار: نوع اقدام '{action_type}' پشتیبانی نمی‌شود و نادیده گرفته می‌شود.\n"
+                    _record_result(row_number, {
+                        'url': url, 'passed': False, 'failed_step': None, 'error': error,
+                        'load_ms': 0, 'total_ms': 0, 'steps': []
                     })
                     continue
-                    
-            except Exception as e:
-                # ثبت خطای اقدام
+                if not _put_work((row_number, url, row, f"ردیف {row_number}")):
+                    runners_available = False
+                    break
+            if runners_available:
+                for _ in runner_threads:
+                    if not _put_work(None):
+                        break
+            else:
                 self.ui_queue.put({
                     'type': 'log',
-                    'text': f"{action_log} - خطا: {str(e)}\n"
+                    'text': "همه اجراکننده‌های سناریو متوقف شدند؛ ردیف‌های باقی‌مانده اجرا نشدند.\n"
                 })
-                return False
-                
-        # همه اقدامات با موفقیت اجرا شدند
+            for runner in runner_threads:
+                runner.join()
+            elapsed_s = time.perf_counter() - run_start
+        
+        lines = [
+            f"نتیجه داده‌محور سناریو '{plan.name}': {totals['passed']}/{totals['rows']} ردیف موفق در "
+            f"{elapsed_s:.1f} ثانیه ({runner_count} زمینه همزمان)."
+        ]
+        for step_idx, (step, (total_ms, count, max_ms)) in enumerate(zip(plan.steps, step_totals)):
+            if count:
+                lines.append(
+                    f"  اقدام {step_idx+1} ({step.action_type}): میانگین {total_ms / count:.0f}ms، "
+                    f"بیشینه {max_ms:.0f}ms در {count} اجرا"
+                )
         self.ui_queue.put({
             'type': 'log',
-            'text': f"تمام {len(actions)} اقدام سناریو با موفقیت اجرا شدند.\n"
+            'text': "\n".join(lines) + f"\nنتایج هر ردیف ذخیره شد:\n{results_path}\n\n"
         })
-        return True
+        return results_path
+
+    def _format_load_test_summary(self, plan, summary):
+        """
+        خلاصه متنی آزمون بار: توان عملیاتی، نرخ خطا و صدک‌های تأخیر هر اقدام
+        """
+        lines = [
+            "=" * 50,
+            f"نتیجه آزمون بار '{plan.name}': {summary['iterations']} تکرار، {summary['failed_iterations']} ناموفق "
+            f"({summary['error_rate']:.1%})، {summary['throughput_per_s']:.2f} تکرار در ثانیه، "
+            f"{summary['actions_per_s']:.2f} اقدام در ثانیه در {summary['elapsed_s']:.1f} ثانیه.",
+            f"{'step':<24} | {'count':>6} | {'err%':>6} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'max':>8}",
+        ]
+        for row in summary['steps'] + [summary['iteration']]:
+            lines.append(
+                f"{row['step']:<24} | {row['count']:>6} | {row['error_rate']:>6.1%} | {row['p50_ms']:>8.0f} | "
+                f"{row['p95_ms']:>8.0f} | {row['p99_ms']:>8.0f} | {row['max_ms']:>8.0f}"
+            )
+        for error, count in list(summary['errors'].items())[:5]:
+            lines.append(f"  خطا ({count} بار): {error}")
+        return "\n".join(lines) + "\n\n"
+
+    def _export_load_test_report(self, plan, url, config, summary):
+        """
+        ذخیره گزارش آزمون بار به صورت JSON (کامل) و CSV (ردیف آماری هر اقدام)
+        
+        :return: (مسیر فایل JSON, مسیر فایل CSV)
+        """
+        report_dir = os.path.join(self.default_auto_save_dir, "load_tests")
+        os.makedirs(report_dir, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_name = re.sub(r'[^\w-]+', '_', plan.name)
+        base_name = f"{safe_name}_{timestamp}"
+        
+        json_path = os.path.join(report_dir, f"{base_name}.json")
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(dict(scenario=plan.name, url=url, config=config, **summary), json_file, ensure_ascii=False, indent=2)
+        
+        csv_path = os.path.join(report_dir, f"{base_name}.csv")
+        rows = summary['steps'] + [summary['iteration']]
+        with open(csv_path, "w", encoding="utf-8", newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return json_path, csv_path
 
     def _get_element_by_selector(self, page, selector):
         """
@@ -944,216 +5294,7 @@ class WebsiteTesterApp:
         :return: شیء المنت پیدا شده یا None در صورت شکست
         """
         try:
-            # بررسی اگر selector یک عبارت get_by_ است
-            if selector.startswith('get_by_'):
-                # استخراج نام متد و پارامترهای آن
-                method_pattern = re.compile(r'get_by_(\w+)\s*\((.*)\)')
-                method_match = method_pattern.search(selector)
-                
-                if method_match:
-                    method_name = method_match.group(1)
-                    args_str = method_match.group(2)
-                    
-                    # استخراج پارامترهای متد با در نظر گرفتن نقل قول‌ها
-                    params = self._parse_function_params(args_str)
-                    
-                    # فراخوانی متد مناسب بر اساس نام متد استخراج شده
-                    if method_name == 'role':
-                        role = params.get('positional', [None])[0]
-                        if role is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر نقش (role) در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از مقدار نقش
-                        role = role.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # حذف نقل قول‌ها از مقادیر رشته‌ای
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            elif isinstance(v, str) and v.lower() in ('true', 'false'):
-                                v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_role با پارامترهای استخراج شده
-                        return page.get_by_role(role, **kwargs)
-                    
-                    elif method_name == 'text':
-                        text = params.get('positional', [None])[0]
-                        if text is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر متن (text) در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از متن
-                        text = text.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                                elif v.lower() in ('true', 'false'):
-                                    v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_text با پارامترهای استخراج شده
-                        return page.get_by_text(text, **kwargs)
-                    
-                    elif method_name == 'label':
-                        label = params.get('positional', [None])[0]
-                        if label is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر برچسب (label) در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از برچسب
-                        label = label.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                                elif v.lower() in ('true', 'false'):
-                                    v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_label با پارامترهای استخراج شده
-                        return page.get_by_label(label, **kwargs)
-                    
-                    elif method_name == 'placeholder':
-                        placeholder = params.get('positional', [None])[0]
-                        if placeholder is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر placeholder در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از placeholder
-                        placeholder = placeholder.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                                elif v.lower() in ('true', 'false'):
-                                    v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_placeholder با پارامترهای استخراج شده
-                        return page.get_by_placeholder(placeholder, **kwargs)
-                    
-                    elif method_name == 'test_id':
-                        test_id = params.get('positional', [None])[0]
-                        if test_id is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر test_id در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از test_id
-                        test_id = test_id.strip('"\'')
-                        
-                        # استفاده از متد get_by_test_id با پارامترهای استخراج شده
-                        return page.get_by_test_id(test_id)
-
-                    elif method_name == 'title':
-                        title = params.get('positional', [None])[0]
-                        if title is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر title در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از title
-                        title = title.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                                elif v.lower() in ('true', 'false'):
-                                    v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_title با پارامترهای استخراج شده
-                        return page.get_by_title(title, **kwargs)
-                    
-                    elif method_name == 'alt_text':
-                        alt_text = params.get('positional', [None])[0]
-                        if alt_text is None:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"خطا: پارامتر alt_text در {selector} پیدا نشد\n"
-                            })
-                            return None
-                            
-                        # حذف نقل قول‌ها از alt_text
-                        alt_text = alt_text.strip('"\'')
-                        
-                        # ساخت دیکشنری کی‌وُرد آرگومنت‌ها
-                        kwargs = {}
-                        for k, v in params.get('named', {}).items():
-                            # تبدیل مقادیر بولی رشته‌ای به بولی واقعی
-                            if isinstance(v, str):
-                                if v.startswith('"') or v.startswith("'"):
-                                    v = v.strip('"\'')
-                                elif v.lower() in ('true', 'false'):
-                                    v = (v.lower() == 'true')
-                            kwargs[k] = v
-                            
-                        # استفاده از متد get_by_alt_text با پارامترهای استخراج شده
-                        return page.get_by_alt_text(alt_text, **kwargs)
-                    
-                    # لاگ هشدار برای selector های get_by_ ناشناخته
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"هشدار: نوع متد get_by_{method_name} پشتیبانی نمی‌شود. تلاش با locator ساده.\n"
-                    })
-            
-            # پشتیبانی از سایر الگوهای locator
-            elif selector.startswith('xpath=') or selector.startswith('//'):
-                # تبدیل به xpath صریح
-                xpath_selector = selector if selector.startswith('xpath=') else f"xpath={selector}"
-                return page.locator(xpath_selector)
-            
-            elif selector.startswith('text=') or (selector.startswith('"') and selector.endswith('"')) or (selector.startswith("'") and selector.endswith("'")):
-                # تبدیل به text selector صریح
-                if selector.startswith('"') or selector.startswith("'"):
-                    text_content = selector[1:-1]
-                    text_selector = f"text={text_content}"
-                else:
-                    text_selector = selector
-                return page.locator(text_selector)
-            
-            # در صورتی که الگوهای خاص تطبیق نداشتند یا selector یک CSS یا XPath ساده است
-            return page.locator(selector)
-            
+            return self._compile_selector(selector)(page)
         except Exception as e:
             self.ui_queue.put({
                 'type': 'log',
@@ -1172,26 +5313,15 @@ class WebsiteTesterApp:
                 'text': f"Starting crawl from {start_url} with max depth {max_depth}...\n\n"
             })
             
-            # بررسی تطابق سناریو با URL
-            if self.current_scenario:
-                target_pattern = self.current_scenario["target_url_pattern"]
-                scenario_name = self.current_scenario["name"]
-                
-                # بررسی ساده برابری رشته‌ای (می‌تواند در آینده با الگوهای پیچیده‌تر گسترش یابد)
-                if start_url == target_pattern or target_pattern in start_url:
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"اطلاعات: سناریو '{scenario_name}' برای {start_url} مطابقت دارد. اجرای سناریو شروع می‌شود...\n"
-                    })
-            
             # انجام crawling
             crawled_data = self._perform_crawl_worker(start_url, max_depth)
             
             # ارسال نتایج به UI
+            # ریشه نمای درختی آدرس شروع به شکل یکتا است (کلید آن در نتایج خزش)
             self.ui_queue.put({
                 'type': 'crawl_complete',
                 'crawled_data': crawled_data,
-                'start_url': start_url
+                'start_url': self.url_canonicalizer.canonicalize(start_url)
             })
             
         except Exception as e:
@@ -1216,10 +5346,18 @@ class WebsiteTesterApp:
         scenario_to_execute = None
         scenario_name_for_log = "N/A (No scenario loaded or matched)"
         
-        # ایجاد صف برای آدرس‌های در انتظار بازدید
-        queue_urls = deque([(start_url, 0, None)])  
-        visited_urls = set()
+        # ایجاد صف مشترک برای آدرس‌های در انتظار بازدید (با شکل یکتای آدرس شروع، مانند لینک‌های صفحات)
+        self.url_canonicalizer = self._new_url_canonicalizer()
+        self._url_variants = set()
+        crawl_url = self.url_canonicalizer.canonicalize(start_url)
+        frontier = CrawlFrontier(crawl_url, max_depth, self._new_url_set())
+        self.active_frontier = frontier
         crawled_pages_data = {}
+        self.crawl_stats = {}
+        self.asset_health = {}
+        self.host_scheduler = self._new_host_scheduler()
+        self.retry_scheduler.close()
+        self.retry_scheduler = self._new_retry_scheduler()
         base_domain = urlparse(start_url).netloc
         
         # راه‌اندازی مرورگر
@@ -1234,17 +5372,13 @@ class WebsiteTesterApp:
         
         # بررسی تطابق سناریو با URL
         if self.current_scenario:
-            target_pattern = self.current_scenario.get('target_url_pattern')
-            loaded_scenario_name = self.current_scenario.get('name', 'Unnamed Scenario')
-            
-            # تطبیق URL با الگوی هدف سناریو
-            url_matches_scenario = False
-            if target_pattern:
-                if start_url == target_pattern:  # تطابق دقیق
-                    url_matches_scenario = True
-                # می‌توان برای حالت‌های انطباق انعطاف‌پذیرتر، شرایط دیگری نیز اضافه کرد
-                # elif start_url.startswith(target_pattern):  # الگو به عنوان پیشوند
-                #     url_matches_scenario = True
+            target_pattern = self.current_scenario.target_url_pattern
+            loaded_scenario_name = self.current_scenario.name or 'Unnamed Scenario'
+            
+            # تطبیق URL با الگوی هدف سناریو (سایر صفحات منطبق پس از خزش به صورت موازی اجرا می‌شوند)
+            url_matches_scenario = bool(target_pattern) and (
+                self.current_scenario.matches(start_url) or self.current_scenario.matches(crawl_url)
+            )
             
             # اگر URL با الگوی سناریو تطابق داشت، آماده‌سازی برای اجرای سناریو
             if url_matches_scenario:
@@ -1258,7 +5392,8 @@ class WebsiteTesterApp:
             else:
                 self.ui_queue.put({
                     'type': 'log',
-                    'text': f"اطلاعات: سناریو '{loaded_scenario_name}' با URL هدف '{start_url}' مطابقت ندارد و اجرا نخواهد شد.\n"
+                    'text': f"اطلاعات: سناریو '{loaded_scenario_name}' با URL هدف '{start_url}' مطابقت ندارد و "
+                            f"فقط روی صفحات خزش شده منطبق اجرا خواهد شد.\n"
                 })
         else:
             # اگر هیچ سناریویی بارگذاری نشده باشد
@@ -1267,10 +5402,17 @@ class WebsiteTesterApp:
                 'text': f"اطلاعات: هیچ سناریویی بارگذاری نشده است. خزش عادی برای {start_url} انجام می‌شود.\n"
             })
         
+        # سناریو بدون پروفایل مسدودسازی منابع اجرا می‌شود (ممکن است به تصاویر یا اسکریپت‌ها وابسته باشد)
+        self._apply_crawl_profile(self.browser_context, False)
+        
+        # استفاده از وضعیت ورود ذخیره شده سناریو به جای اجرای دوباره آن (تا زمان انقضا)
+        auth_snapshot = self._open_auth_snapshot(scenario_to_execute, crawl_url) if scenario_to_execute else None
+        login_reused = auth_snapshot is not None and self._restore_auth_snapshot(auth_snapshot)
+        
         # اجرای سناریو فقط در صورت وجود سناریوی مطابق
-        scenario_executed_successfully = False
-        if scenario_to_execute:
-            actions = scenario_to_execute.get('actions', [])
+        scenario_executed_successfully = login_reused
+        if scenario_to_execute and not login_reused:
+            actions = scenario_to_execute.steps
             
             page_for_scenario = None
             try:
@@ -1294,6 +5436,8 @@ class WebsiteTesterApp:
                         'text': f"اطلاعات: سناریو '{scenario_name_for_log}' با موفقیت اجرا شد.\n\n"
                     })
                     # حالا browser_context کوکی‌های لازم را دارد
+                    if auth_snapshot:
+                        self._save_auth_snapshot(auth_snapshot)
                 else:
                     self.ui_queue.put({
                         'type': 'log',
@@ -1308,98 +5452,63 @@ class WebsiteTesterApp:
                 # بستن صفحه استفاده شده برای اجرای سناریو
                 if page_for_scenario:
                     page_for_scenario.close()
+            
+            # وضعیت ورود قبلی پس از شکست سناریو قابل اعتماد نیست
+            if auth_snapshot and not scenario_executed_successfully:
+                auth_snapshot.clear()
         
         # ادامه خزش معمولی
-        pages_visited = 0
+        self._apply_crawl_profile(self.browser_context, self.block_resources)
+        if self.http_first_fetch or self.probe_boundary_links:
+            # نشست‌های HTTP باید همان کوکی‌های مرورگر (مثلاً ورود سناریو) را داشته باشند
+            self.http_seed_cookies = self.browser_context.cookies()
+        
+        # ادامه خزش ناتمام قبلی بدون دریافت دوباره صفحات تکمیل شده
+        pending_items = None
+        if self._open_crawl_checkpoint(crawl_url, max_depth):
+            crawled_pages_data.update(self.crawl_checkpoint.load_pages())
+            # از منابع صفحات قبلی فقط منابع خراب در checkpoint ذخیره شده‌اند
+            for page_url, page_data in crawled_pages_data.items():
+                self._record_assets(page_url, page_data.get('broken_assets', []))
+            pending_items = self.crawl_checkpoint.load_pending()
+            frontier.restore(pending_items, self.crawl_checkpoint.iter_seen_urls(), len(crawled_pages_data))
+            # نام‌های دیگر صفحات خزش شده (زنجیره تغییر مسیر) در اجرای قبلی هم دوباره خزش نمی‌شوند
+            frontier.mark_seen([
+                alias for page_url, page_data in crawled_pages_data.items()
+                for alias in self._same_host_aliases(page_url, page_data.get('redirect_chain', []))
+            ])
+            self.ui_queue.put({
+                'type': 'log',
+                'text': f"Resuming crawl from checkpoint: {len(crawled_pages_data)} page(s) already crawled, "
+                        f"{len(pending_items)} URL(s) pending.\n\n"
+            })
+        
+        # بررسی لینک‌های خارجی همزمان با خزش (لینک‌های صفحات بازیابی شده بلافاصله ارسال می‌شوند)
+        self._start_link_check_pipeline()
+        for page_url, page_data in crawled_pages_data.items():
+            self._submit_external_links(page_url, page_data.get('external_links', []))
+            self._submit_external_links(page_url, page_data.get('boundary_links', []), LinkIndex.BOUNDARY)
         
         try:
-            while queue_urls:
-                current_url, current_depth, parent_url = queue_urls.popleft()
-                
-                if current_url in visited_urls or current_depth > max_depth:
-                    continue
-                
-                visited_urls.add(current_url)
-                pages_visited += 1
-                
-                # ارسال پیام به UI
+            crawl_start = time.perf_counter()
+            if self.crawl_processes > 1:
+                # خزش توزیع‌شده بین چند فرآیند، هر کدام با مرورگر مستقل
+                self.active_frontier = None
+                pages_visited = len(crawled_pages_data) + self._run_sharded_crawl(
+                    crawl_url, max_depth, crawled_pages_data, pending_items
+                )
+            else:
+                self._run_crawl_workers(frontier, self.browser_context, crawled_pages_data, self.browser_endpoint)
+                pages_visited = frontier.pages_dispatched
                 self.ui_queue.put({
                     'type': 'log',
-                    'text': f"Crawling ({pages_visited}): {current_url} (Depth: {current_depth})\n"
-                })
-                
-                try:
-                    page_info = self._fetch_page_info_with_playwright(current_url)
-                    
-                    title = page_info['title']
-                    internal_links = page_info['internal_links']
-                    external_links = page_info['external_links']
-                    status_code = page_info['page_status_code']
-                    
-                    crawled_pages_data[current_url] = {
-                        'title': title,
-                        'status': 'Crawled',
-                        'depth': current_depth,
-                        'links_count': len(internal_links) + len(external_links),
-                        'parent_url': parent_url,
-                        'status_code': status_code,
-                        'external_links': external_links
-                    }
-                    
-                    # ارسال اطلاعات صفحه به UI
-                    log_text = f"Title: {title}\n"
-                    log_text += f"Status: {status_code}\n"
-                    log_text += f"Found {len(internal_links)} internal links\n"
-                    log_text += f"External links found: {len(external_links)}\n\n"
-                    
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': log_text
-                    })
-                    
-                    # اضافه کردن لینک‌های داخلی به صف
-                    if current_depth < max_depth:
-                        internal_links_count = 0
-                        
-                        for link in internal_links:
-                            if link not in visited_urls:
-                                queue_urls.append((link, current_depth + 1, current_url))
-                                internal_links_count += 1
-                                
-                                if internal_links_count <= 10:
-                                    self.ui_queue.put({
-                                        'type': 'log',
-                                        'text': f"    → Queued: {link}\n"
-                                    })
-                        
-                        if internal_links_count > 10:
-                            self.ui_queue.put({
-                                'type': 'log',
-                                'text': f"    ... and {internal_links_count - 10} more links\n"
-                            })
-                            
-                        self.ui_queue.put({
-                            'type': 'log',
-                            'text': f"    Total internal links queued: {internal_links_count}\n\n"
-                        })
-                            
-                except Exception as e:
-                    crawled_pages_data[current_url] = {
-                        'title': 'Error',
-                        'status': f'Error: {str(e)}',
-                        'depth': current_depth,
-                        'links_count': 0,
-                        'parent_url': parent_url,
-                        'status_code': 'Error',
-                        'external_links': []
-                    }
-                    
-                    # Use a temporary list for broken links in worker thread
-                    # self.all_broken_links.append((current_url, current_url, 'Error')) 
-                    self.ui_queue.put({
-                        'type': 'log',
-                        'text': f"Error processing page: {str(e)}\n\n"
-                    })
+                    'text': f"Frontier: peak {frontier.peak_queue_length} queued URL(s), {self.frontier_dedup} dedup.\n"
+                })
+            self._record_stat('crawl_ms', (time.perf_counter() - crawl_start) * 1000)
+            
+            # خزش کامل شد و checkpoint دیگر لازم نیست (اگر با بستن برنامه متوقف شده باشد حفظ می‌شود)
+            if self.crawl_checkpoint:
+                self.crawl_checkpoint.finish()
             
             # پیام پایان crawling
             self.ui_queue.put({
@@ -1408,9 +5517,24 @@ class WebsiteTesterApp:
             })
             self.ui_queue.put({
                 'type': 'log',
-                'text': f"Crawl finished. Visited {pages_visited} page(s).\n\n"
+                'text': f"Crawl finished. Visited {pages_visited} page(s).\n"
+            })
+            self.ui_queue.put({
+                'type': 'log',
+                'text': self._format_crawl_stats() + self._format_redirect_summary(crawled_pages_data) + "\n"
             })
             
+            # اجرای موازی سناریو روی سایر صفحات خزش شده منطبق با الگوی هدف
+            if self.current_scenario:
+                scenario_urls = [
+                    url for url in crawled_pages_data
+                    if url not in (start_url, crawl_url) and self.current_scenario.matches(url)
+                ]
+                self.ui_queue.put({
+                    'type': 'scenario_results',
+                    'results': self._run_scenario_on_urls(self.current_scenario, scenario_urls)
+                })
+            
             # بررسی لینک‌های خارجی
             self._check_external_links_threaded(crawled_pages_data)
             
@@ -1418,69 +5542,277 @@ class WebsiteTesterApp:
             
         except Exception as e:
             raise e
+        finally:
+            self.active_frontier = None
+            if self.crawl_checkpoint:
+                self.crawl_checkpoint.close()
+            if self._link_check_threads:
+                # خزش با خطا متوقف شد؛ لینک‌های بررسی نشده رها می‌شوند
+                self._stop_link_check_pipeline(discard_pending=True)
+            self.retry_scheduler.close()
+
+    def _run_sharded_crawl(self, start_url, max_depth, crawled_pages_data, pending_items=None):
+        """
+        تقسیم صف خزش بین چند فرآیند بر اساس hash آدرس و ادغام نتایج آن‌ها
+        
+        :param start_url: آدرس شروع خزش
+        :param max_depth: حداکثر عمق خزش
+        :param crawled_pages_data: دیکشنری نتایج که نتایج تمام shard ها در آن ادغام می‌شود
+        :param pending_items: آدرس‌های در انتظار بازیابی شده از checkpoint (None یعنی شروع از آدرس اول)
+        :return: تعداد صفحات بازدید شده در این اجرا
+        """
+        shard_count = self.crawl_processes
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"Sharded crawl: {shard_count} processes x {self.crawl_concurrency} page(s) each.\n\n"
+        })
+        
+        # Playwright در فرآیند فعلی thread های فعال دارد، پس از spawn به جای fork استفاده می‌شود
+        mp_context = multiprocessing.get_context('spawn')
+        inboxes = [mp_context.Queue() for _ in range(shard_count)]
+        log_queue = mp_context.Queue()
+        result_queue = mp_context.Queue()
+        pending_by_depth = mp_context.Array('i', max_depth + 1)
+        current_level = mp_context.Value('i', 0)
+        done_event = mp_context.Event()
+        self.shard_stop_event = done_event
+        
+        storage_state = self.browser_context.storage_state()
+        settings = self._get_crawl_settings()
+        checkpoint_path = self.crawl_checkpoint.path if self.crawl_checkpoint else None
+        
+        processes = []
+        for shard_id in range(shard_count):
+            process = mp_context.Process(
+                target=_shard_crawl_process,
+                args=(shard_id, inboxes, log_queue, result_queue, pending_by_depth, current_level,
+                      done_event, max_depth, settings, storage_state, checkpoint_path),
+                daemon=True
+            )
+            processes.append(process)
+            process.start()
+        
+        # ارسال آدرس شروع (یا آدرس‌های در انتظار checkpoint) به shard مالک آن‌ها
+        if pending_items is None:
+            pending_items = [(start_url, 0, None)]
+        if pending_items:
+            current_level.value = pending_items[0][1]
+            with pending_by_depth.get_lock():
+                for url, depth, parent_url in pending_items:
+                    pending_by_depth[depth] += 1
+            for item in pending_items:
+                inboxes[shard_for_url(item[0], shard_count)].put(item)
+        else:
+            # تمام صفحات در اجرای قبلی خزش شده‌اند
+            done_event.set()
+        
+        def _forward_logs():
+            while True:
+                try:
+                    message = log_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message['type'] == 'external_links':
+                    if self.external_link_sink:
+                        self.external_link_sink(message['page'], message['links'], message['kind'])
+                    continue
+                if message['type'] == 'checkpoint':
+                    if self.crawl_checkpoint:
+                        self.crawl_checkpoint.record_page(
+                            message['url'], message['data'], message['links'], message['depth']
+                        )
+                    continue
+                self.ui_queue.put(message)
+        
+        pages_visited = 0
+        finished_shards = 0
+        try:
+            while finished_shards < shard_count:
+                _forward_logs()
+                try:
+                    shard_id, shard_data, shard_pages, shard_stats, shard_assets = result_queue.get(timeout=0.2)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        self.ui_queue.put({
+                            'type': 'log',
+                            'text': "All shard processes exited before reporting results.\n"
+                        })
+                        # خزش ناقص است؛ checkpoint برای ادامه در اجرای بعدی حفظ می‌شود
+                        if self.crawl_checkpoint:
+                            self.crawl_checkpoint.close()
+                        break
+                    continue
+                
+                finished_shards += 1
+                pages_visited += shard_pages
+                crawled_pages_data.update(shard_data)
+                self._merge_crawl_stats(shard_stats)
+                self._merge_asset_health(shard_assets)
+                
+                # خروج یک shard پیش از پایان خزش یعنی آدرس‌های آن هرگز پردازش نمی‌شوند
+                if not done_event.is_set():
+                    self.ui_queue.put({
+                        'type': 'log',
+                        'text': f"Shard {shard_id} exited early; stopping the remaining shards.\n"
+                    })
+                    if self.crawl_checkpoint:
+                        self.crawl_checkpoint.close()
+                    done_event.set()
+        finally:
+            done_event.set()
+            # پیام‌های باقی‌مانده (لاگ و checkpoint) تا خروج فرآیندها خوانده می‌شوند تا صف پر نماند
+            deadline = time.monotonic() + 5
+            while any(process.is_alive() for process in processes) and time.monotonic() < deadline:
+                _forward_logs()
+                time.sleep(0.05)
+            _forward_logs()
+            for process in processes:
+                process.join(timeout=1)
+            self.shard_stop_event = None
+        
+        return pages_visited
+
+    def _start_link_check_pipeline(self):
+        """
+        شروع کارگرهای بررسی لینک‌های خارجی همزمان با خزش؛ لینک‌های هر صفحه بلافاصله پس از
+        پردازش آن صفحه از طریق external_link_sink به صف بررسی اضافه می‌شوند
+        """
+        self._link_work_queue = queue.Queue()
+        self.link_index = LinkIndex()
+        # لینک‌هایی که ارسال شده‌اند و نتیجه نهایی ندارند (در صف، در حال بررسی یا منتظر تلاش مجدد)
+        self._link_checks_outstanding = 0
+        self._link_outstanding = threading.Condition()
+        self._host_probes = {}
+        self.link_status_cache = self._open_link_status_cache()
+        self._link_check_start = time.perf_counter()
+        
+        self._link_check_threads = []
+        for worker_idx in range(self.link_check_workers):
+            thread = threading.Thread(
+                target=self._link_check_pool_worker,
+                args=(self._link_work_queue,),
+                daemon=True
+            )
+            self._link_check_threads.append(thread)
+            thread.start()
+        self._link_check_peak_threads = threading.active_count()
+        self.external_link_sink = self._submit_external_links
+        
+        self.ui_queue.put({
+            'type': 'log',
+            'text': f"External links are checked alongside the crawl ({self.link_check_workers} worker(s)).\n\n"
+        })
+
+    def _submit_external_links(self, page_url, links, kind=LinkIndex.EXTERNAL):
+        """
+        ثبت لینک‌های یک صفحه در فهرست لینک‌ها و افزودن لینک‌های جدید به صف بررسی؛
+        هر آدرس فقط یک بار بررسی می‌شود
+
+        :param page_url: آدرس صفحه منبع
+        :param links: آدرس لینک‌ها
+        :param kind: نوع لینک‌ها (LinkIndex.EXTERNAL یا LinkIndex.BOUNDARY)
+        """
+        # اطمینان از اینکه فقط لینک‌های HTTP/HTTPS بررسی می‌شوند
+        links = [url for url in links if url.partition(':')[0].lower() in ('http', 'https')]
+        new_links = self.link_index.add_occurrences(page_url, links, kind)
+        if new_links:
+            with self._link_outstanding:
+                self._link_checks_outstanding += len(new_links)
+        self._link_check_peak_threads = max(self._link_check_peak_threads, threading.active_count())
+        
+        # ترتیب چرخشی دامنه‌ها تا کارگرها پشت سقف یک دامنه پرترافیک منتظر نمانند
+        for ext_url in self._interleave_by_host(new_links):
+            self._link_work_queue.put(ext_url)
+
+    def _stop_link_check_pipeline(self, discard_pending=False):
+        """
+        بستن ورودی صف بررسی لینک‌ها و انتظار برای بررسی لینک‌های باقی‌مانده
+
+        :param discard_pending: رها کردن لینک‌های بررسی نشده (مثلاً پس از خطای خزش)
+        """
+        self.external_link_sink = None
+        if discard_pending:
+            while True:
+                try:
+                    self._link_work_queue.get_nowait()
+                except queue.Empty:
+                    break
+        else:
+            # نشانه پایان فقط پس از نتیجه نهایی تمام لینک‌ها (از جمله تلاش‌های مجدد) ارسال می‌شود
+            with self._link_outstanding:
+                while self._link_checks_outstanding > 0:
+                    self._link_outstanding.wait()
+        for thread in self._link_check_threads:
+            self._link_work_queue.put(None)
+        if not discard_pending:
+            for thread in self._link_check_threads:
+                thread.join()
+        self._link_check_threads = []
+        if self.link_status_cache:
+            self.link_status_cache.close()
+            self.link_status_cache = None
 
     def _check_external_links_threaded(self, crawled_pages_data):
         """
-        بررسی لینک‌های خارجی در thread جداگانه
+        پایان بررسی لینک‌های خارجی که همزمان با خزش آغاز شده و ارسال گزارش آن‌ها به UI
         """
-        unique_external_urls_to_check = set()
+        if not self._link_check_threads:
+            # بررسی بدون خزش همزمان (مثلاً فراخوانی مستقیم)؛ لینک‌های تمام صفحات یک بار ثبت می‌شوند
+            self._start_link_check_pipeline()
+            for page_url, page_data in crawled_pages_data.items():
+                self._submit_external_links(page_url, page_data.get('external_links', []))
+                self._submit_external_links(page_url, page_data.get('boundary_links', []), LinkIndex.BOUNDARY)
         
-        # جمع‌آوری تمام لینک‌های خارجی منحصر به فرد
-        for page_url, page_data in crawled_pages_data.items():
-            external_links = page_data.get('external_links', [])
-            for ext_url in external_links:
-                # اطمینان از اینکه فقط لینک‌های HTTP/HTTPS بررسی می‌شوند
-                parsed_url = urlparse(ext_url)
-                if parsed_url.scheme in ('http', 'https'):
-                    unique_external_urls_to_check.add(ext_url)
-        
-        # لیست‌های موقت برای نگهداری نتایج بررسی در thread
-        temp_all_external_links_info = []
-        temp_all_broken_links = []
-        
-        if unique_external_urls_to_check:
+        drain_start = time.perf_counter()
+        link_cache = self.link_status_cache
+        link_index = self.link_index
+        self._stop_link_check_pipeline()
+        check_end = time.perf_counter()
+        unique_link_count = len(link_index)
+        
+        # منابع خراب در زمان بارگذاری صفحات ثبت شده‌اند و به بررسی جداگانه نیاز ندارند
+        temp_all_broken_assets = [
+            (page_url, asset['url'], asset['type'], asset['status'])
+            for page_url, page_data in crawled_pages_data.items()
+            for asset in page_data.get('broken_assets', [])
+        ]
+        
+        if unique_link_count:
+            check_seconds = check_end - self._link_check_start
+            cache_text = ""
+            if link_cache:
+                cache_hits = self.crawl_stats.get('link_cache_hits', 0)
+                cache_text = (
+                    f"Link cache: {cache_hits / unique_link_count * 100:.0f}% hit rate "
+                    f"({cache_hits}/{unique_link_count})"
+                    f"{', refresh forced' if self.force_link_refresh else ''}.\n"
+                )
+            
             self.ui_queue.put({
                 'type': 'log',
-                'text': f"Checking status of {len(unique_external_urls_to_check)} unique external links in background...\n"
+                'text': f"Checked {unique_link_count} link(s) in {check_seconds:.1f}s "
+                        f"({unique_link_count / max(check_seconds, 0.001):.1f} checks/s), "
+                        f"{check_end - drain_start:.1f}s of it after the crawl finished; "
+                        f"{self.link_check_workers} worker(s), "
+                        f"peak {self._link_check_peak_threads} thread(s) in process.\n"
+                        + cache_text
+                        + f"Domain probes: {self.crawl_stats.get('link_host_probes', 0)} host(s) probed, "
+                          f"{self.crawl_stats.get('link_hosts_unreachable', 0)} unreachable, "
+                          f"{self.crawl_stats.get('link_fast_failed', 0)} link(s) failed fast.\n"
             })
             
-            results_queue_ext = queue.Queue()
-            threads_ext = []
-            
-            for ext_url in unique_external_urls_to_check:
-                thread = threading.Thread(
-                    target=self._check_link_status_worker,
-                    args=(ext_url, results_queue_ext)
+            # لینک‌های داخلی پس از حداکثر عمق که فقط کد وضعیت آن‌ها بررسی شده است
+            boundary_checked = link_index.checked_urls(LinkIndex.BOUNDARY)
+            if boundary_checked:
+                boundary_broken_count = sum(
+                    link_index.occurrence_count(url) for url in boundary_checked
+                    if LinkIndex.is_broken(link_index.status_of(url))
                 )
-                threads_ext.append(thread)
-                thread.start()
-            
-            for thread in threads_ext:
-                thread.join()
-            
-            url_status_map = {}
-            
-            while not results_queue_ext.empty():
-                checked_url, status = results_queue_ext.get()
-                url_status_map[checked_url] = status
-            
-            # یافتن صفحات منبع برای هر لینک خارجی بررسی شده
-            for page_url, page_data in crawled_pages_data.items():
-                for ext_url in page_data.get('external_links', []):
-                    if ext_url in url_status_map:
-                        status = url_status_map[ext_url]
-                        temp_all_external_links_info.append((page_url, ext_url, status))
-                        
-                        # افزودن لینک‌های شکسته به گزارش (کدهای 4xx یا 5xx یا خطاها)
-                        if (isinstance(status, int) and 400 <= status < 600) or isinstance(status, str) and "Error" in status:
-                            temp_all_broken_links.append((page_url, ext_url, status))
-            
-            # ارسال اطلاعات لینک‌ها به UI
-            self.ui_queue.put({
-                'type': 'update_links',
-                'broken_links': temp_all_broken_links,
-                'external_links': temp_all_external_links_info
-            })
+                self.ui_queue.put({
+                    'type': 'log',
+                    'text': f"Boundary links: {len(boundary_checked)} internal link(s) past max depth probed, "
+                            f"{boundary_broken_count} broken link occurrence(s).\n"
+                })
             
             self.ui_queue.put({
                 'type': 'log',
@@ -1491,222 +5823,231 @@ class WebsiteTesterApp:
                 'type': 'log',
                 'text': "No external links found to check.\n"
             })
-            # ارسال لیست‌های خالی در صورت نبود لینک خارجی
+        
+        # ارسال فهرست لینک‌ها به UI (وضعیت لینک‌ها هنگام بررسی در آن ثبت شده است)
+        self.ui_queue.put({
+            'type': 'update_links',
+            'link_index': link_index,
+            'broken_assets': temp_all_broken_assets
+        })
+
+    def _open_link_status_cache(self):
+        """
+        باز کردن حافظه ماندگار وضعیت لینک‌ها؛ در صورت خطا بررسی بدون حافظه ادامه می‌یابد
+        """
+        if not self.link_cache_path:
+            return None
+        try:
+            return LinkStatusCache(self.link_cache_path, self.link_cache_ttls, transient_statuses=self.RETRY_STATUSES)
+        except (OSError, sqlite3.Error) as e:
             self.ui_queue.put({
-                'type': 'update_links',
-                'broken_links': [],
-                'external_links': []
+                'type': 'log',
+                'text': f"Link status cache disabled: {str(e)}\n"
             })
+            return None
 
-    def _check_link_status_worker(self, url_to_check, output_queue):
+    def _probe_link_host(self, url):
         """
-        تابع کارگر برای بررسی وضعیت یک لینک خارجی در رشته جداگانه
+        بررسی یک‌باره DNS و اتصال TCP هر دامنه پیش از بررسی لینک‌های آن؛ نتیجه تا پایان اجرا
+        نگه داشته می‌شود و کارگرهای دیگر همان دامنه منتظر نتیجه اولین بررسی می‌مانند
         
-        :param url_to_check: آدرس لینک برای بررسی
-        :param output_queue: صف برای ذخیره نتایج
+        :param url: آدرس لینک
+        :return: پیام خطای مشترک دامنه یا None اگر دامنه در دسترس است
         """
+        parsed_url = urlparse(url)
+        # با وجود پروکسی، اتصال مستقیم نشان‌دهنده در دسترس بودن دامنه برای requests نیست
+        if not parsed_url.hostname or urllib.request.getproxies().get(parsed_url.scheme):
+            return None
         try:
-            # ابتدا با درخواست HEAD سعی می‌کنیم
-            response = requests.head(url_to_check, allow_redirects=True, timeout=10)
-            status_code = response.status_code
-        except requests.exceptions.Timeout:
-            status_code = "Error: Timeout"
-        except requests.exceptions.ConnectionError:
-            status_code = "Error: ConnectionFailed"
-        except requests.exceptions.TooManyRedirects:
-            status_code = "Error: TooManyRedirects"
-        except requests.exceptions.RequestException:
-            # اگر HEAD با خطا مواجه شد، با GET امتحان می‌کنیم
-            try:
-                response = requests.get(url_to_check, stream=True, timeout=10)
-                # فقط هدرها را دریافت می‌کنیم و اتصال را می‌بندیم
-                response.close()
-                status_code = response.status_code
-            except Exception:
-                status_code = "Error: RequestFailed"
+            port = parsed_url.port
+        except ValueError:
+            # پورت غیرعددی یا خارج از محدوده (مانند :abc یا :99999)
+            return "Error: InvalidURL"
+        host_key = (parsed_url.hostname.lower(), port or (443 if parsed_url.scheme == 'https' else 80))
         
-        # افزودن نتیجه به صف نتایج
-        output_queue.put((url_to_check, status_code))
-    
-    def _fetch_page_info_with_playwright(self, url):
-        """
-        استفاده از Playwright برای دریافت عنوان صفحه، پیوندها و کد وضعیت HTTP
-        با استفاده از زمینه مرورگر موجود
+        with self._host_probes_lock:
+            probe = self._host_probes.get(host_key)
+            run_probe = probe is None
+            if run_probe:
+                probe = {'error': None, 'ready': threading.Event()}
+                self._host_probes[host_key] = probe
         
-        :param url: آدرس وب‌سایت
-        :return: دیکشنری حاوی عنوان صفحه، لیست پیوندهای داخلی و خارجی و کد وضعیت HTTP
+        if run_probe:
+            try:
+                probe['error'] = self._run_host_probe(*host_key)
+                self._record_stat('link_host_probes')
+                if probe['error']:
+                    self._record_stat('link_hosts_unreachable')
+            finally:
+                # کارگرهای منتظر همین دامنه حتی در صورت خطای غیرمنتظره آزاد می‌شوند
+                probe['ready'].set()
+        else:
+            probe['ready'].wait()
+        return probe['error']
+
+    def _run_host_probe(self, hostname, port):
+        """
+        تبدیل نام دامنه و برقراری اتصال TCP به حداکثر دو آدرس آن
+
+        :return: پیام خطا یا None در صورت موفقیت
         """
-        if not self.browser_context:
-            raise Exception("Browser context is not initialized")
-            
-        page = None
         try:
-            # ایجاد صفحه جدید در زمینه مرورگر موجود
-            page = self.browser_context.new_page()
-            
-            # استفاده از استراتژی بارگذاری domcontentloaded برای سرعت بیشتر
-            # ذخیره پاسخ برای دریافت کد وضعیت HTTP
-            response = page.goto(url, wait_until='domcontentloaded')
-            
-            # دریافت کد وضعیت HTTP
-            status_code = response.status if response else "N/A"
-            
-            # اجازه دادن به صفحه برای بارگذاری کامل
+            addresses = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError):
+            return "Error: DNSFailed"
+        
+        error = "Error: ConnectionFailed"
+        for family, socket_type, proto, _canonical_name, address in addresses[:2]:
             try:
-                page.wait_for_load_state('networkidle', timeout=10000)
-            except:
-                # اگر بارگذاری networkidle با مشکل مواجه شد، ادامه می‌دهیم
-                pass
-            
-            # دریافت عنوان صفحه
-            title = page.title()
-            
-            # استخراج تمام پیوندها
-            link_elements = page.query_selector_all("a[href]")
-            
-            # دریافت آدرس کامل صفحه فعلی برای تبدیل آدرس‌های نسبی
-            base_url = page.url
-            
-            # استخراج و تبدیل آدرس‌ها
-            raw_links = []
-            for element in link_elements:
-                href = element.get_attribute('href')
-                if href:
-                    raw_links.append(href)
-            
-            # تبدیل آدرس‌های نسبی به مطلق و حذف آدرس‌های تکراری
-            unique_links = set()
-            for href in raw_links:
-                absolute_url = self._normalize_url(href, base_url)
-                if absolute_url:  # فقط آدرس‌های معتبر (غیر None) اضافه می‌شوند
-                    unique_links.add(absolute_url)
-            
-            # مرتب‌سازی پیوندها برای نمایش بهتر
-            sorted_links = sorted(list(unique_links))
-            
-            # تشخیص لینک‌های داخلی و خارجی
-            bd = urlparse(base_url).netloc
-            internal_links = []
-            external_links = []
-            
-            for link in sorted_links:
-                parsed_link = urlparse(link)
-                # فقط لینک‌های HTTP و HTTPS را بررسی می‌کنیم
-                if parsed_link.scheme in ('http', 'https'):
-                    if parsed_link.netloc == bd:
-                        internal_links.append(link)
-                    else:
-                        external_links.append(link)
-            
-            return {
-                'title': title,
-                'internal_links': internal_links,
-                'external_links': external_links,
-                'page_status_code': status_code
-            }
-                
-        except TimeoutError as te:
-            # در صورت تایم‌اوت، سعی در دریافت عنوان و پیوندها در هر صورت
+                with socket.socket(family, socket_type, proto) as probe_socket:
+                    probe_socket.settimeout(self.HOST_PROBE_TIMEOUT_S)
+                    probe_socket.connect(address)
+                return None
+            except socket.timeout:
+                error = "Error: Timeout"
+            except OSError:
+                error = "Error: ConnectionFailed"
+        return error
+
+    def _interleave_by_host(self, urls):
+        """
+        مرتب‌سازی آدرس‌ها به صورت چرخشی بین دامنه‌ها (یک آدرس از هر دامنه در هر دور)
+        """
+        urls_by_host = {}
+        for url in sorted(urls):
+            urls_by_host.setdefault(urlparse(url).netloc.lower(), deque()).append(url)
+        interleaved = []
+        while urls_by_host:
+            for host in list(urls_by_host):
+                host_urls = urls_by_host[host]
+                interleaved.append(host_urls.popleft())
+                if not host_urls:
+                    del urls_by_host[host]
+        return interleaved
+
+    def _link_check_pool_worker(self, work_queue):
+        """
+        کارگر ثابت بررسی لینک‌ها: تا رسیدن نشانه پایان (None)، آدرس‌ها را یکی یکی بررسی می‌کند
+        (نشست HTTP هر thread اتصال‌های keep-alive هر دامنه را بین بررسی‌ها نگه می‌دارد)
+        """
+        while True:
+            url_to_check = work_queue.get()
+            if url_to_check is None:
+                # پایان ورودی صف
+                return
+            finished = True
             try:
-                title = page.title() if page else "Unknown"
-                status_code = "Timeout"  # کد وضعیت برای تایم‌اوت
-                
-                # تلاش برای استخراج پیوندها حتی در صورت بارگذاری ناقص صفحه
-                link_elements = page.query_selector_all("a[href]") if page else []
-                base_url = page.url if page else url
-                
-                raw_links = []
-                for element in link_elements:
-                    href = element.get_attribute('href')
-                    if href:
-                        raw_links.append(href)
-                
-                unique_links = set()
-                for href in raw_links:
-                    absolute_url = self._normalize_url(href, base_url)
-                    if absolute_url:  # فقط آدرس‌های معتبر (غیر None) اضافه می‌شوند
-                        unique_links.add(absolute_url)
-                
-                sorted_links = sorted(list(unique_links))
-                
-                # تشخیص لینک‌های داخلی و خارجی
-                bd = urlparse(base_url).netloc
-                internal_links = []
-                external_links = []
-                
-                for link in sorted_links:
-                    parsed_link = urlparse(link)
-                    # فقط لینک‌های HTTP و HTTPS را بررسی می‌کنیم
-                    if parsed_link.scheme in ('http', 'https'):
-                        if parsed_link.netloc == bd:
-                            internal_links.append(link)
-                        else:
-                            external_links.append(link)
-                
-                return {
-                    'title': f"{title} (Note: Page loaded partially)",
-                    'internal_links': internal_links,
-                    'external_links': external_links,
-                    'page_status_code': status_code
-                }
-            except:
-                raise Exception(f"Timeout after 60 seconds. The website '{url}' is taking too long to respond.")
-                
-        except Error as e:
-            # تلاش برای استخراج کد خطا از متن خطا
-            error_message = str(e)
-            status_code = "Error"
-            
-            # بررسی آیا کد خطای HTTP در پیام خطا آمده است
-            if "status=" in error_message:
-                try:
-                    status_part = error_message.split("status=")[1]
-                    status_code = status_part.split()[0]  # گرفتن عدد بعد از status=
-                except:
-                    pass
-            
-            raise Exception(f"Playwright error: {error_message}")
-        finally:
-            # بستن صفحه پس از اتمام کار، اما نگه داشتن مرورگر و زمینه آن
-            if page:
-                try:
-                    page.close()
-                except:
-                    pass  # در صورت بروز خطا در بستن صفحه، آن را نادیده می‌گیریم
-    
-    def _normalize_url(self, href, base_url):
+                finished = self._check_link_status_worker(url_to_check)
+            except Exception as e:
+                # خطای غیرمنتظره (مانند قفل بودن پایگاه داده حافظه لینک‌ها) فقط همین لینک را ناموفق می‌کند
+                # و کارگر به لینک بعدی می‌رود؛ در غیر این صورت صف بررسی هرگز خالی نمی‌شود
+                self.link_index.set_status(url_to_check, f"Error: {type(e).__name__}")
+                self.ui_queue.put({
+                    'type': 'log',
+                    'text': f"Link check failed for {url_to_check}: {type(e).__name__}: {str(e)}\n"
+                })
+            finally:
+                if finished:
+                    self._finish_link_check()
+
+    def _finish_link_check(self):
         """
-        تبدیل آدرس‌های نسبی به آدرس‌های مطلق و فیلتر کردن آدرس‌های غیر استاندارد
+        کاهش تعداد لینک‌های در جریان بررسی (شامل لینک‌های منتظر تلاش مجدد)
+        """
+        with self._link_outstanding:
+            self._link_checks_outstanding -= 1
+            self._link_outstanding.notify_all()
+
+    def _check_link_status_worker(self, url_to_check):
+        """
+        تابع کارگر برای بررسی وضعیت یک لینک خارجی در رشته جداگانه
         
-        :param href: آدرس پیوند
-        :param base_url: آدرس پایه صفحه
-        :return: آدرس مطلق یا None برای آدرس‌های غیر استاندارد
+        :param url_to_check: آدرس لینک برای بررسی
+        :return: False اگر به جای ثبت نتیجه، تلاش مجدد زمان‌بندی شد
         """
-        # حذف لنگرها (fragments) از آدرس
-        href = href.split('#')[0]
+        cache = self.link_status_cache
+        if cache and not self.force_link_refresh:
+            cached = cache.get(url_to_check)
+            if cached:
+                self._record_stat('link_cache_hits')
+                # گام‌های میانی تغییر مسیر در حافظه ماندگار نگه داشته نمی‌شوند، فقط آدرس نهایی
+                final_url = cached['final_url']
+                self.link_index.set_status(
+                    url_to_check, cached['status'],
+                    [url_to_check, final_url] if final_url and final_url != url_to_check else None
+                )
+                return True
         
-        # رد کردن آدرس‌های جاوااسکریپت، تلفن، ایمیل و غیره
-        if href.startswith(('javascript:', 'tel:', 'mailto:', 'ftp:', 'file:', 'sms:', 'skype:', 'whatsapp:')):
-            return None
-                            
-        # اگر آدرس خالی باشد، بازگشت به صفحه فعلی است
-        if not href:
-            return base_url
-            
-        # تبدیل آدرس نسبی به مطلق
-        absolute_url = urljoin(base_url, href)
+        final_url = None
+        redirect_chain = None
+        retry_after = None
+        transient = False
+        check_start = time.perf_counter()
+        host_error = self._probe_link_host(url_to_check)
+        if host_error:
+            # دامنه در دسترس نیست؛ تمام لینک‌های آن بدون انتظار برای تایم‌اوت همین خطا را می‌گیرند
+            status_code = host_error
+            self._record_stat('link_fast_failed')
+        else:
+            # بررسی لینک‌ها تابع همان سیاست دامنه‌ای است که خزش صفحات از آن پیروی می‌کند
+            with self.host_scheduler.slot(url_to_check) as slot:
+                try:
+                    # ابتدا با درخواست HEAD سعی می‌کنیم
+                    session = self._get_http_session()
+                    response = session.head(url_to_check, allow_redirects=True, timeout=10)
+                    if response.status_code in (405, 501):
+                        # سرور HEAD را پشتیبانی نمی‌کند؛ وضعیت واقعی با GET مشخص می‌شود
+                        response = session.get(url_to_check, stream=True, timeout=10)
+                        response.close()
+                    status_code = response.status_code
+                    final_url = response.url
+                    redirect_chain = self._response_redirect_chain(response)
+                    if status_code in self.RETRY_STATUSES:
+                        transient = True
+                        retry_after = RetryScheduler.parse_retry_after(response.headers.get('Retry-After'))
+                except requests.exceptions.Timeout:
+                    status_code = "Error: Timeout"
+                    transient = True
+                except requests.exceptions.ConnectionError:
+                    # دامنه به درخواست بررسی اتصال پاسخ داده بود، پس قطع اتصال احتمالاً گذرا است
+                    status_code = "Error: ConnectionFailed"
+                    transient = True
+                except requests.exceptions.TooManyRedirects:
+                    status_code = "Error: TooManyRedirects"
+                except requests.exceptions.RequestException:
+                    # اگر HEAD با خطا مواجه شد، با GET امتحان می‌کنیم
+                    try:
+                        response = session.get(url_to_check, stream=True, timeout=10)
+                        # فقط هدرها را دریافت می‌کنیم و اتصال را می‌بندیم
+                        response.close()
+                        status_code = response.status_code
+                        final_url = response.url
+                        redirect_chain = self._response_redirect_chain(response)
+                    except Exception:
+                        status_code = "Error: RequestFailed"
+                slot.status = status_code
         
-        # بررسی طرح آدرس - فقط http و https را قبول می‌کنیم
-        parsed_url = urlparse(absolute_url)
-        if parsed_url.scheme not in ('http', 'https'):
+        # خطای گذرا پس از تأخیر دوباره به صف بررسی برمی‌گردد و کارگر به لینک بعدی می‌رود
+        work_queue = self._link_work_queue
+        if transient and self.retry_scheduler.schedule(
+            'link', url_to_check, lambda: work_queue.put(url_to_check), retry_after
+        ):
+            return False
+        
+        if cache:
+            cache.put(url_to_check, status_code, final_url, (time.perf_counter() - check_start) * 1000)
+        
+        # ثبت نتیجه در فهرست لینک‌ها
+        self.link_index.set_status(url_to_check, status_code, redirect_chain)
+        return True
+
+    def _response_redirect_chain(self, response):
+        """
+        زنجیره تغییر مسیر یک پاسخ requests (None اگر تغییر مسیری رخ نداده باشد)
+        """
+        if not response.history:
             return None
-            
-        # حذف پارامترهای اضافی اگر لازم است (اختیاری)
-        clean_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-        if parsed_url.query:
-            clean_url += f"?{parsed_url.query}"
-            
-        return clean_url
+        return [hop.url for hop in response.history] + [response.url]
     
     def _display_crawl_results_as_tree(self, crawled_pages_data, start_url):
         """
@@ -1850,22 +6191,12 @@ class WebsiteTesterApp:
         self.link_report_area.insert(tk.END, "Broken Links Found:\n")
         self.link_report_area.insert(tk.END, "-" * 50 + "\n")
         
-        if not self.all_broken_links:
+        # لینک‌های شکسته از قبل در فهرست لینک‌ها بر اساس وضعیت گروه‌بندی شده‌اند
+        broken_by_status = self.link_index.broken_by_status()
+        if not broken_by_status:
             self.link_report_area.insert(tk.END, "None\n\n")
         else:
-            # مرتب‌سازی لینک‌های شکسته بر اساس کد وضعیت
-            sorted_broken_links = sorted(self.all_broken_links, key=lambda x: str(x[2]))
-            
-            # گروه‌بندی لینک‌های شکسته بر اساس نوع خطا
-            broken_by_status = {}
-            for src, url, st in sorted_broken_links:
-                status_key = str(st)
-                if status_key not in broken_by_status:
-                    broken_by_status[status_key] = []
-                broken_by_status[status_key].append((src, url))
-            
-            # نمایش لینک‌های شکسته گروه‌بندی شده
-            for status, links in sorted(broken_by_status.items()):
+            for status, links in broken_by_status:
                 self.link_report_area.insert(tk.END, f"Status: {status} - {len(links)} link(s)\n")
                 for src, url in links:
                     self.link_report_area.insert(
@@ -1874,32 +6205,67 @@ class WebsiteTesterApp:
                     )
                 self.link_report_area.insert(tk.END, "\n")
         
+        # بخش منابع فرعی خراب (تصاویر، اسکریپت‌ها، استایل‌ها و درخواست‌های XHR)
+        self.link_report_area.insert(tk.END, "Broken Assets Found:\n")
+        self.link_report_area.insert(tk.END, "-" * 50 + "\n")
+        
+        if not self.all_broken_assets:
+            self.link_report_area.insert(tk.END, "None\n\n")
+        else:
+            # هر منبع یک بار نمایش داده می‌شود، همراه با صفحاتی که آن را بارگذاری کرده‌اند
+            pages_by_asset = {}
+            for src, url, asset_type, st in self.all_broken_assets:
+                pages_by_asset.setdefault((url, asset_type, str(st)), []).append(src)
+            
+            for (url, asset_type, st), pages in sorted(pages_by_asset.items(), key=lambda x: (x[0][2], x[0][0])):
+                self.link_report_area.insert(
+                    tk.END,
+                    f"  • [{st}] ({asset_type}) {url}\n    Loaded by {len(pages)} page(s): {', '.join(pages[:3])}"
+                    f"{' ...' if len(pages) > 3 else ''}\n"
+                )
+            self.link_report_area.insert(tk.END, "\n")
+        
+        # بخش زنجیره‌های تغییر مسیر (هر گام یک رفت‌وبرگشت اضافه به تأخیر بارگذاری اضافه می‌کند)
+        page_chains = [
+            (url, data['redirect_chain']) for url, data in self.crawled_pages_data.items() if data.get('redirect_chain')
+        ]
+        link_chains = list(self.link_index.redirect_chains().items())
+        self.link_report_area.insert(
+            tk.END, f"Redirect Chains: {len(page_chains)} page(s), {len(link_chains)} link(s) redirected\n"
+        )
+        self.link_report_area.insert(tk.END, "-" * 50 + "\n")
+        
+        if not page_chains and not link_chains:
+            self.link_report_area.insert(tk.END, "None\n\n")
+        else:
+            # طولانی‌ترین زنجیره‌ها ابتدا نمایش داده می‌شوند
+            for label, chains in (("Page", page_chains), ("Link", link_chains)):
+                for url, chain in sorted(chains, key=lambda x: (-len(x[1]), x[0])):
+                    self.link_report_area.insert(
+                        tk.END, f"  • {label} [{len(chain) - 1} hop(s)]: {' -> '.join(chain)}\n"
+                    )
+            self.link_report_area.insert(tk.END, "\n")
+        
         # بخش لینک‌های خارجی
         self.link_report_area.insert(tk.END, "External Links Summary:\n")
         self.link_report_area.insert(tk.END, "-" * 50 + "\n")
         
-        if not self.all_external_links_info:
+        links_by_domain = self.link_index.domain_occurrences()
+        if not links_by_domain:
             self.link_report_area.insert(tk.END, "None\n")
         else:
-            # شمارش تعداد لینک‌های خارجی بر اساس دامنه
-            domain_counts = {}
-            status_success_count = 0
-            status_error_count = 0
-            
-            for _, url, status in self.all_external_links_info:
-                # شمارش دامنه‌ها
-                domain = urlparse(url).netloc
-                domain_counts[domain] = domain_counts.get(domain, 0) + 1
-                
-                # شمارش وضعیت‌ها
-                if isinstance(status, int) and 200 <= status < 400:
-                    status_success_count += 1
-                else:
-                    status_error_count += 1
+            # شمارش تعداد لینک‌های خارجی بر اساس دامنه و وضعیت از فهرست لینک‌ها
+            domain_counts = {domain: len(links) for domain, links in links_by_domain.items()}
+            status_counts = self.link_index.status_counts()
+            total_links = sum(domain_counts.values())
+            status_success_count = sum(
+                count for status, count in status_counts.items() if isinstance(status, int) and 200 <= status < 400
+            )
+            status_error_count = total_links - status_success_count
             
             # نمایش خلاصه آماری
             self.link_report_area.insert(tk.END, f"Total unique domains: {len(domain_counts)}\n")
-            self.link_report_area.insert(tk.END, f"Total external links: {len(self.all_external_links_info)}\n")
+            self.link_report_area.insert(tk.END, f"Total external links: {total_links}\n")
             self.link_report_area.insert(tk.END, f"Successful links (2xx/3xx): {status_success_count}\n")
             self.link_report_area.insert(tk.END, f"Problem links (4xx/5xx/Errors): {status_error_count}\n\n")
             
@@ -1911,27 +6277,14 @@ class WebsiteTesterApp:
             self.link_report_area.insert(tk.END, "\n")
             
             # نمایش وضعیت‌های مختلف
-            status_counts = {}
-            for _, _, st in self.all_external_links_info:
-                status_key = str(st)
-                status_counts[status_key] = status_counts.get(status_key, 0) + 1
-            
             self.link_report_area.insert(tk.END, "Status Codes (by frequency):\n")
-            for status, count in sorted(status_counts.items(), key=lambda x: int(x[1]), reverse=True):
+            for status, count in sorted(status_counts.items(), key=lambda x: x[1], reverse=True):
                 self.link_report_area.insert(tk.END, f"  • {status}: {count} link(s)\n")
             
             # اضافه کردن بخش نمایش جزئیات لینک‌ها
             self.link_report_area.insert(tk.END, "\nDetailed External Links:\n")
             self.link_report_area.insert(tk.END, "-" * 50 + "\n")
             
-            # گروه‌بندی بر اساس دامنه
-            links_by_domain = {}
-            for src, url, st in self.all_external_links_info:
-                domain = urlparse(url).netloc
-                if domain not in links_by_domain:
-                    links_by_domain[domain] = []
-                links_by_domain[domain].append((src, url, st))
-            
             # نمایش لینک‌ها بر اساس دامنه
             for domain, links in sorted(links_by_domain.items()):
                 self.link_report_area.insert(tk.END, f"Domain: {domain} ({len(links)} links)\n")
@@ -2026,10 +6379,21 @@ class WebsiteTesterApp:
             # ذخیره خودکار گزارش‌ها
             self._auto_save_reports()
             
+        elif msg_type == 'load_test_complete':
+            # آزمون بار تمام شد
+            self._crawling_in_progress = False
+            self.start_button.config(state=tk.NORMAL)
+            self.load_test_button.config(state=tk.NORMAL)
+            self.dataset_run_button.config(state=tk.NORMAL)
+            
+        elif msg_type == 'scenario_results':
+            # نتایج اجرای موازی سناریو روی صفحات منطبق
+            self.scenario_results = message['results']
+            
         elif msg_type == 'update_links':
             # به‌روزرسانی لیست لینک‌ها
-            self.all_broken_links = message['broken_links']
-            self.all_external_links_info = message['external_links']
+            self.link_index = message['link_index']
+            self.all_broken_assets = message.get('broken_assets', [])
             
         elif msg_type == 'error':
             # مدیریت خطا
@@ -2078,10 +6442,26 @@ class WebsiteTesterApp:
                         'links_count': data.get('links_count', 0),
                         'parent_url': data.get('parent_url', None),
                         'status_code': str(data.get('status_code', '')),
+                        'wait_ms': data.get('wait_ms', 0),
+                        'redirect_chain': data.get('redirect_chain', []),
                         # لینک‌های خارجی را ذخیره نمی‌کنیم چون ممکن است بزرگ باشند
                     }
                 json.dump(serializable_data, structure_file, ensure_ascii=False, indent=2)
             
+            # ذخیره نقشه آدرس‌های جایگزین به آدرس نهایی (صفحات و لینک‌های خارجی)
+            redirect_map_path = os.path.join(report_dir_path, "redirect_map.json")
+            with open(redirect_map_path, "w", encoding="utf-8") as redirect_file:
+                json.dump(
+                    self._build_redirect_aliases(self.crawled_pages_data, self.link_index),
+                    redirect_file, ensure_ascii=False, indent=2
+                )
+            
+            # ذخیره نتایج اجرای سناریو روی صفحات منطبق (موفقیت و زمان هر اقدام برای هر آدرس)
+            if self.scenario_results:
+                scenario_results_path = os.path.join(report_dir_path, "scenario_results.json")
+                with open(scenario_results_path, "w", encoding="utf-8") as scenario_file:
+                    json.dump(self.scenario_results, scenario_file, ensure_ascii=False, indent=2)
+            
             # ذخیره گزارش لینک
             link_report_file_path = os.path.join(report_dir_path, "link_analysis_report.txt")
             with open(link_report_file_path, "w", encoding="utf-8") as link_file:
@@ -2097,12 +6477,17 @@ class WebsiteTesterApp:
                     f"URL: {self.start_url}\n"
                     f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
                     f"Pages Crawled: {len(self.crawled_pages_data)}\n"
-                    f"External Links Found: {len(self.all_external_links_info)}\n"
-                    f"Broken Links Found: {len(self.all_broken_links)}\n\n"
+                    f"External Links Found: {sum(self.link_index.status_counts().values())}\n"
+                    f"Broken Links Found: {self.link_index.broken_count()}\n"
+                    f"Broken Assets Found: {len({asset[1] for asset in self.all_broken_assets})}\n"
+                    f"Scenario Runs Passed: {sum(1 for result in self.scenario_results if result['passed'])}"
+                    f"/{len(self.scenario_results)}\n\n"
                     f"This report directory contains:\n"
                     f"- crawl_log.txt: Detailed log of the crawling process\n"
                     f"- site_structure_data.json: Data structure of the crawled website\n"
-                    f"- link_analysis_report.txt: Analysis of all external and broken links\n"
+                    f"- link_analysis_report.txt: Analysis of all external and broken links and broken assets\n"
+                    f"- redirect_map.json: Redirected URLs mapped to their final URL\n"
+                    f"- scenario_results.json: Per-URL scenario pass/fail and step timings (if a scenario ran)\n"
                 )
                 summary_file.write(summary_content)
                 
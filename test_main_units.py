@@ -0,0 +1,752 @@
+"""
+آزمون‌های واحد بخش‌های مستقل از مرورگر: صف خزش، shard ها، فیلتر Bloom، checkpoint، زمان‌بند دامنه‌ها،
+بررسی و حافظه لینک‌ها، تلاش مجدد، یکتاسازی آدرس‌ها، سناریوها و آمار آزمون بار
+
+اجرا:
+    python -m unittest test_main_units
+"""
+import datetime
+import email.utils
+import os
+import queue
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from main import (
+    BloomFilter, CrawlCheckpoint, CrawlEngine, CrawlFrontier, HostScheduler, LinkIndex, LinkStatusCache,
+    LoadTestStats, RetryScheduler, ScalableBloomFilter, ScenarioPlan, UrlCanonicalizer, WebsiteTesterApp,
+    shard_for_url,
+)
+
+
+def make_app():
+    """
+    نمونه برنامه بدون ساخت پنجره Tkinter (فقط هسته خزش و صف پیام‌ها)
+    """
+    app = WebsiteTesterApp.__new__(WebsiteTesterApp)
+    CrawlEngine.__init__(app, queue.Queue())
+    return app
+
+
+def make_link_check_app():
+    """
+    نمونه برنامه بدون رابط کاربری با حداقل وضعیت لازم برای بررسی لینک‌ها
+    """
+    app = make_app()
+    app.link_index = LinkIndex()
+    app.link_status_cache = None
+    app.force_link_refresh = False
+    app._host_probes = {}
+    app._host_probes_lock = threading.Lock()
+    app._link_work_queue = queue.Queue()
+    app._link_checks_outstanding = 0
+    app._link_outstanding = threading.Condition()
+    return app
+
+
+class CrawlFrontierTest(unittest.TestCase):
+    def get_in_thread(self, frontier):
+        """
+        فراخوانی get در thread جداگانه؛ :return: (thread، لیست نتیجه)
+        """
+        results = []
+        worker = threading.Thread(target=lambda: results.append(frontier.get()), daemon=True)
+        worker.start()
+        return worker, results
+
+    def test_next_depth_waits_for_current_level(self):
+        frontier = CrawlFrontier("https://example.com/", max_depth=2)
+        self.assertEqual(frontier.get(), ("https://example.com/", 0, None, 1))
+        frontier.put_links(["https://example.com/a", "https://example.com/b"], 1, "https://example.com/")
+        
+        # صفحه عمق 0 هنوز در حال پردازش است، پس صفحات عمق 1 تحویل داده نمی‌شوند
+        worker, results = self.get_in_thread(frontier)
+        worker.join(0.2)
+        self.assertTrue(worker.is_alive())
+        frontier.task_done()
+        worker.join(5)
+        self.assertEqual(results, [("https://example.com/a", 1, "https://example.com/", 2)])
+        
+        # صفحات هم‌عمق همزمان تحویل داده می‌شوند
+        self.assertEqual(frontier.get()[0], "https://example.com/b")
+        frontier.put_links(["https://example.com/c", "https://example.com/"], 2, "https://example.com/a")
+        frontier.task_done()
+        worker, results = self.get_in_thread(frontier)
+        worker.join(0.2)
+        self.assertTrue(worker.is_alive())
+        frontier.task_done()
+        worker.join(5)
+        self.assertEqual(results[0][:2], ("https://example.com/c", 2))
+        frontier.task_done()
+        self.assertIsNone(frontier.get())
+        self.assertEqual(frontier.pages_dispatched, 4)
+
+    def test_links_past_max_depth_are_dropped(self):
+        frontier = CrawlFrontier("https://example.com/", max_depth=0)
+        frontier.get()
+        frontier.put_links(["https://example.com/a"], 1, "https://example.com/")
+        frontier.task_done()
+        self.assertIsNone(frontier.get())
+
+    def test_close_releases_waiting_workers(self):
+        frontier = CrawlFrontier("https://example.com/", max_depth=1)
+        frontier.get()
+        worker, results = self.get_in_thread(frontier)
+        frontier.close()
+        worker.join(5)
+        self.assertEqual(results, [None])
+
+
+class ShardForUrlTest(unittest.TestCase):
+    def test_known_assignments(self):
+        # مقادیر ثابت: shard هر آدرس نباید به نسخه پایتون یا فرآیند وابسته باشد
+        self.assertEqual(shard_for_url("https://example.com/", 4), 3)
+        self.assertEqual(shard_for_url("https://example.com/a", 4), 1)
+        self.assertEqual(shard_for_url("https://example.com/", 7), 4)
+        self.assertEqual(shard_for_url("https://example.com/", 1), 0)
+
+    def test_stable_across_processes(self):
+        urls = [f"https://example.com/p/{i}" for i in range(50)]
+        script = (
+            "import sys, main; "
+            "print(','.join(str(main.shard_for_url(u, 4)) for u in sys.argv[1:]))"
+        )
+        env = dict(os.environ, PYTHONHASHSEED='123')
+        output = subprocess.run(
+            [sys.executable, "-c", script] + urls, capture_output=True, text=True, check=True, env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+        self.assertEqual(output, ",".join(str(shard_for_url(url, 4)) for url in urls))
+
+    def test_even_spread(self):
+        counts = [0] * 4
+        for i in range(4000):
+            counts[shard_for_url(f"https://example.com/p/{i}", 4)] += 1
+        self.assertTrue(all(900 <= count <= 1100 for count in counts), counts)
+
+
+class BloomFilterTest(unittest.TestCase):
+    def false_positive_rate(self, seen, probe_count=20000):
+        return sum(f"https://other.example/{i}" in seen for i in range(probe_count)) / probe_count
+
+    def test_bloom_filter_bound(self):
+        bloom = BloomFilter(10000, 0.01)
+        urls = [f"https://example.com/{i}" for i in range(10000)]
+        for url in urls:
+            bloom.add(url)
+        self.assertTrue(all(url in bloom for url in urls))
+        self.assertLess(self.false_positive_rate(bloom), 0.02)
+
+    def test_scalable_bloom_filter_bound(self):
+        # ظرفیت اولیه کم تا چند فیلتر پشت سر هم ساخته شوند
+        seen = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+        urls = [f"https://example.com/{i}" for i in range(30000)]
+        for url in urls:
+            seen.add(url)
+        self.assertGreater(len(seen._filters), 2)
+        self.assertTrue(all(url in seen for url in urls))
+        self.assertLess(self.false_positive_rate(seen), 0.02)
+        self.assertGreater(len(seen), 29000)
+
+    def test_frontier_dedups_at_enqueue(self):
+        for seen_urls in (None, ScalableBloomFilter(initial_capacity=100, error_rate=0.001)):
+            frontier = CrawlFrontier("https://example.com/", max_depth=2, seen_urls=seen_urls)
+            frontier.get()
+            queued = frontier.put_links(
+                ["https://example.com/a", "https://example.com/a", "https://example.com/"], 1, "https://example.com/"
+            )
+            self.assertEqual(queued, ["https://example.com/a"])
+            self.assertEqual(frontier.put_links(["https://example.com/a"], 1, "https://example.com/"), [])
+
+
+class CrawlCheckpointTest(unittest.TestCase):
+    START_URL = "https://example.com/"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = CrawlCheckpoint.path_for(self.temp_dir.name, self.START_URL, 2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def interrupted_crawl(self):
+        """
+        خزشی که پس از ثبت صفحه شروع و صفحه a متوقف شده است
+        """
+        checkpoint = CrawlCheckpoint(self.path, batch_size=100)
+        checkpoint.start(self.START_URL, 2)
+        checkpoint.record_page(
+            self.START_URL, {'title': "Home", 'depth': 0},
+            ["https://example.com/a", "https://example.com/b"], 1
+        )
+        checkpoint.record_page("https://example.com/a", {'title': "A", 'depth': 1}, ["https://example.com/c"], 2)
+        checkpoint.close()
+
+    def test_resume_restores_pages_and_pending_queue(self):
+        self.interrupted_crawl()
+        checkpoint = CrawlCheckpoint(self.path)
+        self.assertTrue(checkpoint.has_progress())
+        self.assertEqual(checkpoint.load_pages()["https://example.com/a"], {'title': "A", 'depth': 1})
+        pending = checkpoint.load_pending()
+        self.assertEqual(pending, [
+            ("https://example.com/b", 1, self.START_URL),
+            ("https://example.com/c", 2, "https://example.com/a"),
+        ])
+        
+        frontier = CrawlFrontier(self.START_URL, max_depth=2)
+        frontier.restore(pending, checkpoint.iter_seen_urls(), len(checkpoint.load_pages()))
+        self.assertEqual(frontier.get(), ("https://example.com/b", 1, self.START_URL, 3))
+        # آدرس‌های دیده شده در اجرای قبلی دوباره به صف اضافه نمی‌شوند
+        self.assertEqual(frontier.put_links(["https://example.com/a", "https://example.com/d"], 2, "https://example.com/b"),
+                         ["https://example.com/d"])
+        checkpoint.close()
+
+    def test_finish_removes_file_and_reset_clears_state(self):
+        self.interrupted_crawl()
+        checkpoint = CrawlCheckpoint(self.path)
+        checkpoint.reset()
+        self.assertFalse(checkpoint.has_progress())
+        self.assertEqual(checkpoint.load_pending(), [])
+        checkpoint.finish()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_path_depends_on_start_url_and_depth(self):
+        self.assertNotEqual(self.path, CrawlCheckpoint.path_for(self.temp_dir.name, self.START_URL, 3))
+        self.assertEqual(self.path, CrawlCheckpoint.path_for(self.temp_dir.name, self.START_URL, 2))
+
+
+class HostSchedulerTest(unittest.TestCase):
+    URL = "https://example.com/page"
+
+    def new_scheduler(self, **kwargs):
+        return HostScheduler(respect_crawl_delay=False, **kwargs)
+
+    def request(self, scheduler, status=200):
+        with scheduler.slot(self.URL) as slot:
+            slot.status = status
+
+    def test_additive_increase_up_to_cap(self):
+        scheduler = self.new_scheduler(max_per_host=4)
+        self.request(scheduler)
+        limits = []
+        for _ in range(12):
+            limits.append(scheduler.host_limits()["example.com"])
+            self.request(scheduler)
+        self.assertEqual(limits[0], 2)
+        self.assertEqual(limits, sorted(limits))
+        self.assertEqual(scheduler.host_limits()["example.com"], 4)
+
+    def test_multiplicative_decrease_on_throttle(self):
+        scheduler = self.new_scheduler(max_per_host=8)
+        for _ in range(60):
+            self.request(scheduler)
+        self.assertEqual(scheduler.host_limits()["example.com"], 8)
+        self.request(scheduler, 429)
+        self.assertEqual(scheduler.host_limits()["example.com"], 4)
+        state = scheduler._hosts["example.com"]
+        self.assertGreaterEqual(state['delay'], 1.0)
+        # پاسخ‌های پشت سر هم در همان رفت‌وبرگشت ظرفیت را دوباره نصف نمی‌کنند
+        state['next_start'] = 0.0
+        self.request(scheduler, 503)
+        self.assertEqual(scheduler.host_limits()["example.com"], 4)
+
+    def test_fixed_limit_without_adaptive(self):
+        scheduler = self.new_scheduler(max_per_host=3, adaptive=False)
+        self.request(scheduler, 429)
+        self.assertEqual(scheduler.host_limits()["example.com"], 3)
+
+    def test_concurrency_limit_blocks_extra_requests(self):
+        scheduler = self.new_scheduler(max_per_host=4)
+        acquired = threading.Event()
+        with scheduler.slot(self.URL):
+            worker = threading.Thread(target=lambda: (self.request(scheduler), acquired.set()), daemon=True)
+            worker.start()
+            # ظرفیت اولیه تطبیقی یک درخواست است
+            self.assertFalse(acquired.wait(0.2))
+        self.assertTrue(acquired.wait(5))
+
+    def test_parse_crawl_delay(self):
+        robots = "User-agent: Googlebot\nCrawl-delay: 9\n\nUser-agent: *\nDisallow: /tmp\nCrawl-delay: 0.5\n"
+        self.assertEqual(HostScheduler._parse_crawl_delay(robots), 0.5)
+        self.assertIsNone(HostScheduler._parse_crawl_delay("User-agent: Googlebot\nCrawl-delay: 9\n"))
+
+
+class LinkIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = LinkIndex()
+        self.assertEqual(
+            self.index.add_occurrences("https://site/1", ["https://a.com/x", "https://b.com/y"]),
+            ["https://a.com/x", "https://b.com/y"],
+        )
+        self.assertEqual(
+            self.index.add_occurrences("https://site/2", ["https://a.com/x", "https://site/deep"], LinkIndex.BOUNDARY),
+            ["https://site/deep"],
+        )
+        self.index.set_status("https://a.com/x", 404)
+        self.index.set_status("https://b.com/y", 200, ["https://b.com/y", "https://b.com/z"])
+        self.index.set_status("https://site/deep", "Error: Timeout")
+
+    def test_occurrences_and_counts(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.occurrence_count("https://a.com/x"), 2)
+        self.assertEqual(self.index.occurrence_count("https://missing/"), 0)
+        self.assertEqual(self.index.status_counts(), {404: 2, 200: 1})
+        self.assertEqual(self.index.status_counts(LinkIndex.BOUNDARY), {"Error: Timeout": 1})
+        self.assertEqual(sorted(self.index.checked_urls(LinkIndex.EXTERNAL)), ["https://a.com/x", "https://b.com/y"])
+
+    def test_broken_links_grouped_by_status(self):
+        self.assertEqual(self.index.broken_by_status(), [
+            (404, [("https://site/1", "https://a.com/x"), ("https://site/2", "https://a.com/x")]),
+            ("Error: Timeout", [("https://site/2", "https://site/deep")]),
+        ])
+        self.assertEqual(self.index.broken_count(), 3)
+        # وضعیت جدید جایگزین وضعیت قبلی می‌شود
+        self.index.set_status("https://a.com/x", 200)
+        self.assertEqual(self.index.broken_count(), 1)
+        self.assertEqual(self.index.status_of("https://a.com/x"), 200)
+
+    def test_domain_occurrences(self):
+        by_domain = self.index.domain_occurrences()
+        self.assertEqual(sorted(by_domain), ["a.com", "b.com"])
+        self.assertEqual(sorted(by_domain["a.com"]), [
+            ("https://site/1", "https://a.com/x", 404), ("https://site/2", "https://a.com/x", 404)
+        ])
+
+    def test_readers_return_snapshots(self):
+        chains = self.index.redirect_chains()
+        chains["https://b.com/y"].append("https://b.com/tampered")
+        self.assertEqual(self.index.redirect_chains(), {"https://b.com/y": ["https://b.com/y", "https://b.com/z"]})
+
+    def test_concurrent_writers_and_readers(self):
+        errors = []
+
+        def _write(worker_idx):
+            for i in range(500):
+                url = f"https://w{worker_idx}.com/{i}"
+                self.index.add_occurrences(f"https://site/{i % 7}", [url])
+                self.index.set_status(url, 404 if i % 2 else 200)
+
+        def _read():
+            try:
+                for _ in range(100):
+                    self.index.broken_by_status()
+                    self.index.domain_occurrences()
+                    self.index.status_counts()
+                    self.index.checked_urls()
+                    len(self.index)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=_write, args=(i,)) for i in range(3)]
+        threads += [threading.Thread(target=_read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.index), 3 + 1500)
+        self.assertEqual(self.index.status_counts()[404], 2 + 750)
+
+
+class UrlCanonicalizerTest(unittest.TestCase):
+    def setUp(self):
+        self.canonicalizer = UrlCanonicalizer()
+
+    def test_default_port_removed(self):
+        self.assertEqual(self.canonicalizer.canonicalize("http://example.com:80/a"), "http://example.com/a")
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com:443/a"), "https://example.com/a")
+
+    def test_non_default_port_kept(self):
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com:80/a"), "https://example.com:80/a")
+        self.assertEqual(self.canonicalizer.canonicalize("http://example.com:8080/a"), "http://example.com:8080/a")
+
+    def test_host_and_scheme_lowercased_but_not_path(self):
+        self.assertEqual(self.canonicalizer.canonicalize("HTTP://Example.COM/Path"), "http://example.com/Path")
+
+    def test_fragment_removed(self):
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com/a#section"), "https://example.com/a")
+
+    def test_empty_path_becomes_root(self):
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com"), "https://example.com/")
+
+    def test_trailing_slash_kept_by_default(self):
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com/a/"), "https://example.com/a/")
+
+    def test_trailing_slash_folded(self):
+        canonicalizer = UrlCanonicalizer(fold_trailing_slash=True)
+        self.assertEqual(canonicalizer.canonicalize("https://example.com/a/"), "https://example.com/a")
+        self.assertEqual(canonicalizer.canonicalize("https://example.com/a//"), "https://example.com/a")
+        self.assertEqual(canonicalizer.canonicalize("https://example.com/"), "https://example.com/")
+
+    def test_query_sorted_by_name(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/s?b=2&a=1&c=3"),
+            "https://example.com/s?a=1&b=2&c=3",
+        )
+
+    def test_query_order_kept_for_repeated_names(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/s?b=2&a=1&b=1"),
+            "https://example.com/s?a=1&b=2&b=1",
+        )
+
+    def test_query_order_kept_without_sorting(self):
+        canonicalizer = UrlCanonicalizer(sort_query=False)
+        self.assertEqual(
+            canonicalizer.canonicalize("https://example.com/s?b=2&a=1"),
+            "https://example.com/s?b=2&a=1",
+        )
+
+    def test_userinfo_and_ipv6_hosts(self):
+        self.assertEqual(self.canonicalizer.canonicalize("http://[::1]:80/a"), "http://[::1]/a")
+        self.assertEqual(self.canonicalizer.canonicalize("https://user@Example.com:443/a"), "https://user@example.com/a")
+
+    def test_encoding_preserved(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/a%2Fb?q=a%20b&utm_medium=x"),
+            "https://example.com/a%2Fb?q=a%20b",
+        )
+        self.assertEqual(self.canonicalizer.canonicalize("https://example.com/?"), "https://example.com/")
+
+    def test_rules_can_be_disabled(self):
+        canonicalizer = UrlCanonicalizer(lowercase_host=False, remove_default_port=False, denied_params=())
+        self.assertEqual(
+            canonicalizer.canonicalize("HTTP://Example.com:80/A?utm_source=x"), "http://Example.com:80/A?utm_source=x"
+        )
+
+    def test_tracking_and_session_params_removed(self):
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/s?utm_source=x&id=7&GCLID=1;jsessionid=2"),
+            "https://example.com/s?id=7",
+        )
+        self.assertEqual(
+            self.canonicalizer.canonicalize("https://example.com/s;jsessionid=abc?id=7"),
+            "https://example.com/s?id=7",
+        )
+
+
+class RetrySchedulerTest(unittest.TestCase):
+    def test_parse_retry_after_seconds(self):
+        self.assertEqual(RetryScheduler.parse_retry_after("120"), 120.0)
+        self.assertEqual(RetryScheduler.parse_retry_after(" 0 "), 0.0)
+
+    def test_parse_retry_after_http_date(self):
+        retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+        delay = RetryScheduler.parse_retry_after(email.utils.format_datetime(retry_at, usegmt=True))
+        self.assertGreater(delay, 55)
+        self.assertLessEqual(delay, 60)
+        self.assertEqual(RetryScheduler.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_parse_retry_after_invalid(self):
+        for value in (None, "", "soon", "-5"):
+            self.assertIsNone(RetryScheduler.parse_retry_after(value))
+
+    def test_close_runs_pending_callbacks_once(self):
+        scheduler = RetryScheduler({'page': 5}, base_delay_ms=60000, max_delay_ms=60000)
+        calls = []
+        self.assertTrue(scheduler.schedule('page', 'a', lambda: calls.append('a')))
+        self.assertTrue(scheduler.schedule('page', 'b', lambda: calls.append('b')))
+        scheduler.close()
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        self.assertFalse(scheduler.schedule('page', 'c', lambda: calls.append('c')))
+
+    def test_callback_failure_is_logged(self):
+        messages = []
+        scheduler = RetryScheduler({'link': 1}, base_delay_ms=60000, max_delay_ms=60000, log=messages.append)
+
+        def _fail():
+            raise RuntimeError("queue gone")
+        scheduler.schedule('link', 'a', _fail)
+        scheduler.close()
+        self.assertEqual(len(messages), 1)
+        self.assertIn("queue gone", messages[0])
+
+    def test_budget_and_max_attempts(self):
+        scheduler = RetryScheduler({'page': 2}, max_attempts=1, base_delay_ms=60000, max_delay_ms=60000)
+        self.assertTrue(scheduler.schedule('page', 'a', lambda: None))
+        self.assertFalse(scheduler.schedule('page', 'a', lambda: None))
+        self.assertTrue(scheduler.schedule('page', 'b', lambda: None))
+        self.assertFalse(scheduler.schedule('page', 'c', lambda: None))
+        self.assertFalse(scheduler.schedule('page', 'd', lambda: None, retry_after=3600))
+        scheduler.close()
+
+    def test_frontier_deferred_page_returns_when_scheduler_closes(self):
+        frontier = CrawlFrontier("https://example.com/", max_depth=1)
+        scheduler = RetryScheduler({'page': 1}, base_delay_ms=60000, max_delay_ms=60000)
+        url, depth, parent_url, _page_number = frontier.get()
+        self.assertTrue(frontier.retry_later(
+            url, depth, parent_url, lambda callback: scheduler.schedule('page', url, callback)
+        ))
+        frontier.task_done()
+        
+        results = []
+        worker = threading.Thread(target=lambda: results.append(frontier.get()))
+        worker.start()
+        scheduler.close()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(results[0][:3], ("https://example.com/", 0, None))
+        frontier.task_done()
+        self.assertIsNone(frontier.get())
+
+
+class LoadTestStatsTest(unittest.TestCase):
+    def test_percentile_edge_cases(self):
+        self.assertEqual(LoadTestStats.percentile([], 50), 0)
+        for pct in (0, 1, 50, 95, 99, 100):
+            self.assertEqual(LoadTestStats.percentile([42], pct), 42)
+        self.assertEqual(LoadTestStats.percentile([1, 2, 3, 4, 5], 100), 5)
+        self.assertEqual(LoadTestStats.percentile([3, 7, 9], 0), 3)
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual([LoadTestStats.percentile(values, pct) for pct in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(LoadTestStats.percentile([10, 20, 30, 40], 50), 20)
+        self.assertEqual(LoadTestStats.percentile([10, 20, 30, 40], 51), 30)
+
+    def test_summary(self):
+        stats = LoadTestStats(['LOAD', '1:CLICK_ELEMENT'])
+        for i in range(10):
+            failed = i == 9
+            stats.add_iteration({
+                'started_at': 100.0 + i, 'ended_at': 100.5 + i,
+                'steps': [(100.0 + i, True), (20.0, not failed)],
+                'error': "Timeout 30000ms exceeded.\nCall log: ..." if failed else None,
+            })
+        summary = stats.summary()
+        self.assertEqual((summary['iterations'], summary['failed_iterations'], summary['error_rate']), (10, 1, 0.1))
+        self.assertEqual(summary['elapsed_s'], 9.5)
+        self.assertEqual(summary['throughput_per_s'], round(10 / 9.5, 3))
+        self.assertEqual(summary['actions_per_s'], round(20 / 9.5, 3))
+        load_row, click_row = summary['steps']
+        self.assertEqual((load_row['p50_ms'], load_row['p95_ms'], load_row['max_ms']), (104.0, 109.0, 109.0))
+        self.assertEqual((click_row['errors'], click_row['error_rate']), (1, 0.1))
+        self.assertEqual(summary['iteration']['p99_ms'], 500.0)
+        self.assertEqual(summary['errors'], {"Timeout 30000ms exceeded.": 1})
+
+    def test_empty_summary(self):
+        summary = LoadTestStats(['LOAD']).summary()
+        self.assertEqual((summary['iterations'], summary['throughput_per_s']), (0, 0))
+        self.assertEqual(summary['steps'][0]['p99_ms'], 0)
+
+
+class InvalidLinkPortTest(unittest.TestCase):
+    def test_probe_rejects_invalid_port(self):
+        app = make_link_check_app()
+        self.assertEqual(app._probe_link_host("http://foo.com:abc/"), "Error: InvalidURL")
+        self.assertEqual(app._probe_link_host("http://foo.com:99999/"), "Error: InvalidURL")
+
+    def test_check_records_invalid_port_without_raising(self):
+        app = make_link_check_app()
+        url = "http://foo.com:abc/"
+        app.link_index.add_occurrences("https://example.com/", [url])
+        self.assertTrue(app._check_link_status_worker(url))
+        self.assertEqual(app.link_index.status_of(url), "Error: InvalidURL")
+
+
+class LinkCheckPoolWorkerTest(unittest.TestCase):
+    def test_worker_survives_unexpected_error(self):
+        class LockedCache:
+            def get(self, url):
+                raise sqlite3.OperationalError("database is locked")
+
+        app = make_link_check_app()
+        app.link_status_cache = LockedCache()
+        urls = ["https://a.example/1", "https://a.example/2"]
+        app.link_index.add_occurrences("https://example.com/", urls)
+        app._link_checks_outstanding = len(urls)
+        for url in urls + [None]:
+            app._link_work_queue.put(url)
+        
+        worker = threading.Thread(target=app._link_check_pool_worker, args=(app._link_work_queue,))
+        worker.start()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(app._link_checks_outstanding, 0)
+        for url in urls:
+            self.assertEqual(app.link_index.status_of(url), "Error: OperationalError")
+        self.assertIn("database is locked", app.ui_queue.get_nowait()['text'])
+
+
+class SameHostAliasesTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = CrawlEngine(queue.Queue())
+
+    def test_www_and_apex_are_the_same_site(self):
+        self.assertEqual(
+            self.engine._same_host_aliases("https://www.example.com/", ["https://www.example.com/", "https://example.com/"]),
+            ["https://example.com/"],
+        )
+        self.assertEqual(
+            self.engine._same_host_aliases("https://example.com/a", ["https://WWW.example.com/a"]),
+            ["https://WWW.example.com/a"],
+        )
+
+    def test_other_hosts_are_not_aliases(self):
+        self.assertEqual(
+            self.engine._same_host_aliases(
+                "https://example.com/", ["https://other.com/", "https://cdn.example.com/", "https://wwwexample.com/", None]
+            ),
+            [],
+        )
+
+
+class ScenarioPlanTest(unittest.TestCase):
+    def test_exact_pattern(self):
+        matcher = ScenarioPlan.compile_url_pattern("https://example.com/login")
+        self.assertTrue(matcher("https://example.com/login"))
+        self.assertFalse(matcher("https://example.com/login?next=/"))
+
+    def test_glob_pattern(self):
+        matcher = ScenarioPlan.compile_url_pattern("https://example.com/products/*")
+        self.assertTrue(matcher("https://example.com/products/42"))
+        self.assertFalse(matcher("https://example.com/blog/1"))
+        self.assertTrue(ScenarioPlan.compile_url_pattern("https://example.com/p?")("https://example.com/p1"))
+
+    def test_regex_pattern(self):
+        matcher = ScenarioPlan.compile_url_pattern(r"re:/items/\d+$")
+        self.assertTrue(matcher("https://example.com/items/17"))
+        self.assertFalse(matcher("https://example.com/items/new"))
+        with self.assertRaises(ValueError):
+            ScenarioPlan.compile_url_pattern("re:(unclosed")
+
+    def test_compiled_plan(self):
+        app = make_app()
+        plan = app._compile_scenario({
+            "name": "login", "target_url_pattern": "https://example.com/*",
+            "actions": [
+                {"type": "FILL_INPUT", "selector": "#user", "text": "{{ username }}"},
+                {"type": "HOVER", "selector": "#menu"},
+                {"type": "CLICK_ELEMENT", "selector": "get_by_role('button', name='Sign in')"},
+            ],
+        })
+        self.assertTrue(plan.matches("https://example.com/login"))
+        self.assertEqual([step.action_type for step in plan.steps], ["FILL_INPUT", "CLICK_ELEMENT"])
+        self.assertEqual(len(plan.warnings), 1)
+        self.assertEqual(plan.placeholders, frozenset({'username'}))
+        self.assertIsNone(plan.steps[1].template)
+        with self.assertRaises(ValueError):
+            app._compile_scenario({"name": "bad", "target_url_pattern": "", "actions": [{"type": "CLICK_ELEMENT"}]})
+
+
+class ScenarioBindingTest(unittest.TestCase):
+    class RecordingPage:
+        def __init__(self):
+            self.calls = []
+
+        def wait_for_load_state(self, state, timeout=None):
+            self.calls.append(('wait_for_load_state', state, timeout))
+
+        def goto(self, url):
+            self.calls.append(('goto', url))
+
+    def setUp(self):
+        self.app = make_app()
+        self.plan = self.app._compile_scenario({
+            "name": "rows", "target_url_pattern": "https://example.com/*",
+            "actions": [
+                {"type": "GOTO_URL", "url": "https://example.com/{{ path }}"},
+                {"type": "WAIT_FOR_NAVIGATION", "timeout": "{{t}}", "state": "load"},
+                {"type": "CLICK_ELEMENT", "selector": "get_by_unknown('{{name}}')"},
+            ],
+        })
+        # هشدار selector پشتیبانی نشده یک بار هنگام کامپایل برنامه
+        self.assertEqual(self.app.ui_queue.qsize(), 1)
+        self.app.ui_queue.get_nowait()
+
+    def run_bound(self, row):
+        page = self.RecordingPage()
+        for step in self.app._bind_scenario_steps(self.plan, row)[:2]:
+            step.run(page)
+        return page.calls
+
+    def test_values_substituted_and_timeout_coerced(self):
+        self.assertEqual(self.run_bound({'path': 'a', 't': '1500', 'name': 'x'}), [
+            ('goto', "https://example.com/a"), ('wait_for_load_state', 'load', 1500)
+        ])
+        self.assertEqual(self.run_bound({'path': 7, 't': 2500, 'name': 'x'}), [
+            ('goto', "https://example.com/7"), ('wait_for_load_state', 'load', 2500)
+        ])
+        self.assertIsInstance(self.run_bound({'path': 'a', 't': '3e3', 'name': 'x'})[1][2], int)
+
+    def test_unbound_steps_are_reused(self):
+        plan = self.app._compile_scenario({
+            "name": "static", "target_url_pattern": "",
+            "actions": [{"type": "GOTO_URL", "url": "https://example.com/"}],
+        })
+        self.assertIs(self.app._bind_scenario_steps(plan, {})[0], plan.steps[0])
+
+    def test_no_warnings_per_row(self):
+        for row_number in range(3):
+            self.app._bind_scenario_steps(self.plan, {'path': 'a', 't': '1', 'name': str(row_number)})
+        self.assertTrue(self.app.ui_queue.empty())
+
+    def test_missing_column_or_bad_number_rejected(self):
+        with self.assertRaises(ValueError):
+            self.app._bind_scenario_steps(self.plan, {'path': 'a', 'name': 'x'})
+        with self.assertRaises(ValueError):
+            self.app._bind_scenario_steps(self.plan, {'path': 'a', 't': 'soon', 'name': 'x'})
+        with self.assertRaises(ValueError):
+            self.app._bind_scenario_steps(self.plan, {'path': 'a', 't': '1.5', 'name': 'x'})
+
+    def test_coerce_scenario_field(self):
+        self.assertEqual(self.app._coerce_scenario_field('timeout', ' 200 '), 200)
+        self.assertEqual(self.app._coerce_scenario_field('timeout', 200), 200)
+        self.assertEqual(self.app._coerce_scenario_field('text', 5), '5')
+        with self.assertRaises(ValueError):
+            self.app._coerce_scenario_field('timeout', True)
+
+
+class LinkStatusCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = LinkStatusCache(os.path.join(self.temp_dir.name, "links.sqlite"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def put_aged(self, url, status, age_s):
+        self.cache.put(url, status, url, 12.5)
+        self.cache._conn.execute("UPDATE link_status SET checked_at = checked_at - ? WHERE url = ?", (age_s, url))
+
+    def test_ttl_per_status_class(self):
+        two_hours = 2 * 3600
+        self.put_aged("https://a/ok", 200, two_hours)
+        self.put_aged("https://a/moved", 301, two_hours)
+        self.put_aged("https://a/missing", 404, two_hours)
+        self.put_aged("https://a/server", 500, two_hours)
+        self.put_aged("https://a/timeout", "Error: Timeout", two_hours)
+        self.assertEqual(self.cache.get("https://a/ok")['status'], 200)
+        self.assertEqual(self.cache.get("https://a/moved")['status'], 301)
+        self.assertEqual(self.cache.get("https://a/missing")['status'], 404)
+        self.assertIsNone(self.cache.get("https://a/server"))
+        self.assertIsNone(self.cache.get("https://a/timeout"))
+        self.put_aged("https://a/missing-old", 404, 2 * 86400)
+        self.assertIsNone(self.cache.get("https://a/missing-old"))
+
+    def test_retry_statuses_use_error_ttl(self):
+        self.assertEqual(self.cache.status_class(429), 'error')
+        self.assertEqual(self.cache.status_class(503), 'error')
+        self.assertEqual(self.cache.status_class(500), '5xx')
+        self.put_aged("https://a/limited", 429, 2000)
+        self.put_aged("https://a/unavailable", 503, 2000)
+        self.put_aged("https://a/server", 500, 2000)
+        self.assertIsNone(self.cache.get("https://a/limited"))
+        self.assertIsNone(self.cache.get("https://a/unavailable"))
+        self.assertEqual(self.cache.get("https://a/server")['status'], 500)
+
+    def test_result_survives_reopen(self):
+        self.cache.put("https://a/ok", 200, "https://a/final", 12.5)
+        self.cache.close()
+        self.cache = LinkStatusCache(os.path.join(self.temp_dir.name, "links.sqlite"))
+        cached = self.cache.get("https://a/ok")
+        self.assertEqual((cached['status'], cached['final_url'], cached['latency_ms']), (200, "https://a/final", 12.5))
+
+
+if __name__ == '__main__':
+    unittest.main()